@@ -9,14 +9,20 @@
 
 
 import logging
+import math
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import as_completed
 from typing import Any
-from typing import Optional
+from typing import List
+from typing import Tuple
 
+import numpy as np
 import tqdm
+from anemoi.utils.humanize import bytes_to_human
+from anemoi.utils.humanize import human_to_bytes
 from anemoi.utils.remote import Transfer
 from anemoi.utils.remote import TransferMethodNotImplementedError
 
@@ -30,6 +36,23 @@ except AttributeError:
     isatty = False
 
 
+def _copy_unit(source: Any, target: Any, n: int, m: int) -> None:
+    """Copy the rows `n` to `m` of an array. Runs in the threads or processes of the copy.
+
+    Parameters
+    ----------
+    source : Any
+        Source array.
+    target : Any
+        Target array.
+    n : int
+        Start index of the rows.
+    m : int
+        End index of the rows.
+    """
+    target[n:m] = source[n:m]
+
+
 class ZarrCopier:
     """Class to handle copying of Zarr datasets.
 
@@ -53,6 +76,10 @@ class ZarrCopier:
         Flag to use ZARR's nested directory backend.
     rechunk : str
         Rechunk size for the target data array.
+    processes : bool
+        Flag to copy the data in processes instead of threads.
+    memory : int
+        Memory available to each transfer, in bytes.
     """
 
     def __init__(
@@ -66,6 +93,8 @@ class ZarrCopier:
         verbosity: int,
         nested: bool,
         rechunk: str,
+        processes: bool = False,
+        memory: str = "1GB",
         **kwargs: Any,
     ) -> None:
         """Initialize the ZarrCopier.
@@ -90,6 +119,10 @@ class ZarrCopier:
             Flag to use ZARR's nested directory backend.
         rechunk : str
             Rechunk size for the target data array.
+        processes : bool, optional
+            Flag to copy the data in processes instead of threads.
+        memory : str, optional
+            Memory available to each transfer, e.g. `512MB`.
         **kwargs : Any
             Additional keyword arguments.
         """
@@ -102,6 +135,8 @@ class ZarrCopier:
         self.verbosity = verbosity
         self.nested = nested
         self.rechunk = rechunk
+        self.processes = processes
+        self.memory = human_to_bytes(memory)
 
         self.rechunking = rechunk.split(",") if rechunk else []
 
@@ -134,53 +169,88 @@ class ZarrCopier:
             return zarr.storage.NestedDirectoryStore(path)
         return path
 
-    def copy_chunk(self, n: int, m: int, source: Any, target: Any, _copy: Any, verbosity: int) -> Optional[slice]:
-        """Copy a chunk of data from source to target.
+    def plan_units(self, length: int, source_chunk: int, target_chunk: int, row_size: int = 0) -> List[Tuple[int, int]]:
+        """Split the rows of the data into work units aligned with the chunks of the source and the target.
+
+        The units are multiples of the least common multiple of the two chunk sizes, so that
+        each chunk is read and written by a single unit, and the units can be copied in parallel.
+        If such units do not fit in memory (e.g. chunks of 24 and 25 rows give units of 600 rows),
+        the units are only aligned with the target chunks, and the source chunks that straddle
+        two units are read twice.
 
         Parameters
         ----------
-        n : int
-            Start index of the chunk.
-        m : int
-            End index of the chunk.
-        source : Any
-            Source data.
-        target : Any
-            Target data.
-        _copy : Any
-            Copy status array.
-        verbosity : int
-            Verbosity level of logging.
+        length : int
+            Number of rows.
+        source_chunk : int
+            Chunk size of the source along the first dimension.
+        target_chunk : int
+            Chunk size of the target along the first dimension.
+        row_size : int, optional
+            Size of a row in bytes, to limit the units to the memory available to each transfer.
 
         Returns
         -------
-        slice or None
-            Slice of copied data or None if skipped.
+        list of tuple of int
+            The start and end of each unit.
         """
-        if _copy[n:m].all():
-            LOG.info(f"Skipping {n} to {m}")
-            return None
-
-        if self.block_size % self.data_chunks[0] == 0:
-            target[slice(n, m)] = source[slice(n, m)]
-        else:
+        rows = self.memory // row_size if row_size else length
+
+        aligned = math.lcm(source_chunk, target_chunk)
+        if aligned > rows:
+            if target_chunk > rows:
+                raise ValueError(
+                    f"Cannot copy chunks of {target_chunk} rows of {bytes_to_human(row_size)} within "
+                    f"{bytes_to_human(self.memory)}, use a larger --memory or smaller chunks."
+                )
             LOG.warning(
-                f"Block size ({self.block_size}) is not a multiple of target chunk size ({self.data_chunks[0]}). Slow copy expected."
+                f"Units aligned with chunks {source_chunk} and {target_chunk} ({aligned} rows) do not fit in "
+                f"{bytes_to_human(self.memory)}, copying by units aligned with the target chunks only"
             )
-            if self.transfers > 1:
-                # race condition, different threads might copy the same data to the same chunk
-                raise NotImplementedError(
-                    "Block size is not a multiple of target chunk size. Parallel copy not supported."
-                )
-            for i in tqdm.tqdm(
-                range(n, m),
-                desc=f"Copying {n} to {m}",
-                leave=False,
-                disable=not isatty and not verbosity,
-            ):
-                target[i] = source[i]
+            aligned = target_chunk
+
+        unit = max(1, -(-self.block_size // aligned)) * aligned
+        unit = min(unit, max(1, rows // aligned) * aligned)
+        if unit != self.block_size:
+            LOG.info(f"Copying by units of {unit} rows, aligned with chunks {source_chunk} and {target_chunk}")
+        return [(n, min(n + unit, length)) for n in range(0, length, unit)]
+
+    def progress_bitmap(self, target: Any, units: List[Tuple[int, int]]) -> Any:
+        """Create or update the bitmap of the units already copied.
+
+        The bitmap is stored in the target, with one entry per unit. A bitmap written with
+        other units (or one entry per row, by older versions) is converted.
+
+        Parameters
+        ----------
+        target : Any
+            Target group.
+        units : list of tuple of int
+            The start and end of each unit.
 
-        return slice(n, m)
+        Returns
+        -------
+        Any
+            The bitmap.
+        """
+        length = units[-1][1] if units else 0
+        unit = units[0][1] - units[0][0] if units else 1
+        done = np.zeros(len(units), dtype=bool)
+
+        if "_copy" in target:
+            previous = target["_copy"]
+            size = previous.attrs.get("unit", 1)
+            if size == unit and len(previous) == len(units):
+                return previous
+
+            rows = np.repeat(previous[:], size)[:length]
+            if len(rows) == length:
+                done = np.array([rows[n:m].all() for n, m in units], dtype=bool)
+            del target["_copy"]
+
+        bitmap = target.create_dataset("_copy", data=done, chunks=(1024,), dtype=bool)
+        bitmap.attrs["unit"] = unit
+        return bitmap
 
     def parse_rechunking(self, rechunking: list[str], source_data: Any) -> tuple:
         """Parse the rechunking configuration.
@@ -204,6 +274,7 @@ class ZarrCopier:
                 continue
             elif c == "full":
                 chunks[i] = shape[i]
+                continue
             c = int(c)
             c = min(c, shape[i])
             chunks[i] = c
@@ -211,11 +282,9 @@ class ZarrCopier:
 
         if chunks != source_data.chunks:
             LOG.info(f"Rechunking data from {source_data.chunks} to {chunks}")
-            # if self.transfers > 1:
-            #    raise NotImplementedError("Rechunking with multiple transfers is not implemented")
         return chunks
 
-    def copy_data(self, source: Any, target: Any, _copy: Any, verbosity: int) -> None:
+    def copy_data(self, source: Any, target: Any, verbosity: int) -> None:
         """Copy data from source to target.
 
         Parameters
@@ -224,8 +293,6 @@ class ZarrCopier:
             Source data.
         target : Any
             Target data.
-        _copy : Any
-            Copy status array.
         verbosity : int
             Verbosity level of logging.
         """
@@ -246,34 +313,33 @@ class ZarrCopier:
             )
         )
 
-        executor = ThreadPoolExecutor(max_workers=self.transfers)
-        tasks = []
-        n = 0
-        while n < target_data.shape[0]:
-            tasks.append(
-                executor.submit(
-                    self.copy_chunk,
-                    n,
-                    min(n + self.block_size, target_data.shape[0]),
-                    source_data,
-                    target_data,
-                    _copy,
-                    verbosity,
-                )
-            )
-            n += self.block_size
-
-        for future in tqdm.tqdm(as_completed(tasks), total=len(tasks), smoothing=0):
-            copied = future.result()
-            if copied is not None:
-                _copy[copied] = True
-                target["_copy"] = _copy
-
-        target["_copy"] = _copy
+        row_size = math.prod(source_data.shape[1:]) * source_data.dtype.itemsize
+        units = self.plan_units(target_data.shape[0], source_data.chunks[0], target_data.chunks[0], row_size)
+        bitmap = self.progress_bitmap(target, units)
+        done = bitmap[:]
+        LOG.info(f"{done.sum()} out of {len(units)} units already copied")
+
+        pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        with pool(max_workers=self.transfers) as executor:
+            tasks = {
+                executor.submit(_copy_unit, source_data, target_data, n, m): i
+                for i, (n, m) in enumerate(units)
+                if not done[i]
+            }
+
+            for future in tqdm.tqdm(
+                as_completed(tasks),
+                total=len(tasks),
+                smoothing=0,
+                disable=not isatty and not verbosity,
+            ):
+                future.result()
+                # Only the chunk of the bitmap containing this unit is written
+                bitmap[tasks[future]] = True
 
         LOG.info("Copied data")
 
-    def copy_array(self, name: str, source: Any, target: Any, _copy: Any, verbosity: int) -> None:
+    def copy_array(self, name: str, source: Any, target: Any, verbosity: int) -> None:
         """Copy an array from source to target.
 
         Parameters
@@ -284,8 +350,6 @@ class ZarrCopier:
             Source data.
         target : Any
             Target data.
-        _copy : Any
-            Copy status array.
         verbosity : int
             Verbosity level of logging.
         """
@@ -296,14 +360,14 @@ class ZarrCopier:
             return
 
         if name == "data":
-            self.copy_data(source, target, _copy, verbosity)
+            self.copy_data(source, target, verbosity)
             return
 
         LOG.info(f"Copying {name}")
         target[name] = source[name]
         LOG.info(f"Copied {name}")
 
-    def copy_group(self, source: Any, target: Any, _copy: Any, verbosity: int) -> None:
+    def copy_group(self, source: Any, target: Any, verbosity: int) -> None:
         """Copy a group from source to target.
 
         Parameters
@@ -312,8 +376,6 @@ class ZarrCopier:
             Source data.
         target : Any
             Target data.
-        _copy : Any
-            Copy status array.
         verbosity : int
             Verbosity level of logging.
         """
@@ -328,7 +390,6 @@ class ZarrCopier:
                 self.copy_group(
                     source[name],
                     group,
-                    _copy,
                     verbosity,
                 )
             else:
@@ -336,7 +397,6 @@ class ZarrCopier:
                     name,
                     source,
                     target,
-                    _copy,
                     verbosity,
                 )
 
@@ -352,18 +412,9 @@ class ZarrCopier:
         verbosity : int
             Verbosity level of logging.
         """
-        import zarr
-
-        if "_copy" not in target:
-            target["_copy"] = zarr.zeros(
-                source["data"].shape[0],
-                dtype=bool,
-            )
-        _copy = target["_copy"]
-        _copy_np = _copy[:]
-
-        self.copy_group(source, target, _copy_np, verbosity)
-        del target["_copy"]
+        self.copy_group(source, target, verbosity)
+        if "_copy" in target:
+            del target["_copy"]
 
     def run(self) -> None:
         """Execute the copy operation."""
@@ -384,7 +435,7 @@ class ZarrCopier:
         def target_finished() -> bool:
             target = zarr.open(self._store(self.target), mode="r")
             if "_copy" in target:
-                done = sum(1 if x else 0 for x in target["_copy"])
+                done = int(target["_copy"][:].sum())
                 todo = len(target["_copy"])
                 LOG.info(
                     "Resuming copy, done %s out or %s, %s%%",
@@ -457,13 +508,24 @@ class CopyMixin:
         )
         command_parser.add_argument("--nested", action="store_true", help="Use ZARR's nested directpry backend.")
         command_parser.add_argument(
-            "--rechunk", help="Rechunk the target data array. Rechunk size should be a diviser of the block size."
+            "--processes",
+            action="store_true",
+            help="Copy the data in processes instead of threads, to spread the decompression and compression over the CPUs.",
+        )
+        command_parser.add_argument(
+            "--rechunk",
+            help="Rechunk the target data array. The data is copied by blocks aligned with both the source and target chunks.",
         )
         command_parser.add_argument(
             "--block-size",
             type=int,
             default=100,
-            help="For optimisation purposes, data is transfered by blocks. Default is 100.",
+            help="For optimisation purposes, data is transfered by blocks of at least this number of dates, rounded up to a multiple of the chunks. Default is 100.",
+        )
+        command_parser.add_argument(
+            "--memory",
+            default="1GB",
+            help="Memory available to each transfer, which limits the size of the blocks (default: 1GB).",
         )
         command_parser.add_argument("source", help="Source location.")
         command_parser.add_argument("target", help="Target location.")
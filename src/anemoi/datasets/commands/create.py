@@ -86,6 +86,12 @@ class Create(Command):
         group.add_argument("--threads", help="Use `n` parallel thread workers.", type=int, default=0)
         group.add_argument("--processes", help="Use `n` parallel process workers.", type=int, default=0)
         command_parser.add_argument("--trace", action="store_true")
+        command_parser.add_argument(
+            "--pipeline",
+            type=int,
+            metavar="DEPTH",
+            help="Overlap the retrieval, decoding and writing of up to DEPTH groups of dates.",
+        )
 
     def run(self, args: Any) -> None:
         """Execute the create command.
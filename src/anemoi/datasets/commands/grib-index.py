@@ -11,8 +11,6 @@ import fnmatch
 import os
 from typing import Any
 
-import tqdm
-
 from . import Command
 
 
@@ -57,6 +55,13 @@ class GribIndexCmd(Command):
             help="GRIB flavour file (yaml or json)",
         )
 
+        command_parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes parsing the GRIB files (default: number of CPUs)",
+        )
+
         command_parser.add_argument("paths", nargs="+", help="Paths to scan")
 
     def run(self, args: Any) -> None:
@@ -103,9 +108,7 @@ class GribIndexCmd(Command):
                         full = os.path.join(root, file)
                         paths.append(full)
 
-        for path in tqdm.tqdm(paths, leave=False):
-            if match(path):
-                index.add_grib_file(path)
+        index.add_grib_files([path for path in paths if match(path)], workers=args.workers)
 
 
 command = GribIndexCmd
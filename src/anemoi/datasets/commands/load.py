@@ -43,6 +43,12 @@ class Load(Command):
         subparser.add_argument("path", help="Path to store the created data.")
         subparser.add_argument("--cache", help="Location to store the downloaded data.", metavar="DIR")
         subparser.add_argument("--trace", action="store_true")
+        subparser.add_argument(
+            "--pipeline",
+            type=int,
+            metavar="DEPTH",
+            help="Overlap the retrieval, decoding and writing of up to DEPTH groups of dates.",
+        )
 
     def run(self, args: Any) -> None:
         """Run the command.
@@ -0,0 +1,400 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import itertools
+import json
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import tqdm
+from anemoi.utils.humanize import bytes_to_human
+
+from . import Command
+from .copy import ZarrCopier
+from .copy import isatty
+
+LOG = logging.getLogger(__name__)
+
+# Name of the array holding the intermediate layout, in the target
+INTERMEDIATE = "_rechunk"
+
+
+def _copy_region(source: Any, target: Any, region: Tuple[slice, ...]) -> None:
+    """Copy a region of an array. Runs in the threads or processes of the rechunking.
+
+    Parameters
+    ----------
+    source : Any
+        Source array.
+    target : Any
+        Target array.
+    region : tuple of slice
+        The region to copy.
+    """
+    target[region] = source[region]
+
+
+def parse_codec(value: Optional[str]) -> Any:
+    """Parse a codec given on the command line.
+
+    The codec is either `none`, a JSON numcodecs configuration such as
+    `{"id": "blosc", "cname": "zstd", "clevel": 5, "shuffle": 2}`, or the same in the
+    shorter form `blosc:cname=zstd,clevel=5,shuffle=2`.
+
+    Parameters
+    ----------
+    value : str, optional
+        The codec.
+
+    Returns
+    -------
+    Any
+        The numcodecs codec, or None.
+    """
+    from numcodecs import get_codec
+
+    if value is None or value.lower() == "none":
+        return None
+
+    if value.startswith("{"):
+        return get_codec(json.loads(value))
+
+    name, _, options = value.partition(":")
+    config = {"id": name}
+    for option in filter(None, options.split(",")):
+        k, v = option.split("=")
+        try:
+            config[k] = json.loads(v)
+        except ValueError:
+            config[k] = v
+    return get_codec(config)
+
+
+def plan_layouts(
+    shape: Tuple[int, ...],
+    source_chunks: Tuple[int, ...],
+    target_chunks: Tuple[int, ...],
+    itemsize: int,
+    memory: int,
+) -> List[Tuple[int, ...]]:
+    """Plan the layouts through which the data goes, so that each pass fits in memory.
+
+    A pass from one layout to another copies blocks of the least common multiple of the
+    two chunk shapes, so that every chunk is read and written once. If these blocks do not
+    fit in memory, the data goes through an intermediate layout with the smallest of the
+    two chunk sizes on each dimension, e.g. from chunks of one date with all the grid
+    points to chunks of all the dates with a few grid points.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        The shape of the data.
+    source_chunks : tuple of int
+        The chunks of the source.
+    target_chunks : tuple of int
+        The chunks of the target.
+    itemsize : int
+        The size of the values, in bytes.
+    memory : int
+        The memory available for a block, in bytes.
+
+    Returns
+    -------
+    list of tuple of int
+        The chunks of the layouts, from the source to the target.
+    """
+
+    def block(a: Tuple[int, ...], b: Tuple[int, ...]) -> int:
+        return math.prod(min(math.lcm(x, y), n) for x, y, n in zip(a, b, shape)) * itemsize
+
+    if block(source_chunks, target_chunks) <= memory:
+        return [source_chunks, target_chunks]
+
+    intermediate = tuple(min(x, y) for x, y in zip(source_chunks, target_chunks))
+    for a, b in ((source_chunks, intermediate), (intermediate, target_chunks)):
+        if block(a, b) > memory:
+            raise ValueError(
+                f"Cannot rechunk from {source_chunks} to {target_chunks} within {bytes_to_human(memory)}: "
+                f"blocks of {bytes_to_human(block(a, b))} are needed to go from {a} to {b}."
+            )
+
+    return [source_chunks, intermediate, target_chunks]
+
+
+def regions(shape: Tuple[int, ...], block: Tuple[int, ...]) -> List[Tuple[slice, ...]]:
+    """Split an array into regions.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        The shape of the array.
+    block : tuple of int
+        The shape of the regions.
+
+    Returns
+    -------
+    list of tuple of slice
+        The regions.
+    """
+    ranges = [[slice(i, min(i + b, n)) for i in range(0, n, b)] for n, b in zip(shape, block)]
+    return list(itertools.product(*ranges))
+
+
+class ZarrRechunker(ZarrCopier):
+    """Class to rechunk and recompress the data of Zarr datasets.
+
+    The other arrays of the dataset are copied as they are.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        target: str,
+        transfers: int,
+        overwrite: bool,
+        chunks: Optional[str] = None,
+        compressor: Optional[str] = "default",
+        filters: Optional[str] = None,
+        memory: str = "1GB",
+        processes: bool = False,
+        verbosity: int = 1,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the ZarrRechunker.
+
+        Parameters
+        ----------
+        source : str
+            Source location of the dataset.
+        target : str
+            Target location of the dataset.
+        transfers : int
+            Number of parallel transfers.
+        overwrite : bool
+            Flag to overwrite existing dataset.
+        chunks : str, optional
+            Chunks of the target data array, as for the `--rechunk` option of the copy command.
+        compressor : str, optional
+            Compressor of the target data array, see `parse_codec`. By default, the compressor of the source is kept.
+        filters : str, optional
+            Filters of the target data array, as a JSON list of numcodecs configurations. By default, the
+            filters of the source are kept.
+        memory : str, optional
+            Memory available to each transfer, e.g. `512MB`.
+        processes : bool, optional
+            Flag to rechunk the data in processes instead of threads.
+        verbosity : int, optional
+            Verbosity level of logging.
+        **kwargs : Any
+            Additional keyword arguments.
+        """
+        super().__init__(
+            source=source,
+            target=target,
+            transfers=transfers,
+            block_size=1,
+            overwrite=overwrite,
+            resume=False,
+            verbosity=verbosity,
+            nested=False,
+            rechunk=chunks,
+            processes=processes,
+            memory=memory,
+        )
+        self.compressor = compressor
+        self.filters = filters
+
+    def _codecs(self, source_data: Any) -> Tuple[Any, Any]:
+        """Return the compressor and filters of the target data array.
+
+        Parameters
+        ----------
+        source_data : Any
+            Source data.
+
+        Returns
+        -------
+        tuple
+            The compressor and the filters.
+        """
+        from numcodecs import get_codec
+
+        compressor = source_data.compressor if self.compressor == "default" else parse_codec(self.compressor)
+
+        filters = source_data.filters
+        if self.filters is not None:
+            filters = [get_codec(f) for f in json.loads(self.filters)] or None
+
+        return compressor, filters
+
+    def _run_pass(self, source: Any, target: Any, block: Tuple[int, ...], desc: str) -> None:
+        """Copy an array to another one with a different layout, by blocks.
+
+        Parameters
+        ----------
+        source : Any
+            Source array.
+        target : Any
+            Target array.
+        block : tuple of int
+            The shape of the blocks.
+        desc : str
+            Description of the pass.
+        """
+        todo = regions(source.shape, block)
+        LOG.info(f"{desc}: {len(todo)} blocks of {block}")
+
+        pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        with pool(max_workers=self.transfers) as executor:
+            tasks = [executor.submit(_copy_region, source, target, region) for region in todo]
+            for future in tqdm.tqdm(
+                as_completed(tasks),
+                total=len(tasks),
+                desc=desc,
+                smoothing=0,
+                disable=not isatty and not self.verbosity,
+            ):
+                future.result()
+
+    def copy_data(self, source: Any, target: Any, verbosity: int) -> None:
+        """Rechunk and recompress the data from source to target.
+
+        Parameters
+        ----------
+        source : Any
+            Source data.
+        target : Any
+            Target data.
+        verbosity : int
+            Verbosity level of logging.
+        """
+        source_data = source["data"]
+        chunks = self.parse_rechunking(self.rechunking, source_data)
+        compressor, filters = self._codecs(source_data)
+
+        layouts = plan_layouts(source_data.shape, source_data.chunks, chunks, source_data.dtype.itemsize, self.memory)
+        LOG.info(f"Rechunking data through layouts {layouts}, with {compressor=} and {filters=}")
+
+        start = time.time()
+
+        arrays = [source_data]
+        for i, layout in enumerate(layouts[1:], start=1):
+            last = i == len(layouts) - 1
+            arrays.append(
+                target.create_dataset(
+                    "data" if last else INTERMEDIATE,
+                    shape=source_data.shape,
+                    chunks=layout,
+                    dtype=source_data.dtype,
+                    fill_value=source_data.fill_value,
+                    # The intermediate layout is compressed with a fast codec
+                    compressor=compressor if last else parse_codec("blosc:cname=lz4,clevel=1"),
+                    filters=filters if last else None,
+                    overwrite=True,
+                )
+            )
+
+            block = tuple(min(math.lcm(x, y), n) for x, y, n in zip(layouts[i - 1], layout, source_data.shape))
+            self._run_pass(arrays[-2], arrays[-1], block, desc=f"Pass {i}/{len(layouts) - 1}")
+
+        if INTERMEDIATE in target:
+            del target[INTERMEDIATE]
+
+        elapsed = time.time() - start
+        target_data = target["data"]
+        LOG.info(
+            f"Rechunked {bytes_to_human(target_data.nbytes)} in {elapsed:.1f}s "
+            f"({bytes_to_human(target_data.nbytes / max(elapsed, 1e-6))}/s)"
+        )
+        before, after = source_data.nbytes_stored, target_data.nbytes_stored
+        LOG.info(
+            f"Size of the data: {bytes_to_human(before)} -> {bytes_to_human(after)}"
+            f" (compression ratio {target_data.nbytes / max(after, 1):.2f})"
+        )
+
+
+class Rechunk(Command):
+    """Rechunk and recompress the data of a dataset, out of core."""
+
+    internal = True
+    timestamp = True
+
+    def add_arguments(self, command_parser: Any) -> None:
+        """Add arguments to the command parser.
+
+        Parameters
+        ----------
+        command_parser : Any
+            Command parser object.
+        """
+        command_parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Overwrite existing dataset. This will delete the target dataset if it already exists.",
+        )
+        command_parser.add_argument(
+            "--chunks",
+            help="Chunks of the target data array, separated by commas. Leave empty to keep the source chunks, "
+            "use 'full' for the whole dimension, e.g. 'full,,,1024'.",
+        )
+        command_parser.add_argument(
+            "--compressor",
+            default="default",
+            help="Compressor of the target data array: 'none', a numcodecs configuration in JSON, "
+            "or e.g. 'blosc:cname=zstd,clevel=5,shuffle=2'. Default is to keep the compressor of the source.",
+        )
+        command_parser.add_argument(
+            "--filters",
+            help="Filters of the target data array, as a JSON list of numcodecs configurations "
+            '(e.g. \'[{"id": "zfpy", "mode": 2, "rate": 16}]\'). Default is to keep the filters of the source.',
+        )
+        command_parser.add_argument(
+            "--memory",
+            default="1GB",
+            help="Memory available to each transfer, which limits the size of the blocks (default: 1GB).",
+        )
+        command_parser.add_argument("--transfers", type=int, default=8, help="Number of parallel transfers.")
+        command_parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Rechunk in processes instead of threads, to spread the decompression and compression over the CPUs.",
+        )
+        command_parser.add_argument(
+            "--verbosity",
+            type=int,
+            help="Verbosity level. 0 is silent, 1 is normal, 2 is verbose.",
+            default=1,
+        )
+        command_parser.add_argument("source", help="Source location.")
+        command_parser.add_argument("target", help="Target location.")
+
+    def run(self, args: Any) -> None:
+        """Run the rechunk command with the provided arguments.
+
+        Parameters
+        ----------
+        args : Any
+            Command arguments.
+        """
+        if args.source == args.target:
+            raise ValueError("Source and target are the same.")
+
+        ZarrRechunker(**vars(args)).run()
+
+
+command = Rechunk
@@ -16,7 +16,10 @@ import uuid
 import warnings
 from functools import cached_property
 from typing import Any
+from typing import Dict
+from typing import Iterator
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 import cftime
@@ -30,6 +33,7 @@ from anemoi.utils.humanize import compress_dates
 from anemoi.utils.humanize import seconds_to_human
 from anemoi.utils.sanitise import sanitise
 from earthkit.data.core.order import build_remapping
+from numpy.typing import NDArray
 
 from anemoi.datasets import MissingDateError
 from anemoi.datasets import open_dataset
@@ -45,12 +49,13 @@ from .chunks import ChunkFilter
 from .config import build_output
 from .config import loader_config
 from .input import build_input
+from .pipeline import run_pipeline
 from .statistics import Summary
 from .statistics import TmpStatistics
 from .statistics import check_variance
 from .statistics import compute_statistics
 from .statistics import default_statistics_dates
-from .statistics import fix_variance
+from .statistics.accumulator import StatisticsAccumulator
 from .utils import normalize_and_check_dates
 from .writer import ViewCacheArray
 
@@ -577,6 +582,7 @@ def build_input_(main_config: Any, output_config: Any) -> Any:
         flatten_grid=output_config.flatten_grid,
         remapping=build_remapping(output_config.remapping),
         use_grib_paramid=main_config.build.use_grib_paramid,
+        retrieval_cache=main_config.build.retrieval_cache,
     )
     LOG.debug("✅ INPUT_BUILDER")
     LOG.debug(builder)
@@ -803,6 +809,7 @@ class Init(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
 
         self.registry.create(lengths=lengths)
         self.tmp_statistics.create(exist_ok=False)
+        self.tmp_statistics.allocate(dates, variables)
         self.registry.add_to_history("tmp_statistics_initialised", version=self.tmp_statistics.version)
 
         statistics_start, statistics_end = build_statistics_dates(
@@ -832,6 +839,7 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         statistics_temp_dir: Optional[str] = None,
         progress: Any = None,
         cache: Optional[str] = None,
+        pipeline: int = 0,
         **kwargs: Any,
     ):
         """Initialize a Load instance.
@@ -850,12 +858,16 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
             The progress indicator.
         cache : Optional[str], optional
             The cache directory.
+        pipeline : int, optional
+            The number of groups that can wait between the retrieval, decoding and writing stages,
+            which then run concurrently. If 0, the groups are processed one after the other.
         """
         super().__init__(path, cache=cache)
         self.use_threads = use_threads
         self.statistics_temp_dir = statistics_temp_dir
         self.progress = progress
         self.parts = parts
+        self.pipeline = pipeline
         self.dataset = WritableDataset(self.path)
 
         self.main_config = self.dataset.get_main_config()
@@ -875,6 +887,27 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
 
     def _run(self) -> None:
         """Internal method to run the data loading."""
+        # Retrieval of a group, decoding of the previous one and writing of the one before
+        # can overlap if `pipeline` is set.
+        run_pipeline(
+            self._groups_to_load(),
+            [self._retrieve_group, self._decode_group, self._write_group],
+            depth=self.pipeline,
+        )
+
+        self.registry.add_provenance(name="provenance_load")
+        self.tmp_statistics.add_provenance(name="provenance_load", config=self.main_config)
+
+        self.dataset.print_info()
+
+    def _groups_to_load(self) -> Iterator[Tuple[int, Any]]:
+        """Iterate over the groups of dates that are part of this load and are not loaded yet.
+
+        Returns
+        -------
+        Iterator[Tuple[int, Any]]
+            The index of each group and the group.
+        """
         for igroup, group in enumerate(self.groups):
             if not self.chunk_filter(igroup):
                 continue
@@ -882,21 +915,61 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
                 LOG.info(f" -> Skipping {igroup} total={len(self.groups)} (already done)")
                 continue
 
-            # assert isinstance(group[0], datetime.datetime), type(group[0])
-            LOG.debug(f"Building data for group {igroup}/{self.n_groups}")
+            yield igroup, group
 
-            result = self.input.select(group_of_dates=group)
-            assert result.group_of_dates == group, (len(result.group_of_dates), len(group), group)
+    def _retrieve_group(self, item: Tuple[int, Any]) -> Tuple[int, Any, Any]:
+        """Retrieve the data of a group of dates.
 
-            # There are several groups.
-            # There is one result to load for each group.
-            self.load_result(result)
-            self.registry.set_flag(igroup)
+        Parameters
+        ----------
+        item : Tuple[int, Any]
+            The index of the group and the group.
 
-        self.registry.add_provenance(name="provenance_load")
-        self.tmp_statistics.add_provenance(name="provenance_load", config=self.main_config)
+        Returns
+        -------
+        Tuple[int, Any, Any]
+            The index of the group, the result and its cube.
+        """
+        igroup, group = item
 
-        self.dataset.print_info()
+        # assert isinstance(group[0], datetime.datetime), type(group[0])
+        LOG.debug(f"Building data for group {igroup}/{self.n_groups}")
+
+        result = self.input.select(group_of_dates=group)
+        assert result.group_of_dates == group, (len(result.group_of_dates), len(group), group)
+
+        # There are several groups.
+        # There is one result to load for each group.
+        return igroup, result, result.get_cube()
+
+    def _decode_group(self, item: Tuple[int, Any, Any]) -> Tuple[int, ViewCacheArray, Any]:
+        """Decode the data of a group into an in-memory array.
+
+        Parameters
+        ----------
+        item : Tuple[int, Any, Any]
+            The index of the group, the result and its cube.
+
+        Returns
+        -------
+        Tuple[int, ViewCacheArray, Any]
+            The index of the group, the array and the dates of the data.
+        """
+        igroup, result, cube = item
+        array, dates_in_data = self.decode_result(result, cube)
+        return igroup, array, dates_in_data
+
+    def _write_group(self, item: Tuple[int, ViewCacheArray, Any]) -> None:
+        """Write the data of a group to the dataset and record it as done.
+
+        Parameters
+        ----------
+        item : Tuple[int, ViewCacheArray, Any]
+            The index of the group, the array and the dates of the data.
+        """
+        igroup, array, dates_in_data = item
+        self.write_array(array, dates_in_data)
+        self.registry.set_flag(igroup)
 
     def load_result(self, result: Any) -> None:
         """Load the result into the dataset.
@@ -906,12 +979,30 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         result : Any
             The result to load.
         """
+        self.write_array(*self.decode_result(result))
+
+    def decode_result(self, result: Any, cube: Any = None) -> Tuple[ViewCacheArray, Any]:
+        """Decode a result into an in-memory array.
+
+        Parameters
+        ----------
+        result : Any
+            The result to decode.
+        cube : Any, optional
+            The cube of the result, if already built.
+
+        Returns
+        -------
+        Tuple[ViewCacheArray, Any]
+            The array and the dates of the data.
+        """
         # There is one cube to load for each result.
         dates = list(result.group_of_dates)
 
         LOG.debug(f"Loading cube for {len(dates)} dates")
 
-        cube = result.get_cube()
+        if cube is None:
+            cube = result.get_cube()
         shape = cube.extended_user_shape
         dates_in_data = cube.user_coords["valid_datetime"]
 
@@ -960,8 +1051,20 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         LOG.info(f"Loading array shape={shape}, indexes={len(indexes)}")
         self.load_cube(cube, array)
 
+        return array, dates_in_data
+
+    def write_array(self, array: ViewCacheArray, dates_in_data: Any) -> None:
+        """Compute the statistics of an array and write it to the dataset.
+
+        Parameters
+        ----------
+        array : ViewCacheArray
+            The array to write.
+        dates_in_data : Any
+            The dates of the data.
+        """
         stats = compute_statistics(array.cache, self.variables_names, allow_nans=self._get_allow_nans())
-        self.tmp_statistics.write(indexes, stats, dates=dates_in_data)
+        self.tmp_statistics.write(array.indexes, stats, dates=dates_in_data)
         LOG.info("Flush data array")
         array.flush()
         LOG.info("Flushed data array")
@@ -1272,16 +1375,31 @@ class _RunAdditions(Actor, HasRegistryMixin, AdditionsMixin):
         for i in range(0, self.total):
             if not chunk_filter(i):
                 continue
-            date = self.dates[i]
             try:
-                arr = self.ds[i]
-                stats = compute_statistics(arr, self.variables, allow_nans=self.allow_nans)
-                self.tmp_storage.add([date, i, stats], key=date)
+                self.add_tendency(i, self.ds[i])
             except MissingDateError:
-                self.tmp_storage.add([date, i, "missing"], key=date)
+                self.add_tendency(i, None)
         self.tmp_storage.flush()
         LOG.debug(f"Dataset {self.path} additions run.")
 
+    def add_tendency(self, i: int, tendency: Optional[NDArray[Any]]) -> None:
+        """Store the statistics of the tendency at a date.
+
+        Parameters
+        ----------
+        i : int
+            The index of the date.
+        tendency : Optional[NDArray[Any]]
+            The difference between the fields at the date and `delta` before, or None if one of them is missing.
+        """
+        date = self.dates[i]
+        if tendency is None:
+            self.tmp_storage.add([date, i, "missing"], key=date)
+            return
+
+        stats = compute_statistics(tendency, self.variables, allow_nans=self.allow_nans)
+        self.tmp_storage.add([date, i, stats], key=date)
+
     def allow_nans(self) -> bool:
         """Check if NaNs are allowed.
 
@@ -1339,6 +1457,8 @@ class _FinaliseAdditions(Actor, HasRegistryMixin, AdditionsMixin):
             maximum=np.full(shape, np.nan, dtype=np.float64),
             sums=np.full(shape, np.nan, dtype=np.float64),
             squares=np.full(shape, np.nan, dtype=np.float64),
+            mean=np.full(shape, np.nan, dtype=np.float64),
+            m2=np.full(shape, np.nan, dtype=np.float64),
             count=np.full(shape, -1, dtype=np.int64),
             has_nans=np.full(shape, False, dtype=np.bool_),
         )
@@ -1357,7 +1477,7 @@ class _FinaliseAdditions(Actor, HasRegistryMixin, AdditionsMixin):
             found.add(date)
             ifound.add(i)
 
-            for k in ["minimum", "maximum", "sums", "squares", "count", "has_nans"]:
+            for k in agg:
                 agg[k][i, ...] = stats[k]
 
         assert len(found) + len(missing) == len(self.dates), (
@@ -1377,51 +1497,34 @@ class _FinaliseAdditions(Actor, HasRegistryMixin, AdditionsMixin):
             return
 
         mask = sorted(list(ifound))
-        for k in ["minimum", "maximum", "sums", "squares", "count", "has_nans"]:
+        for k in agg:
             agg[k] = agg[k][mask, ...]
 
-        for k in ["minimum", "maximum", "sums", "squares", "count", "has_nans"]:
+        for k in agg:
             assert agg[k].shape == agg["count"].shape, (
                 agg[k].shape,
                 agg["count"].shape,
             )
 
-        minimum = np.nanmin(agg["minimum"], axis=0)
-        maximum = np.nanmax(agg["maximum"], axis=0)
-        sums = np.nansum(agg["sums"], axis=0)
-        squares = np.nansum(agg["squares"], axis=0)
-        count = np.nansum(agg["count"], axis=0)
-        has_nans = np.any(agg["has_nans"], axis=0)
-
-        assert sums.shape == count.shape
-        assert sums.shape == squares.shape
-        assert sums.shape == minimum.shape
-        assert sums.shape == maximum.shape
-        assert sums.shape == has_nans.shape
-
-        mean = sums / count
-        assert sums.shape == mean.shape
-
-        x = squares / count - mean * mean
-        # x[- 1e-15 < (x / (np.sqrt(squares / count) + np.abs(mean))) < 0] = 0
-        # remove negative variance due to numerical errors
-        for i, name in enumerate(self.variables):
-            x[i] = fix_variance(x[i], name, agg["count"][i : i + 1], agg["sums"][i : i + 1], agg["squares"][i : i + 1])
-        check_variance(x, self.variables, minimum, maximum, mean, count, sums, squares)
-
-        stdev = np.sqrt(x)
-        assert sums.shape == stdev.shape
-
-        self.summary = Summary(
-            minimum=minimum,
-            maximum=maximum,
-            mean=mean,
-            count=count,
-            sums=sums,
-            squares=squares,
-            stdev=stdev,
-            variables_names=self.variables,
-            has_nans=has_nans,
+        acc = StatisticsAccumulator(
+            count=agg["count"],
+            mean=agg["mean"],
+            m2=agg["m2"],
+            minimum=agg["minimum"],
+            maximum=agg["maximum"],
+            has_nans=agg["has_nans"],
+        ).reduce()
+
+        self.summary = acc.to_summary(self.variables)
+        check_variance(
+            acc.variance,
+            self.variables,
+            acc.minimum,
+            acc.maximum,
+            acc.mean,
+            acc.count,
+            self.summary["sums"],
+            self.summary["squares"],
         )
         LOG.info(f"Dataset {self.path} additions finalised.")
         # self.check_statistics()
@@ -1475,8 +1578,72 @@ def multi_addition(cls: type) -> type:
     return MultiAdditions
 
 
+class RunAdditions:
+    """A class to run the additions of several deltas, reading the dataset only once.
+
+    The dates are read in order, and the fields of the last `max(delta)` dates are kept
+    in memory, so that the tendencies of all the deltas are computed from the same reads.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Initialize a RunAdditions instance.
+
+        Parameters
+        ----------
+        *args : Any
+            Positional arguments passed to each `_RunAdditions`.
+        **kwargs : Any
+            Keyword arguments passed to each `_RunAdditions`, with the list of deltas in `delta`.
+        """
+        self.actors = [_RunAdditions(*args, delta=k, **kwargs) for k in kwargs.pop("delta", [])]
+
+        if not self.actors:
+            LOG.warning("No delta found in kwargs, no additions will be computed.")
+
+    def run(self) -> None:
+        """Run the additions."""
+        actors = []
+        for actor in self.actors:
+            if actor.skip():
+                LOG.info(f"Skipping delta={actor.delta}")
+                continue
+            actor.read_from_dataset()
+            actors.append(actor)
+
+        if not actors:
+            return
+
+        first = actors[0]
+        ds, total = first.ds.ds, first.total
+        window = max(actor.ds.idelta for actor in actors)
+
+        indices = list(ChunkFilter(parts=first.parts, total=total))
+        if indices:
+            # Fields of the dates of the window, None for missing dates
+            fields: Dict[int, Optional[NDArray[Any]]] = {}
+            for i in range(max(0, indices[0] - window), indices[-1] + 1):
+                try:
+                    fields[i] = ds[i : i + 1, ...]
+                except MissingDateError:
+                    fields[i] = None
+                fields.pop(i - window - 1, None)
+
+                if i < indices[0]:
+                    continue
+
+                for actor in actors:
+                    previous = fields.get(i - actor.ds.idelta)
+                    if fields[i] is None or previous is None:
+                        actor.add_tendency(i, None)
+                    else:
+                        actor.add_tendency(i, fields[i] - previous)
+
+        for actor in actors:
+            actor.tmp_storage.flush()
+            LOG.debug(f"Dataset {actor.path} additions run for delta={actor.delta}.")
+
+
 InitAdditions = multi_addition(_InitAdditions)
-RunAdditions = multi_addition(_RunAdditions)
 FinaliseAdditions = multi_addition(_FinaliseAdditions)
 
 
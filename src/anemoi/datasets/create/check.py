@@ -250,7 +250,7 @@ def check_data_values(
     """
     shape = arr.shape
 
-    if (isinstance(allow_nans, (set, list, tuple, dict)) and name in allow_nans) or allow_nans:
+    if _nans_allowed(name, allow_nans):
         arr = arr[~np.isnan(arr)]
 
     if arr.size == 0:
@@ -262,6 +262,79 @@ def check_data_values(
     min, max = arr.min(), arr.max()
     assert not (np.isnan(arr).any()), (name, min, max, *log)
 
+    _check_min_max(min, max, name=name)
+
+
+def check_data_statistics(
+    *,
+    minimum: float,
+    maximum: float,
+    count: int,
+    nans: int,
+    name: str,
+    log: list = [],
+    allow_nans: Union[bool, list, set, tuple, dict] = False,
+) -> None:
+    """Perform the same checks as :func:`check_data_values`, using statistics already computed on the data.
+
+    Parameters
+    ----------
+    minimum : float
+        The minimum of the values that are not NaN.
+    maximum : float
+        The maximum of the values that are not NaN.
+    count : int
+        The number of values that are not NaN.
+    nans : int
+        The number of NaN values.
+    name : str
+        The name of the data array.
+    log : list, optional
+        A list to log messages.
+    allow_nans : bool or list or set or tuple or dict, optional
+        Whether to allow NaNs in the data array.
+    """
+    allowed = _nans_allowed(name, allow_nans)
+
+    if count + (0 if allowed else nans) == 0:
+        warnings.warn(f"Empty array for {name} ({count + nans},)")
+        return
+
+    assert allowed or nans == 0, (name, np.nan, np.nan, *log)
+
+    _check_min_max(minimum, maximum, name=name)
+
+
+def _nans_allowed(name: str, allow_nans: Union[bool, list, set, tuple, dict]) -> bool:
+    """Check if NaNs are allowed for a variable.
+
+    Parameters
+    ----------
+    name : str
+        The name of the variable.
+    allow_nans : bool or list or set or tuple or dict
+        Whether to allow NaNs, or the variables for which they are allowed.
+
+    Returns
+    -------
+    bool
+        Whether NaNs are allowed.
+    """
+    return bool((isinstance(allow_nans, (set, list, tuple, dict)) and name in allow_nans) or allow_nans)
+
+
+def _check_min_max(min: float, max: float, *, name: str) -> None:
+    """Warn about suspicious minimum and maximum values.
+
+    Parameters
+    ----------
+    min : float
+        The minimum value.
+    max : float
+        The maximum value.
+    name : str
+        The name of the variable.
+    """
     if min == 9999.0:
         warnings.warn(f"Min value 9999 for {name}")
 
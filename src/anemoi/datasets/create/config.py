@@ -246,6 +246,7 @@ class LoadersConfig(Config):
         self.setdefault("build", Config())
         self.build.setdefault("group_by", "monthly")
         self.build.setdefault("use_grib_paramid", False)
+        self.build.setdefault("retrieval_cache", None)
         self.build.setdefault("variable_naming", "default")
         variable_naming = dict(
             param="{param}",
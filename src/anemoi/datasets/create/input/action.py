@@ -172,9 +172,19 @@ class ActionContext(Context):
         The remapping configuration.
     use_grib_paramid : bool
         Whether to use GRIB parameter ID.
+    retrieval_cache : Any
+        The configuration of the cache of the MARS-like sources, if any.
     """
 
-    def __init__(self, /, order_by: str, flatten_grid: bool, remapping: Dict[str, Any], use_grib_paramid: bool) -> None:
+    def __init__(
+        self,
+        /,
+        order_by: str,
+        flatten_grid: bool,
+        remapping: Dict[str, Any],
+        use_grib_paramid: bool,
+        retrieval_cache: Any = None,
+    ) -> None:
         """Initialize an ActionContext instance.
 
         Parameters
@@ -187,12 +197,15 @@ class ActionContext(Context):
             The remapping configuration.
         use_grib_paramid : bool
             Whether to use GRIB parameter ID.
+        retrieval_cache : Any, optional
+            The configuration of the cache of the MARS-like sources, see `RetrievalCache.from_config`.
         """
         super().__init__()
         self.order_by = order_by
         self.flatten_grid = flatten_grid
         self.remapping = build_remapping(remapping)
         self.use_grib_paramid = use_grib_paramid
+        self.retrieval_cache = retrieval_cache
 
 
 def action_factory(config: Dict[str, Any], context: ActionContext, action_path: List[str]) -> Action:
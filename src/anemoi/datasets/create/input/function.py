@@ -43,6 +43,7 @@ class FunctionContext:
         """
         self.owner = owner
         self.use_grib_paramid: bool = owner.context.use_grib_paramid
+        self.retrieval_cache: Any = getattr(owner.context, "retrieval_cache", None)
 
     def trace(self, emoji: str, *args: Any) -> None:
         """Traces the given arguments with an emoji.
@@ -9,15 +9,17 @@
 
 
 import glob
-import hashlib
 import json
 import logging
 import os
 import pickle
 import shutil
 import socket
+import time
+import uuid
 from typing import Any
 from typing import Iterator
+from typing import List
 from typing import Tuple
 
 import numpy as np
@@ -27,7 +29,17 @@ LOG = logging.getLogger(__name__)
 
 
 class PersistentDict:
-    """A dictionary-like object that persists its contents to disk using pickle files.
+    """A dictionary-like object that persists its contents to disk in an append-only segment log.
+
+    Each instance writes to its own segment: a data file, to which the pickled
+    `(key, element)` records are appended, and an index file with the offset, length
+    and commit time of each record. Records are only added to the index once the data
+    is on disk, so that the records of a writer that crashed are either complete or
+    ignored. When a key is written several times, the last committed record wins.
+
+    The version of the layout is written in the directory when it is created, and checked
+    before reading or writing, so that the temporary directories of an older version
+    (one pickle file per key) are reported as such.
 
     Attributes
     ----------
@@ -41,10 +53,13 @@ class PersistentDict:
         The extension of the directory.
     """
 
-    version = 3
+    version = 4
+
+    # Offset, length and commit time of each record
+    INDEX_DTYPE = np.dtype([("offset", "<i8"), ("length", "<i8"), ("time", "<i8")])
 
     # Used in parrallel, during data loading,
-    # to write data in pickle files.
+    # to write data in segments.
     def __init__(self, directory: str, create: bool = True):
         """Initialize the PersistentDict.
 
@@ -57,12 +72,39 @@ class PersistentDict:
         """
         self.dirname = directory
         self.name, self.ext = os.path.splitext(os.path.basename(self.dirname))
+        self.segment = None
         if create:
             self.create()
 
     def create(self) -> None:
-        """Create the directory if it doesn't exist."""
+        """Create the directory if it doesn't exist, and record the version of its layout."""
         os.makedirs(self.dirname, exist_ok=True)
+        path = os.path.join(self.dirname, "version.json")
+        if os.path.exists(path):
+            return
+        tmp_path = path + f".tmp-{os.getpid()}-on-{socket.gethostname()}"
+        with open(tmp_path, "w") as f:
+            json.dump(dict(version=self.version), f)
+        os.replace(tmp_path, path)
+
+    def check_version(self) -> None:
+        """Check that the directory was created with the current version of the layout.
+
+        Raises
+        ------
+        ValueError
+            If the directory was created by another version.
+        """
+        path = os.path.join(self.dirname, "version.json")
+        version = None
+        if os.path.exists(path):
+            with open(path) as f:
+                version = json.load(f).get("version")
+        if version != self.version:
+            raise ValueError(
+                f"{self.dirname} was created by an incompatible version of {self.__class__.__name__}"
+                f" (found version {version}, expected {self.version}), please rerun the `init` step"
+            )
 
     def delete(self) -> None:
         """Delete the directory and its contents."""
@@ -75,21 +117,62 @@ class PersistentDict:
         """Return a string representation of the PersistentDict."""
         return f"{self.__class__.__name__}({self.dirname})"
 
+    def _segments(self) -> List[str]:
+        """Return the paths of the segments, without extension.
+
+        Returns
+        -------
+        List[str]
+            The paths of the segments.
+        """
+        return sorted(os.path.splitext(f)[0] for f in glob.glob(os.path.join(self.dirname, "*.index")))
+
+    def _index(self, segment: str) -> np.ndarray:
+        """Read the committed records of a segment.
+
+        Parameters
+        ----------
+        segment : str
+            The path of the segment, without extension.
+
+        Returns
+        -------
+        np.ndarray
+            The index entries.
+        """
+        with open(segment + ".index", "rb") as f:
+            data = f.read()
+        # Ignore an entry that was being written when its writer stopped
+        size = len(data) // self.INDEX_DTYPE.itemsize * self.INDEX_DTYPE.itemsize
+        return np.frombuffer(data[:size], dtype=self.INDEX_DTYPE)
+
     def items(self) -> Iterator[Any]:
         """Yield items stored in the directory.
 
         Yields
         ------
         Iterator[Any]
-            An iterator over the items.
+            An iterator over the `(key, element)` items.
         """
-        # use glob to read all pickles
-        files = glob.glob(self.dirname + "/*.pickle")
-        LOG.debug(f"Reading {self.name} data, found {len(files)} files in {self.dirname}")
-        assert len(files) > 0, f"No files found in {self.dirname}"
-        for f in files:
-            with open(f, "rb") as f:
-                yield pickle.load(f)
+        self.check_version()
+        segments = self._segments()
+        LOG.debug(f"Reading {self.name} data, found {len(segments)} segments in {self.dirname}")
+        assert len(segments) > 0, f"No segments found in {self.dirname}"
+
+        # Find the last record of each key
+        latest = {}
+        for n, segment in enumerate(segments):
+            with open(segment + ".data", "rb") as f:
+                for entry in self._index(segment):
+                    f.seek(entry["offset"])
+                    key, elt = pickle.loads(f.read(entry["length"]))
+                    k = str(key)
+                    if k in latest and latest[k][0] > (entry["time"], n):
+                        continue
+                    latest[k] = ((entry["time"], n), key, elt)
+
+        for _, key, elt in latest.values():
+            yield key, elt
 
     def add_provenance(self, **kwargs: Any) -> None:
         """Add provenance information to the directory.
@@ -128,21 +211,46 @@ class PersistentDict:
         elt : Any
             The element to set.
         """
-        h = hashlib.sha256(str(key).encode("utf-8")).hexdigest()
-        path = os.path.join(self.dirname, f"{h}.pickle")
+        self.commit([(key, elt)])
 
-        if os.path.exists(path):
-            LOG.warning(f"{path} already exists")
+    def commit(self, items: List[Tuple[Any, Any]]) -> None:
+        """Append items to the segment of this writer, and commit them.
 
-        tmp_path = path + f".tmp-{os.getpid()}-on-{socket.gethostname()}"
-        with open(tmp_path, "wb") as f:
-            pickle.dump((key, elt), f)
-        shutil.move(tmp_path, path)
+        Parameters
+        ----------
+        items : List[Tuple[Any, Any]]
+            The `(key, element)` items.
+        """
+        if not items:
+            return
 
-        LOG.debug(f"Written {self.name} data for len {key} in {path}")
+        if self.segment is None:
+            self.check_version()
+            self.segment = os.path.join(self.dirname, f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex}")
+
+        records = [pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL) for item in items]
+
+        with open(self.segment + ".data", "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            for record in records:
+                f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index = np.zeros(len(records), dtype=self.INDEX_DTYPE)
+        index["length"] = [len(r) for r in records]
+        index["offset"] = offset + np.cumsum(index["length"]) - index["length"]
+        index["time"] = time.time_ns()
+
+        with open(self.segment + ".index", "ab") as f:
+            f.write(index.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        LOG.debug(f"Written {len(records)} {self.name} records in {self.segment}")
 
     def flush(self) -> None:
-        """Flush the PersistentDict (no-op)."""
+        """Flush the PersistentDict (no-op, the items are committed when they are set)."""
         pass
 
 
@@ -192,9 +300,8 @@ class BufferedPersistentDict(PersistentDict):
             self.flush()
 
     def flush(self) -> None:
-        """Flush the buffer and store the elements in PersistentDict."""
-        k = sorted(self.keys)
-        self.storage.add(self.elements, key=k)
+        """Flush the buffer and commit the elements to the PersistentDict."""
+        self.storage.commit(list(zip(self.keys, self.elements)))
         self.elements = []
         self.keys = []
 
@@ -206,9 +313,7 @@ class BufferedPersistentDict(PersistentDict):
         Iterator[Tuple[Any, Any]]
             An iterator over the items.
         """
-        for keys, elements in self.storage.items():
-            for key, elt in zip(keys, elements):
-                yield key, elt
+        yield from self.storage.items()
 
     def delete(self) -> None:
         """Delete the storage directory and its contents."""
@@ -238,13 +343,14 @@ def build_storage(directory: str, create: bool = True) -> BufferedPersistentDict
 
 
 if __name__ == "__main__":
+    import tempfile
+
     N = 3
     P = 2
-    directory = "h"
+    directory = os.path.join(tempfile.mkdtemp(), "h")
     p = PersistentDict(directory=directory)
     print(p)
     assert os.path.exists(directory)
-    import numpy as np
 
     arrs = [np.random.randint(1, 101, size=(P,)) for _ in range(N)]
     dates = [np.array([np.datetime64(f"2021-01-0{_+1}") + np.timedelta64(i, "h") for i in range(P)]) for _ in range(N)]
@@ -257,10 +363,14 @@ if __name__ == "__main__":
         print(f"Writing : {i=}, {_arr=} {_dates=}")
         p[_dates] = (i, _arr)
 
+    # All the records of a writer are appended to a single segment
+    print(f"Segments: {p._segments()}")
+    assert len(p._segments()) == 1
+
     print()
     print("Reading the data back")
 
-    p = PersistentDict(directory="h")
+    p = PersistentDict(directory=directory, create=False)
     for _dates, (i, _arr) in p.items():
         print(f"{i=}, {_arr=}, {_dates=}")
 
@@ -269,3 +379,5 @@ if __name__ == "__main__":
         assert len(_dates) == len(dates[i])
         for a, b in zip(_dates, dates[i]):
             assert a == b
+
+    p.delete()
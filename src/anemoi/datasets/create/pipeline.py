@@ -0,0 +1,139 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import queue
+import threading
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+
+LOG = logging.getLogger(__name__)
+
+_DONE = object()
+
+# How often blocked stages check whether the pipeline has been stopped, in seconds
+_POLL = 0.1
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item in a queue, unless the pipeline is stopped.
+
+    Parameters
+    ----------
+    q : queue.Queue
+        The queue.
+    item : Any
+        The item.
+    stop : threading.Event
+        Set when the pipeline is stopped.
+
+    Returns
+    -------
+    bool
+        Whether the item was added to the queue.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    """Get an item from a queue, unless the pipeline is stopped.
+
+    Parameters
+    ----------
+    q : queue.Queue
+        The queue.
+    stop : threading.Event
+        Set when the pipeline is stopped.
+
+    Returns
+    -------
+    Any
+        The item, or `_DONE` if the pipeline is stopped.
+    """
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def run_pipeline(items: Iterable[Any], stages: List[Callable[[Any], Any]], depth: int = 0) -> None:
+    """Pass each item through a sequence of stages, running the stages concurrently.
+
+    Each stage but the last runs in its own thread, and hands its results to the next stage through a
+    queue of at most `depth` items, so that stage `k` can work on item `n` while stage `k+1` works on
+    item `n-1`. The last stage runs in the calling thread. Items go through each stage in order.
+
+    Parameters
+    ----------
+    items : Iterable[Any]
+        The items to process. It is iterated in the thread of the first stage.
+    stages : List[Callable[[Any], Any]]
+        The stages. Each one is called with the result of the previous one.
+    depth : int, optional
+        The maximum number of items waiting between two stages. If 0, the items are processed
+        one after the other, in the calling thread.
+    """
+    if depth < 1 or len(stages) < 2:
+        for item in items:
+            for stage in stages:
+                item = stage(item)
+        return
+
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    queues = [queue.Queue(maxsize=depth) for _ in stages[:-1]]
+
+    def worker(k: int) -> None:
+        try:
+            source = iter(items) if k == 0 else None
+            while not stop.is_set():
+                item = next(source, _DONE) if k == 0 else _get(queues[k - 1], stop)
+                if item is _DONE:
+                    break
+                if not _put(queues[k], stages[k](item), stop):
+                    break
+        except BaseException as e:
+            LOG.error("Pipeline stage %s failed: %s", k, e)
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(queues[k], _DONE, stop)
+
+    threads = [
+        threading.Thread(target=worker, args=(k,), name=f"anemoi-pipeline-{k}", daemon=True)
+        for k in range(len(stages) - 1)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = _get(queues[-1], stop)
+            if item is _DONE:
+                break
+            stages[-1](item)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
@@ -19,10 +19,10 @@ from typing import Optional
 from typing import Tuple
 from typing import Union
 
-import earthkit.data as ekd
 import numpy as np
-from earthkit.data.core.temporary import temp_file
-from earthkit.data.readers.grib.output import new_grib_output
+from anemoi.transform.fields import NewDataField
+from anemoi.transform.fields import NewMetadataField
+from anemoi.transform.fields import new_fieldlist_from_list
 from numpy.typing import NDArray
 
 from anemoi.datasets.create.utils import to_datetime_list
@@ -53,6 +53,142 @@ def _member(field: Any) -> int:
     return number
 
 
+class AccumulatedField(NewMetadataField):
+    """A field computed in memory, with the metadata of a template and the times of the accumulation."""
+
+    def __init__(
+        self,
+        template: Any,
+        values: NDArray[Any],
+        base_datetime: datetime.datetime,
+        valid_datetime: datetime.datetime,
+        **metadata: Any,
+    ) -> None:
+        """Initializes an AccumulatedField instance.
+
+        Parameters
+        ----------
+        template : Any
+            The field to take the rest of the metadata from.
+        values : np.ndarray
+            The values of the field, with the shape of the template.
+        base_datetime : datetime.datetime
+            The base date and time of the accumulation.
+        valid_datetime : datetime.datetime
+            The end of the accumulation period.
+        **metadata : Any
+            The metadata overriding that of the template.
+        """
+        super().__init__(
+            NewDataField(template, values),
+            base_datetime=base_datetime.isoformat(),
+            valid_datetime=valid_datetime.isoformat(),
+            **metadata,
+        )
+        self._base_datetime = base_datetime
+        self._valid_datetime = valid_datetime
+
+    def datetime(self) -> Dict[str, datetime.datetime]:
+        """Returns the base and valid times of the field, as GRIB fields do.
+
+        Returns
+        -------
+        Dict[str, datetime.datetime]
+            The base and valid times.
+        """
+        return {"base_time": self._base_datetime, "valid_time": self._valid_datetime}
+
+
+class FieldListOutput:
+    """Collect the accumulated fields in memory.
+
+    This replaces the GRIB output the accumulations used to be written to, and re-read from, a temporary
+    file: each field is created from the values and a template field, and only the metadata that
+    describes the accumulation period is overridden, so nothing is encoded or decoded.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty output."""
+        self.fields: List[Any] = []
+
+    def write(
+        self,
+        values: NDArray[Any],
+        template: Any,
+        stepType: str,
+        startStep: int,
+        endStep: int,
+        date: Optional[int] = None,
+        time: Optional[int] = None,
+        check_nans: bool = False,
+    ) -> None:
+        """Adds a field to the output, with the same arguments as the GRIB output.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values of the field.
+        template : Any
+            The field to take the rest of the metadata from.
+        stepType : str
+            The type of step, e.g. "accum".
+        startStep : int
+            The start step of the accumulation period, in hours.
+        endStep : int
+            The end step of the accumulation period, in hours.
+        date : Optional[int], optional
+            The base date, as YYYYMMDD. Defaults to the date of the template.
+        time : Optional[int], optional
+            The base time, as HHMM. Defaults to the time of the template.
+        check_nans : bool, optional
+            Ignored, the missing values stay NaNs.
+        """
+        if date is None:
+            date = template.metadata("date")
+        if time is None:
+            time = template.metadata("time")
+
+        base_datetime = datetime.datetime.strptime(f"{int(date):08d}{int(time):04d}", "%Y%m%d%H%M")
+        valid_datetime = base_datetime + datetime.timedelta(hours=endStep)
+
+        self.fields.append(
+            AccumulatedField(
+                template,
+                values.reshape(template.shape),
+                base_datetime,
+                valid_datetime,
+                date=int(date),
+                time=int(time),
+                dataDate=int(date),
+                dataTime=int(time),
+                step=endStep,
+                stepType=stepType,
+                startStep=startStep,
+                endStep=endStep,
+                stepRange=f"{startStep}-{endStep}",
+                validityDate=int(valid_datetime.strftime("%Y%m%d")),
+                validityTime=int(valid_datetime.strftime("%H%M")),
+            )
+        )
+
+    def close(self) -> None:
+        """Nothing to do, for compatibility with the GRIB output."""
+
+    def to_fieldlist(self) -> Any:
+        """Returns the fields written so far.
+
+        Returns
+        -------
+        Any
+            The fields.
+        """
+        return new_fieldlist_from_list(self.fields)
+
+    def __len__(self) -> int:
+        """Returns the number of fields written so far."""
+        return len(self.fields)
+
+
 class Accumulation:
     """Class to handle data accumulation for a specific parameter, date, time, and member."""
 
@@ -518,9 +654,7 @@ def _compute_accumulations(
 
     request.update({"type": type_, "levtype": "sfc"})
 
-    tmp = temp_file()
-    path = tmp.path
-    out = new_grib_output(path)
+    out = FieldListOutput()
 
     requests = []
 
@@ -564,14 +698,13 @@ def _compute_accumulations(
 
     out.close()
 
-    ds = ekd.from_source("file", path)
+    ds = out.to_fieldlist()
 
     assert len(ds) / len(param) / len(number) == len(dates), (
         len(ds),
         len(param),
         len(dates),
     )
-    ds._tmp = tmp
 
     return ds
 
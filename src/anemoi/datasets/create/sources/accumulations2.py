@@ -18,14 +18,12 @@ from typing import List
 from typing import Tuple
 from typing import Union
 
-import earthkit.data as ekd
 import numpy as np
-from earthkit.data.core.temporary import temp_file
-from earthkit.data.readers.grib.output import new_grib_output
 
 from anemoi.datasets.create.sources.mars import mars
 from anemoi.datasets.create.utils import to_datetime_list
 
+from .accumulations import FieldListOutput
 from .legacy import legacy_source
 
 LOG = logging.getLogger(__name__)
@@ -509,9 +507,7 @@ def _compute_accumulations(
 
     period_class = find_accumulator_class(request["class"], request["stream"])
 
-    tmp = temp_file()
-    path = tmp.path
-    out = new_grib_output(path)
+    out = FieldListOutput()
 
     # build one accumulator per output field
     accumulators = []
@@ -552,7 +548,7 @@ def _compute_accumulations(
 
     out.close()
 
-    ds = ekd.from_source("file", path)
+    ds = out.to_fieldlist()
 
     assert len(ds) / len(param) / len(number) == len(dates), (
         len(ds),
@@ -560,9 +556,6 @@ def _compute_accumulations(
         len(dates),
     )
 
-    # keep a reference to the tmp file, or it gets deleted when the function returns
-    ds._tmp = tmp
-
     return ds
 
 
@@ -10,10 +10,16 @@
 import logging
 import os
 import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Any
 from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 import earthkit.data as ekd
 import tqdm
@@ -30,6 +36,119 @@ KEYS2 = ("shortName", "paramId", "level", "step", "number", "date", "time", "val
 
 KEYS = KEYS1 + KEYS2
 
+# Keys commonly used to filter the retrievals, added to the covering index on valid_datetime
+COVERING_KEYS = ("param", "levtype", "levelist", "number", "step")
+
+# Messages closer than this in a file are read together, reading the bytes between them
+MAX_GAP = 64 * 1024
+# Maximum size of a single read
+MAX_READ = 64 * 1024 * 1024
+# Maximum number of files read concurrently
+READ_THREADS = 8
+
+
+def _coalesce(messages: List[Tuple[int, int]]) -> List[Tuple[int, int, List[Tuple[int, int]]]]:
+    """Group the messages of a file into large reads.
+
+    Parameters
+    ----------
+    messages : List[Tuple[int, int]]
+        The offsets and lengths of the messages, sorted by offset.
+
+    Returns
+    -------
+    List[Tuple[int, int, List[Tuple[int, int]]]]
+        For each read, its start, its end and its messages.
+    """
+    reads = []
+    for offset, length in messages:
+        if reads:
+            start, end, group = reads[-1]
+            if offset - end <= MAX_GAP and offset + length - start <= MAX_READ:
+                reads[-1] = (start, max(end, offset + length), group + [(offset, length)])
+                continue
+        reads.append((offset, offset + length, [(offset, length)]))
+    return reads
+
+
+def _read_messages(fd: int, messages: List[Tuple[int, int]]) -> List[bytes]:
+    """Read the messages of a file, coalescing the ones that are close to each other.
+
+    Parameters
+    ----------
+    fd : int
+        The file descriptor.
+    messages : List[Tuple[int, int]]
+        The offsets and lengths of the messages, sorted by offset.
+
+    Returns
+    -------
+    List[bytes]
+        The messages.
+    """
+    result = []
+    for start, end, group in _coalesce(messages):
+        buffer = os.pread(fd, end - start, start)
+        if len(buffer) != end - start:
+            raise IOError(f"Short read: {len(buffer)} bytes at offset {start}, expected {end - start}")
+        view = memoryview(buffer)
+        result.extend(view[offset - start : offset - start + length] for offset, length in group)
+    return result
+
+
+def _scan_grib_file(path: str, keys: List[str], flavour: Optional[str] = None) -> Tuple[str, int, float, list, list]:
+    """Read the metadata of the fields of a GRIB file. Runs in the worker processes of a scan.
+
+    Parameters
+    ----------
+    path : str
+        Path to the GRIB file.
+    keys : List[str]
+        The GRIB keys to index.
+    flavour : Optional[str], optional
+        Flavour configuration for mapping fields, by default None.
+
+    Returns
+    -------
+    Tuple[str, int, float, list, list]
+        The path, size and modification time of the file, the records of its fields, and
+        the index, metadata and parameter of the fields with an unknown parameter.
+    """
+    stat = os.stat(path)
+
+    fields = ekd.from_source("file", path)
+    if flavour is not None:
+        fields = RuleBasedFlavour(flavour).map(fields)
+
+    rows = []
+    unknowns = []
+    for i, field in enumerate(fields):
+
+        row = field.metadata(namespace="mars").copy()
+        row.update({k: field.metadata(k, default=None) for k in keys})
+
+        row.setdefault("param", row.get("shortName", row.get("paramId")))
+
+        row = {k: v for k, v in row.items() if v is not None}
+
+        if row.get("param") in (0, "unknown"):
+            param = (
+                field.metadata("discipline", default=None),
+                field.metadata("parameterCategory", default=None),
+                field.metadata("parameterNumber", default=None),
+            )
+            metadata = {
+                k: field.metadata(k, default=None)
+                for k in ("offset", "shortName", "paramId", "parameterName", "parameterUnits")
+            }
+            unknowns.append((i, metadata, param))
+
+        row["_offset"] = field.metadata("offset")
+        row["_length"] = field.metadata("totalLength")
+        rows.append(row)
+
+    return path, stat.st_size, stat.st_mtime, rows, unknowns
+
 
 class GribIndex:
     def __init__(
@@ -81,6 +200,7 @@ class GribIndex:
             self.flavour = RuleBasedFlavour(flavour)
         else:
             self.flavour = None
+        self.flavour_config = flavour
 
         self.update = update
         self.cache = None
@@ -108,11 +228,19 @@ class GribIndex:
             """
         CREATE TABLE IF NOT EXISTS paths (
             id INTEGER PRIMARY KEY,
-            path TEXT not null
+            path TEXT not null,
+            size INTEGER,
+            mtime REAL
         )
         """
         )
 
+        # Indexes created by older versions do not record the size and modification time of the files
+        self.cursor.execute("PRAGMA table_info(paths)")
+        if "size" not in {row[1] for row in self.cursor.fetchall()}:
+            self.cursor.execute("ALTER TABLE paths ADD COLUMN size INTEGER")
+            self.cursor.execute("ALTER TABLE paths ADD COLUMN mtime REAL")
+
         columns = ("valid_datetime",)
         # We don't use NULL as a default because NULL is considered a different value
         # in UNIQUE INDEX constraints (https://www.sqlite.org/lang_createindex.html)
@@ -151,8 +279,35 @@ class GribIndex:
             """
             )
 
+        self._create_covering_index()
+
         self._commit()
 
+    def _create_covering_index(self, rebuild: bool = False) -> None:
+        """Create an index on valid_datetime and the common filter keys that also holds the location of the messages.
+
+        The retrievals can then be answered from the index alone, without reading the table.
+        Indexes that are only opened for reading are not given one.
+
+        Parameters
+        ----------
+        rebuild : bool, optional
+            Whether to rebuild the index if it exists, e.g. when one of the keys has been added to the table.
+            Otherwise, an existing index is kept, as rebuilding it reads the whole table.
+        """
+        columns = self._all_columns()
+        keys = ["valid_datetime"] + [k for k in COVERING_KEYS if k in columns]
+
+        if rebuild:
+            self.cursor.execute("DROP INDEX IF EXISTS idx_grib_index_covering")
+
+        self.cursor.execute(
+            f"""
+        CREATE INDEX IF NOT EXISTS idx_grib_index_covering
+        ON grib_index ({', '.join(keys)}, _path_id, _offset, _length)
+        """
+        )
+
     def _commit(self) -> None:
         """Commit the current transaction to the database."""
         self.conn.commit()
@@ -168,27 +323,6 @@ class GribIndex:
         self.cursor.execute("SELECT key FROM metadata_keys")
         return [row[0] for row in self.cursor.fetchall()]
 
-    def _path_id(self, path: str) -> int:
-        """Get the id of a path in the database.
-
-        Parameters
-        ----------
-        path : str
-            The file path to retrieve or insert.
-
-        Returns
-        -------
-        int
-            The ID of the path in the database.
-        """
-        self.cursor.execute("SELECT id FROM paths WHERE path = ?", (path,))
-        row = self.cursor.fetchone()
-        if row is None:
-            self.cursor.execute("INSERT INTO paths (path) VALUES (?)", (path,))
-            self._commit()
-            return self.cursor.lastrowid
-        return row[0]
-
     def _add_grib(self, **kwargs: Any) -> None:
         """Add a GRIB record to the database.
 
@@ -280,6 +414,9 @@ class GribIndex:
             """
             )
 
+        if any(column in COVERING_KEYS for column in new_columns):
+            self._create_covering_index(rebuild=True)
+
     def add_grib_file(self, path: str) -> None:
         """Add a GRIB file to the database.
 
@@ -288,42 +425,154 @@ class GribIndex:
         path : str
             Path to the GRIB file to add.
         """
-        path_id = self._path_id(path)
+        self.add_grib_files([path])
 
-        fields = ekd.from_source("file", path)
-        if self.flavour is not None:
-            fields = self.flavour.map(fields)
+    def _indexed(self, path: str, size: int, mtime: float) -> bool:
+        """Check whether a file is already indexed, and forget it if it changed since.
 
-        for i, field in enumerate(tqdm.tqdm(fields, leave=False)):
+        Parameters
+        ----------
+        path : str
+            Path to the GRIB file.
+        size : int
+            The size of the file.
+        mtime : float
+            The modification time of the file.
 
-            keys = field.metadata(namespace="mars").copy()
-            keys.update({k: field.metadata(k, default=None) for k in self.keys})
+        Returns
+        -------
+        bool
+            True if the file is indexed and has not changed.
+        """
+        self.cursor.execute("SELECT id, size, mtime FROM paths WHERE path = ?", (path,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return False
 
-            keys.setdefault("param", keys.get("shortName", keys.get("paramId")))
+        if row[1] == size and row[2] == mtime:
+            return True
 
-            keys = {k: v for k, v in keys.items() if v is not None}
+        LOG.info(f"{path} has changed since it was indexed, indexing it again")
+        self.cursor.execute("DELETE FROM grib_index WHERE _path_id = ?", (row[0],))
+        self.cursor.execute("DELETE FROM paths WHERE id = ?", (row[0],))
+        return False
 
-            if keys.get("param") in (0, "unknown"):
-                param = (
-                    field.metadata("discipline", default=None),
-                    field.metadata("parameterCategory", default=None),
-                    field.metadata("parameterNumber", default=None),
+    def _add_rows(self, path: str, size: int, mtime: float, rows: List[dict]) -> None:
+        """Add the records of a GRIB file to the database, without committing.
+
+        Parameters
+        ----------
+        path : str
+            Path to the GRIB file.
+        size : int
+            The size of the file.
+        mtime : float
+            The modification time of the file.
+        rows : List[dict]
+            The records of the fields of the file.
+        """
+        columns = set().union(*rows) if rows else set()
+        self._ensure_columns(sorted(c for c in columns if not c.startswith("_")))
+
+        if not self.conn.in_transaction:
+            # Otherwise releasing the savepoint would commit every file on its own
+            self.cursor.execute("BEGIN")
+
+        # The file is only recorded in `paths` together with all its records
+        self.cursor.execute("SAVEPOINT add_rows")
+        try:
+            self.cursor.execute("INSERT INTO paths (path, size, mtime) VALUES (?, ?, ?)", (path, size, mtime))
+            path_id = self.cursor.lastrowid
+
+            # Insert the rows with the same keys together
+            groups = defaultdict(list)
+            for row in rows:
+                row = dict(row, _path_id=path_id)
+                groups[tuple(row.keys())].append(tuple(row.values()))
+
+            for keys, values in groups.items():
+                self.cursor.executemany(
+                    f"INSERT INTO grib_index ({', '.join(keys)}) VALUES ({', '.join('?' for _ in keys)})",
+                    values,
                 )
-                if param not in self.warnings:
-                    self._unknown(path, field, i, param)
-                    self.warnings[param] = True
+        except sqlite3.IntegrityError:
+            self.cursor.execute("ROLLBACK TO add_rows")
+            try:
+                # Insert the rows one by one, to report the duplicate
+                self.cursor.execute("INSERT INTO paths (path, size, mtime) VALUES (?, ?, ?)", (path, size, mtime))
+                path_id = self.cursor.lastrowid
+                for row in rows:
+                    self._add_grib(_path_id=path_id, **row)
+            finally:
+                self.cursor.execute("ROLLBACK TO add_rows")
+            raise
+        finally:
+            self.cursor.execute("RELEASE add_rows")
 
-            self._ensure_columns(list(keys.keys()))
+    def add_grib_files(self, paths: List[str], workers: int = 1, commit_every: int = 100_000) -> None:
+        """Add GRIB files to the database, skipping the ones already indexed.
 
-            self._add_grib(
-                _path_id=path_id,
-                _offset=field.metadata("offset"),
-                _length=field.metadata("totalLength"),
-                **keys,
-            )
+        The files are parsed in a pool of processes, and the records are inserted by the
+        calling process in large transactions. A file is only marked as indexed when its
+        records are committed, so an interrupted scan can be resumed by running it again.
 
+        Parameters
+        ----------
+        paths : List[str]
+            Paths to the GRIB files to add.
+        workers : int, optional
+            The number of processes parsing the files, by default 1 (no pool).
+        commit_every : int, optional
+            The number of records inserted per transaction, by default 100000.
+        """
+        todo = []
+        for path in paths:
+            stat = os.stat(path)
+            if not self._indexed(path, stat.st_size, stat.st_mtime):
+                todo.append(path)
+
+        LOG.info(f"Indexing {len(todo)} files, {len(paths) - len(todo)} already indexed")
         self._commit()
 
+        scan = partial(_scan_grib_file, keys=self.keys, flavour=self.flavour_config)
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(todo) > 1 else None
+        results = executor.map(scan, todo, chunksize=4) if executor else map(scan, todo)
+
+        start = time.time()
+        total, pending = 0, 0
+
+        try:
+            with tqdm.tqdm(results, total=len(todo), leave=False, unit="file") as progress:
+                for path, size, mtime, rows, unknowns in progress:
+                    for i, metadata, param in unknowns:
+                        if param not in self.warnings:
+                            self._unknown(path, metadata, i, param)
+                            self.warnings[param] = True
+
+                    self._add_rows(path, size, mtime, rows)
+
+                    total += len(rows)
+                    pending += len(rows)
+                    if pending >= commit_every:
+                        self._commit()
+                        pending = 0
+
+                    progress.set_postfix(fields_per_second=f"{total / max(time.time() - start, 1e-6):.0f}")
+
+            self._commit()
+        except BaseException:
+            # Only the files committed so far are marked as indexed
+            self.conn.rollback()
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        elapsed = time.time() - start
+        rate = total / max(elapsed, 1e-6)
+        LOG.info(f"Indexed {total} fields from {len(todo)} files in {elapsed:.1f}s ({rate:.0f} fields/s)")
+
     def _paramdb(self, category: int, discipline: int) -> Optional[dict]:
         """Fetch parameter information from the parameter database.
 
@@ -441,15 +690,15 @@ class GribIndex:
 
         return None
 
-    def _unknown(self, path: str, field: ekd.Field, i: int, param: tuple) -> None:
+    def _unknown(self, path: str, metadata: dict, i: int, param: tuple) -> None:
         """Log information about unknown parameters.
 
         Parameters
         ----------
         path : str
             Path to the GRIB file.
-        field : ekd.Field
-            The GRIB field object.
+        metadata : dict
+            The offset, shortName, paramId, parameterName and parameterUnits of the GRIB field.
         i : int
             The index of the field in the file.
         param : tuple
@@ -462,14 +711,10 @@ class GribIndex:
             except ValueError:
                 return s
 
-        LOG.warning(
-            f"Unknown param for message {i+1} in {path} at offset {int(field.metadata('offset', default=None))}"
-        )
-        LOG.warning(
-            f"shortName/paramId: {field.metadata('shortName', default=None)}/{field.metadata('paramId', default=None)}"
-        )
-        name = field.metadata("parameterName", default=None)
-        units = field.metadata("parameterUnits", default=None)
+        LOG.warning(f"Unknown param for message {i+1} in {path} at offset {metadata.get('offset')}")
+        LOG.warning(f"shortName/paramId: {metadata.get('shortName')}/{metadata.get('paramId')}")
+        name = metadata.get("parameterName")
+        units = metadata.get("parameterUnits")
         LOG.warning(f"Discipline/category/parameter: {param} ({name}, {units})")
         LOG.warning(f"grib_copy -w count={i+1} {path} tmp.grib")
 
@@ -523,6 +768,9 @@ class GribIndex:
     def retrieve(self, dates: List[Any], **kwargs: Any) -> Iterator[Any]:
         """Retrieve GRIB data from the database.
 
+        The messages are read in file and offset order. Messages that are close to each
+        other in a file are read together, and the files are read concurrently.
+
         Parameters
         ----------
         dates : List[Any]
@@ -533,7 +781,7 @@ class GribIndex:
         Returns
         ------
         Iterator[Any]
-            The GRIB data matching the criteria.
+            The GRIB messages matching the criteria, as bytes-like objects.
         """
         assert not self.update
 
@@ -553,22 +801,36 @@ class GribIndex:
                 query += f" AND {k} = ?"
                 params.append(str(v))
 
-        print("SELECT", query)
-        print("SELECT", params)
+        query += " ORDER BY _path_id, _offset"
+
+        LOG.debug("SELECT %s %s", query, params)
 
         self.cursor.execute(query, params)
+
+        files = defaultdict(list)
         for path_id, offset, length in self.cursor.fetchall():
-            if path_id in self.cache:
-                file = self.cache[path_id]
-            else:
+            files[path_id].append((offset, length))
+
+        descriptors = {}
+        try:
+            for path_id in files:
                 path = self._get_path(path_id)
                 LOG.info(f"Opening {path}")
-                self.cache[path_id] = open(path, "rb")
-                file = self.cache[path_id]
+                descriptors[path_id] = os.open(path, os.O_RDONLY)
+
+            reads = [partial(_read_messages, descriptors[path_id], messages) for path_id, messages in files.items()]
+
+            if len(reads) > 1:
+                with ThreadPoolExecutor(max_workers=min(READ_THREADS, len(reads))) as executor:
+                    results = list(executor.map(lambda read: read(), reads))
+            else:
+                results = [read() for read in reads]
+        finally:
+            for fd in descriptors.values():
+                os.close(fd)
 
-            file.seek(offset)
-            data = file.read(length)
-            yield data
+        for messages in results:
+            yield from messages
 
 
 @legacy_source(__file__)
@@ -600,13 +862,17 @@ def execute(
         An array of retrieved GRIB fields.
     """
     index = GribIndex(indexdb)
-    result = []
 
     if flavour is not None:
         flavour = RuleBasedFlavour(flavour)
 
-    for grib in index.retrieve(dates, **kwargs):
-        field = ekd.from_source("memory", grib)[0]
+    # Decode all the messages from a single buffer
+    buffer = b"".join(index.retrieve(dates, **kwargs))
+    if not buffer:
+        return FieldArray([])
+
+    result = []
+    for field in ekd.from_source("memory", buffer):
         if flavour:
             field = flavour.apply(field)
         result.append(field)
@@ -12,6 +12,7 @@ import re
 from typing import Any
 from typing import Dict
 from typing import Generator
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Union
@@ -23,6 +24,7 @@ from earthkit.data.utils.availability import Availability
 from anemoi.datasets.create.utils import to_datetime_list
 
 from .legacy import legacy_source
+from .retrieval_cache import RetrievalCache
 
 DEBUG = False
 
@@ -135,7 +137,7 @@ def _normalise_time(t: Union[int, str]) -> str:
     """
     t = int(t)
     if t < 100:
-        t * 100
+        t *= 100
     return "{:04d}".format(t)
 
 
@@ -221,20 +223,20 @@ def _expand_mars_request(
     return requests
 
 
-def factorise_requests(
+def expand_requests(
     dates: List[datetime.datetime],
     *requests: Dict[str, Any],
     request_already_using_valid_datetime: bool = False,
     date_key: str = "date",
-) -> Generator[Dict[str, Any], None, None]:
-    """Factorizes the requests based on the given dates.
+) -> List[Dict[str, Any]]:
+    """Expands the requests for each of the given dates.
 
     Parameters
     ----------
     dates : List[datetime.datetime]
         The list of dates to be used in the requests.
     requests : Dict[str, Any]
-        The input requests to be factorized.
+        The input requests to be expanded.
     request_already_using_valid_datetime : bool, optional
         Flag indicating if the requests already use valid datetime.
     date_key : str, optional
@@ -242,8 +244,8 @@ def factorise_requests(
 
     Returns
     -------
-    Generator[Dict[str, Any], None, None]
-        Factorized requests.
+    List[Dict[str, Any]]
+        The expanded requests, each for a single base date, time and step.
     """
     updates = []
     for req in requests:
@@ -257,6 +259,22 @@ def factorise_requests(
                 date_key=date_key,
             )
 
+    return updates
+
+
+def compress_requests(updates: List[Dict[str, Any]]) -> Generator[Dict[str, Any], None, None]:
+    """Combines expanded requests into as few requests as possible.
+
+    Parameters
+    ----------
+    updates : List[Dict[str, Any]]
+        The expanded requests.
+
+    Returns
+    -------
+    Generator[Dict[str, Any], None, None]
+        Combined requests.
+    """
     if not updates:
         return
 
@@ -268,6 +286,39 @@ def factorise_requests(
         yield r
 
 
+def factorise_requests(
+    dates: List[datetime.datetime],
+    *requests: Dict[str, Any],
+    request_already_using_valid_datetime: bool = False,
+    date_key: str = "date",
+) -> Generator[Dict[str, Any], None, None]:
+    """Factorizes the requests based on the given dates.
+
+    Parameters
+    ----------
+    dates : List[datetime.datetime]
+        The list of dates to be used in the requests.
+    requests : Dict[str, Any]
+        The input requests to be factorized.
+    request_already_using_valid_datetime : bool, optional
+        Flag indicating if the requests already use valid datetime.
+    date_key : str, optional
+        The key for the date in the requests.
+
+    Returns
+    -------
+    Generator[Dict[str, Any], None, None]
+        Factorized requests.
+    """
+    updates = expand_requests(
+        dates,
+        *requests,
+        request_already_using_valid_datetime=request_already_using_valid_datetime,
+        date_key=date_key,
+    )
+    yield from compress_requests(updates)
+
+
 def use_grib_paramid(r: Dict[str, Any]) -> Dict[str, Any]:
     """Converts the parameter short names to GRIB parameter IDs.
 
@@ -419,23 +470,64 @@ def mars(
                     "'param' cannot be 'True'. If you wrote 'param: on' in yaml, you may want to use quotes?"
                 )
 
+    context.trace("✅", f"{[str(d) for d in dates]}")
+
     if len(dates) == 0:  # When using `repeated_dates`
         assert len(requests) == 1, requests
         assert "date" in requests[0], requests[0]
         if isinstance(requests[0]["date"], datetime.date):
             requests[0]["date"] = requests[0]["date"].strftime("%Y%m%d")
-    else:
-        requests = factorise_requests(
-            dates,
-            *requests,
-            request_already_using_valid_datetime=request_already_using_valid_datetime,
+        return _retrieve(context, requests, use_cdsapi_dataset)
+
+    cache = RetrievalCache.from_config(getattr(context, "retrieval_cache", None))
+    if cache is not None:
+        # The cache is keyed by the requests for a single base date, time and step,
+        # and only the missing ones are combined and retrieved
+        ds = cache.retrieve(
+            expand_requests(
+                dates,
+                *requests,
+                request_already_using_valid_datetime=request_already_using_valid_datetime,
+                date_key=date_key,
+            ),
+            lambda missing: _retrieve(context, compress_requests(missing), use_cdsapi_dataset),
             date_key=date_key,
+            use_grib_paramid=context.use_grib_paramid,
+            use_cdsapi_dataset=use_cdsapi_dataset,
         )
+        if ds is not None:
+            return ds
+
+    requests = factorise_requests(
+        dates,
+        *requests,
+        request_already_using_valid_datetime=request_already_using_valid_datetime,
+        date_key=date_key,
+    )
+
+    return _retrieve(context, requests, use_cdsapi_dataset)
+
+
+def _retrieve(context: Any, requests: Iterable[Dict[str, Any]], use_cdsapi_dataset: Optional[str]) -> Any:
+    """Retrieves the data of MARS requests.
+
+    Parameters
+    ----------
+    context : Any
+        The context for the requests.
+    requests : Iterable[Dict[str, Any]]
+        The requests to be executed.
+    use_cdsapi_dataset : Optional[str]
+        The dataset to be used with CDS API.
 
+    Returns
+    -------
+    Any
+        The resulting dataset.
+    """
     requests = list(requests)
 
     ds = from_source("empty")
-    context.trace("✅", f"{[str(d) for d in dates]}")
     context.trace("✅", f"Will run {len(requests)} requests")
     for r in requests:
         r = {k: v for k, v in r.items() if v != ("-",)}
@@ -0,0 +1,465 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import fcntl
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from contextlib import ExitStack
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import earthkit.data as ekd
+from anemoi.utils.humanize import bytes_to_human
+from anemoi.utils.humanize import human_to_bytes
+
+LOG = logging.getLogger(__name__)
+
+# Default budget of the cache on disk
+DEFAULT_SIZE = "50GB"
+
+# The keys that identify a field within the result of a request, see `RetrievalCache.retrieve`
+FieldKey = Tuple[int, int, str]
+
+
+def _normalise(value: Any) -> Any:
+    """Normalise a value of a request, so that equivalent requests have the same key.
+
+    Parameters
+    ----------
+    value : Any
+        The value.
+
+    Returns
+    -------
+    Any
+        The normalised value.
+    """
+    if isinstance(value, (list, tuple)):
+        value = "/".join(str(v) for v in value)
+    return str(value).lower()
+
+
+def _scalar(value: Any) -> Optional[str]:
+    """Return a single value of a request as a string, or None if there are several.
+
+    Parameters
+    ----------
+    value : Any
+        The value.
+
+    Returns
+    -------
+    Optional[str]
+        The value, or None.
+    """
+    if isinstance(value, (list, tuple)):
+        if len(value) != 1:
+            return None
+        value = value[0]
+    value = str(value)
+    return None if "/" in value else value
+
+
+def request_field_key(request: Dict[str, Any], date_key: str = "date") -> Optional[FieldKey]:
+    """Return the base date, base time and step of a request that is for a single one of each.
+
+    Parameters
+    ----------
+    request : Dict[str, Any]
+        The request, as expanded by `_expand_mars_request`.
+    date_key : str, optional
+        The key for the date in the request.
+
+    Returns
+    -------
+    Optional[FieldKey]
+        The date as YYYYMMDD, the time as HHMM and the step, or None if the request covers several of them.
+    """
+    date, time, step = (_scalar(request.get(k)) for k in (date_key, "time", "step"))
+    if date is None or time is None or step is None:
+        return None
+
+    time = int(time)
+    if time < 100:
+        time *= 100
+
+    return int(date.replace("-", "")), time, step
+
+
+def split_request(request: Dict[str, Any], date_key: str = "date") -> List[Dict[str, Any]]:
+    """Split a request into one request per base date, base time and step.
+
+    Parameters
+    ----------
+    request : Dict[str, Any]
+        The request.
+    date_key : str, optional
+        The key for the date in the request.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The requests.
+    """
+    values = []
+    for k in (date_key, "time", "step"):
+        v = request.get(k)
+        if isinstance(v, str) and "/" in v and "to" not in v.lower():
+            v = v.split("/")
+        values.append(v if isinstance(v, (list, tuple)) else [v])
+
+    return [
+        dict(request, **{date_key: date, "time": time, "step": step}) for date, time, step in itertools.product(*values)
+    ]
+
+
+def field_keys(field: Any) -> List[FieldKey]:
+    """Return the possible keys of a field, i.e. of the requests that it can be the result of.
+
+    Parameters
+    ----------
+    field : Any
+        The GRIB field.
+
+    Returns
+    -------
+    List[FieldKey]
+        The keys, with the step as a range (e.g. 0-6) and as the end step (e.g. 6).
+    """
+    date, time, step_range, end_step = field.metadata("dataDate", "dataTime", "stepRange", "endStep")
+    return [(int(date), int(time), str(step_range)), (int(date), int(time), str(end_step))]
+
+
+class RetrievalCache:
+    """A cache of the fields retrieved by the MARS-like sources, on disk and shared by the processes of a node.
+
+    Entries are keyed by the hash of a normalised request for a single base date, base time and step
+    (as expanded by `_expand_mars_request`), so the groups of dates that need the same fields, e.g.
+    the accumulation windows and tendencies that straddle group boundaries, only retrieve them once.
+    Each entry holds the GRIB messages of the request.
+
+    Entries are written to a temporary file and renamed, and retrieved under a per-entry lock, so
+    concurrent `load --parts` workers do not retrieve the same fields twice. The budget is enforced
+    approximately, by removing the least recently used entries.
+    """
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        path : str
+            The directory of the cache. It is created if needed.
+        max_bytes : int
+            The maximum size of the cache on disk.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.statistics = dict(hits=0, misses=0, evictions=0)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Union[None, str, Dict[str, Any], "RetrievalCache"]) -> Optional["RetrievalCache"]:
+        """Create a cache from the `retrieval_cache` entry of the `build` section of a recipe.
+
+        Parameters
+        ----------
+        config : Union[None, str, Dict[str, Any], RetrievalCache]
+            None to disable the cache, the directory of the cache, or a dictionary with the keys
+            `path` and `size` (e.g. `200GB`).
+
+        Returns
+        -------
+        Optional[RetrievalCache]
+            The cache, or None.
+        """
+        if config is None or isinstance(config, RetrievalCache):
+            return config
+
+        if isinstance(config, str):
+            config = dict(path=config)
+
+        config = dict(config)
+        size = config.pop("size", DEFAULT_SIZE)
+        path = config.pop("path")
+        if config:
+            raise ValueError(f"Unknown options for the retrieval cache: {config}")
+
+        return _open_cache(path, size if isinstance(size, int) else human_to_bytes(size))
+
+    def key(self, request: Dict[str, Any], **kwargs: Any) -> str:
+        """Return the key of a request.
+
+        Parameters
+        ----------
+        request : Dict[str, Any]
+            The request.
+        **kwargs : Any
+            Other options that change the result of the request, e.g. the CDS dataset.
+
+        Returns
+        -------
+        str
+            The key.
+        """
+        normalised = {k.lower(): _normalise(v) for k, v in request.items()}
+        normalised.update({f"_{k}": _normalise(v) for k, v in kwargs.items()})
+        return hashlib.sha256(json.dumps(normalised, sort_keys=True).encode()).hexdigest()
+
+    def _file(self, key: str) -> str:
+        """The path of the file holding an entry.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry.
+
+        Returns
+        -------
+        str
+            The path of the file.
+        """
+        return os.path.join(self.path, key + ".grib")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        """Read an entry, and mark it as recently used.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry.
+
+        Returns
+        -------
+        Optional[bytes]
+            The GRIB messages, or None if the entry is not in the cache.
+        """
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        """Write an entry.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry.
+        data : bytes
+            The GRIB messages.
+        """
+        path = self._file(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _locked(self, stack: ExitStack, key: str) -> None:
+        """Take the lock of an entry until the stack is closed.
+
+        Parameters
+        ----------
+        stack : ExitStack
+            The stack holding the locks.
+        key : str
+            The key of the entry.
+        """
+        path = os.path.join(self.path, key + ".lock")
+        f = stack.enter_context(open(path, "a"))
+        fcntl.flock(f, fcntl.LOCK_EX)
+        stack.callback(fcntl.flock, f, fcntl.LOCK_UN)
+
+    def retrieve(
+        self,
+        requests: List[Dict[str, Any]],
+        fetch: Callable[[List[Dict[str, Any]]], Any],
+        date_key: str = "date",
+        **kwargs: Any,
+    ) -> Optional[Any]:
+        """Retrieve the fields of a list of requests, from the cache or with `fetch`.
+
+        Parameters
+        ----------
+        requests : List[Dict[str, Any]]
+            The requests. They are split into requests for a single base date, base time and step.
+        fetch : Callable[[List[Dict[str, Any]]], Any]
+            A function that retrieves the fields of the requests that are not in the cache.
+        date_key : str, optional
+            The key for the date in the requests.
+        **kwargs : Any
+            Other options that change the result of the requests, see `key`.
+
+        Returns
+        -------
+        Optional[Any]
+            The fields, or None if the requests cannot be cached, in which case nothing is retrieved.
+        """
+        # The requests that share a base date, base time and step (e.g. for different parameters)
+        # are stored in the same entry, as their fields are told apart by these three keys only
+        groups: Dict[FieldKey, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        for request in requests:
+            for r in split_request(request, date_key):
+                field_key = request_field_key(r, date_key)
+                if field_key is None:
+                    return None
+                groups[field_key][self.key(r, **kwargs)] = r
+
+        entries: Dict[str, FieldKey] = {}
+        keyed: Dict[str, List[Dict[str, Any]]] = {}
+        for field_key, group in groups.items():
+            key = hashlib.sha256("/".join(sorted(group)).encode()).hexdigest()
+            entries[key] = field_key
+            keyed[key] = list(group.values())
+
+        found: Dict[str, bytes] = {}
+        for key in entries:
+            data = self._read(key)
+            if data is not None:
+                found[key] = data
+
+        fetched = ekd.from_source("empty")
+        missing = sorted(k for k in entries if k not in found)
+
+        if missing:
+            with ExitStack() as stack:
+                # Sorted, so that processes that need some of the same entries cannot deadlock
+                locked = missing
+                for key in locked:
+                    self._locked(stack, key)
+
+                # Another process may have retrieved some of them while we were waiting
+                for key in locked:
+                    data = self._read(key)
+                    if data is not None:
+                        found[key] = data
+                missing = [k for k in locked if k not in found]
+
+                if missing:
+                    fetched = fetch([r for k in missing for r in keyed[k]])
+                    self._store({entries[k]: k for k in missing}, fetched)
+
+                for key in locked:
+                    try:
+                        # Processes waiting for the lock will find the entry when they get it
+                        os.unlink(os.path.join(self.path, key + ".lock"))
+                    except FileNotFoundError:
+                        pass
+
+        with self._lock:
+            self.statistics["hits"] += len(found)
+            self.statistics["misses"] += len(missing)
+
+        LOG.info(
+            "Retrieval cache: %s dates and steps, %s from the cache, %s retrieved",
+            len(entries),
+            len(found),
+            len(missing),
+        )
+
+        if not found:
+            return fetched
+
+        cached = ekd.from_source("memory", b"".join(found.values()))
+        return cached if not missing else cached + fetched
+
+    def _store(self, keys: Dict[FieldKey, str], fields: Any) -> None:
+        """Store retrieved fields in the entries of the requests they belong to.
+
+        Parameters
+        ----------
+        keys : Dict[FieldKey, str]
+            The entry of each request, by base date, base time and step.
+        fields : Any
+            The retrieved fields.
+        """
+        messages: Dict[str, List[bytes]] = defaultdict(list)
+        unknown = 0
+        for field in fields:
+            key = next((keys[k] for k in field_keys(field) if k in keys), None)
+            if key is None:
+                unknown += 1
+                continue
+            messages[key].append(field.message())
+
+        if unknown:
+            LOG.warning("Retrieval cache: %s fields do not match any request and are not cached", unknown)
+
+        # Requests that returned no fields are not cached, so they are retried
+        for key, data in messages.items():
+            self._write(key, b"".join(data))
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache is within its budget."""
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".grib"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.statistics["evictions"] += 1
+
+    def __repr__(self) -> str:
+        """Return a string representation of the cache."""
+        return f"RetrievalCache({self.path}, {bytes_to_human(self.max_bytes)})"
+
+
+_CACHES: Dict[Tuple[str, int], RetrievalCache] = {}
+
+
+def _open_cache(path: str, max_bytes: int) -> RetrievalCache:
+    """Return the cache of a directory, shared by the sources of the process.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the cache.
+    max_bytes : int
+        The maximum size of the cache on disk.
+
+    Returns
+    -------
+    RetrievalCache
+        The cache.
+    """
+    key = (os.path.abspath(path), max_bytes)
+    if key not in _CACHES:
+        _CACHES[key] = RetrievalCache(*key)
+    return _CACHES[key]
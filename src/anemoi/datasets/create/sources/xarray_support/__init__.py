@@ -8,7 +8,10 @@
 # nor does it submit to any jurisdiction.
 
 import datetime
+import json
 import logging
+import threading
+from collections import OrderedDict
 from typing import Any
 from typing import Dict
 from typing import List
@@ -17,16 +20,24 @@ from typing import Union
 
 import earthkit.data as ekd
 import xarray as xr
+from anemoi.transform.fields import new_fieldlist_from_list
 from earthkit.data.core.fieldlist import MultiFieldList
 
 from anemoi.datasets.create.sources.patterns import iterate_patterns
 from anemoi.datasets.data.stores import name_to_zarr_store
 
 from ..legacy import legacy_source
+from .block import XArrayBlock
 from .fieldlist import XarrayFieldList
 
 LOG = logging.getLogger(__name__)
 
+# Number of opened datasets, with their analysed field lists, kept between calls to `load_one`
+CACHE_SIZE = 16
+
+_CACHE: "OrderedDict[str, XarrayFieldList]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
 
 def check(what: str, ds: xr.Dataset, paths: List[str], **kwargs: Any) -> None:
     """Checks if the dataset has the expected number of fields.
@@ -51,6 +62,128 @@ def check(what: str, ds: xr.Dataset, paths: List[str], **kwargs: Any) -> None:
         raise ValueError(f"Expected {count} fields, got {len(ds)} (kwargs={kwargs}, {what}s={paths})")
 
 
+def _open_dataset(dataset: Union[str, xr.Dataset], options: Dict[str, Any]) -> xr.Dataset:
+    """Opens a dataset with xarray.
+
+    Parameters
+    ----------
+    dataset : Union[str, xr.Dataset]
+        The path or URL of the dataset, or an already opened dataset.
+    options : Dict[str, Any]
+        Additional options for opening the dataset.
+
+    Returns
+    -------
+    xr.Dataset
+        The opened dataset.
+    """
+    if isinstance(dataset, xr.Dataset):
+        return dataset
+
+    if ".zarr" in dataset:
+        return xr.open_zarr(name_to_zarr_store(dataset), **options)
+
+    if "planetarycomputer" in dataset:
+        store = name_to_zarr_store(dataset)
+        if "store" in store:
+            return xr.open_zarr(**store)
+        if "filename_or_obj" in store:
+            return xr.open_dataset(**store)
+
+    return xr.open_dataset(dataset, **options)
+
+
+def _cache_key(
+    dataset: Union[str, xr.Dataset],
+    options: Dict[str, Any],
+    flavour: Optional[Union[str, Dict[str, Any]]],
+    patch: Optional[Any],
+) -> Optional[str]:
+    """Returns the key of a dataset in the cache, or None if it cannot be cached.
+
+    Parameters
+    ----------
+    dataset : Union[str, xr.Dataset]
+        The path or URL of the dataset, or an already opened dataset.
+    options : Dict[str, Any]
+        Additional options for opening the dataset.
+    flavour : Optional[Union[str, Dict[str, Any]]]
+        Flavour of the dataset.
+    patch : Optional[Any]
+        Patch for the dataset.
+
+    Returns
+    -------
+    Optional[str]
+        The key, or None.
+    """
+    if not isinstance(dataset, str):
+        return None
+
+    try:
+        return json.dumps([dataset, options, flavour, patch], sort_keys=True, default=repr)
+    except TypeError:
+        return None
+
+
+def open_field_list(
+    dataset: Union[str, xr.Dataset],
+    *,
+    options: Optional[Dict[str, Any]] = None,
+    flavour: Optional[Union[str, Dict[str, Any]]] = None,
+    patch: Optional[Any] = None,
+) -> XarrayFieldList:
+    """Opens a dataset and analyses its coordinates, or returns them from the cache.
+
+    Building the field list of a dataset (guessing the flavour, the coordinates and the grid)
+    is expensive, and `load_one` is called once per group of dates, so the most recently used
+    datasets are kept for the lifetime of the process (see `CACHE_SIZE`).
+
+    Parameters
+    ----------
+    dataset : Union[str, xr.Dataset]
+        The path or URL of the dataset, or an already opened dataset.
+    options : Dict[str, Any], optional
+        Additional options for opening the dataset.
+    flavour : Optional[Union[str, Dict[str, Any]]], optional
+        Flavour of the dataset.
+    patch : Optional[Any], optional
+        Patch for the dataset.
+
+    Returns
+    -------
+    XarrayFieldList
+        The field list of the dataset.
+    """
+    if options is None:
+        options = {}
+
+    key = _cache_key(dataset, options, flavour, patch)
+
+    if key is not None:
+        with _CACHE_LOCK:
+            if key in _CACHE:
+                _CACHE.move_to_end(key)
+                return _CACHE[key]
+
+    fs = XarrayFieldList.from_xarray(_open_dataset(dataset, options), flavour=flavour, patch=patch)
+
+    if key is not None and CACHE_SIZE > 0:
+        with _CACHE_LOCK:
+            _CACHE[key] = fs
+            while len(_CACHE) > CACHE_SIZE:
+                evicted, _ = _CACHE.popitem(last=False)
+                LOG.debug("Evicting %s from the cache of xarray datasets", evicted)
+
+    return fs
+
+
+def clear_cache() -> None:
+    """Empties the cache of opened datasets."""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
 def load_one(
     emoji: str,
     context: Any,
@@ -103,24 +236,16 @@ def load_one(
 
     context.trace(emoji, dataset, options, kwargs)
 
-    if isinstance(dataset, str) and ".zarr" in dataset:
-        data = xr.open_zarr(name_to_zarr_store(dataset), **options)
-    elif "planetarycomputer" in dataset:
-        store = name_to_zarr_store(dataset)
-        if "store" in store:
-            data = xr.open_zarr(**store)
-        if "filename_or_obj" in store:
-            data = xr.open_dataset(**store)
-    else:
-        data = xr.open_dataset(dataset, **options)
-
-    fs = XarrayFieldList.from_xarray(data, flavour=flavour, patch=patch)
+    fs = open_field_list(dataset, options=options, flavour=flavour, patch=patch)
 
     if len(dates) == 0:
         result = fs.sel(**kwargs)
     else:
-        print("dates", dates, kwargs)
-        result = MultiFieldList([fs.sel(valid_datetime=date, **kwargs) for date in dates])
+        LOG.debug("Selecting %s for dates %s", kwargs, dates)
+        # The fields of the group are loaded together, see XArrayBlock
+        fields = list(MultiFieldList([fs.sel(valid_datetime=date, **kwargs) for date in dates]))
+        XArrayBlock.attach(fields)
+        result = new_fieldlist_from_list(fields)
 
     if len(result) == 0:
         LOG.warning(f"No data found for {dataset} and dates {dates} and {kwargs}")
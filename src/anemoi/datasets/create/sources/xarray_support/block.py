@@ -0,0 +1,130 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import xarray as xr
+from anemoi.utils.humanize import bytes_to_human
+from numpy.typing import NDArray
+
+from .field import XArrayField
+
+LOG = logging.getLogger(__name__)
+
+
+class XArrayBlock:
+    """The values of several fields selected from the same data array, loaded at once.
+
+    Reading the fields one by one from a dask or zarr backed dataset builds a task graph and reads
+    the chunks for every field. A block reads the outer product of the indices of its fields
+    (e.g. dates x levels x members) with a single `isel`, and each field is a slice of it.
+    """
+
+    def __init__(self, array: xr.DataArray, fields: List[XArrayField]) -> None:
+        """Initialize the block.
+
+        Parameters
+        ----------
+        array : xr.DataArray
+            The data array of the dataset the fields are selected from.
+        fields : List[XArrayField]
+            The fields, with their positions in the data array.
+        """
+        self.array = array
+        self.indices: Dict[str, NDArray[Any]] = {
+            dim: np.unique([f.position[dim] for f in fields]) for dim in fields[0].position
+        }
+        self._values: Optional[NDArray[Any]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def attach(cls, fields: Iterable[Any]) -> List["XArrayBlock"]:
+        """Group fields by data array, and attach a block to each group of more than one field.
+
+        Parameters
+        ----------
+        fields : Iterable[Any]
+            The fields. Fields that are not selections of an xarray dataset are ignored.
+
+        Returns
+        -------
+        List[XArrayBlock]
+            The blocks.
+        """
+        groups: Dict[Tuple[int, Tuple[str, ...]], List[XArrayField]] = defaultdict(list)
+        for field in fields:
+            if isinstance(field, XArrayField) and field.position is not None and field.block is None:
+                groups[(id(field.owner.root), field.selection.dims)].append(field)
+
+        blocks = []
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            block = cls(group[0].owner.root, group)
+            for field in group:
+                field.block = block
+            blocks.append(block)
+
+        return blocks
+
+    def load(self) -> NDArray[Any]:
+        """Load the values of the block, the first time it is called.
+
+        Returns
+        -------
+        NDArray[Any]
+            The values, with one dimension per dimension of the data array.
+        """
+        with self._lock:
+            if self._values is None:
+                start = time.time()
+                self._values = self.array.isel(self.indices).values
+                LOG.debug(
+                    "Loaded %s of %s %s in %.2fs",
+                    bytes_to_human(self._values.nbytes),
+                    self.array.name,
+                    self._values.shape,
+                    time.time() - start,
+                )
+            return self._values
+
+    def values(self, field: XArrayField) -> NDArray[Any]:
+        """Return the values of one of the fields of the block.
+
+        Parameters
+        ----------
+        field : XArrayField
+            The field.
+
+        Returns
+        -------
+        NDArray[Any]
+            A view of the values of the field.
+        """
+        values = self.load()
+        key = tuple(
+            int(np.searchsorted(self.indices[dim], field.position[dim])) if dim in self.indices else slice(None)
+            for dim in self.array.dims
+        )
+        return values[key]
+
+    def __repr__(self) -> str:
+        """Return a string representation of the block."""
+        return f"XArrayBlock({self.array.name}, {dict((k, len(v)) for k, v in self.indices.items())})"
@@ -12,8 +12,10 @@ from __future__ import annotations
 
 import datetime
 import logging
+from functools import cached_property
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import Union
@@ -184,6 +186,16 @@ class Coordinate:
         Optional[int]
             The index of the value in the coordinate, or None if not found.
         """
+        try:
+            index = self._lookup.get(self._keys(value)[0])
+            if index is not None:
+                return index
+        except (TypeError, ValueError):
+            # Unhashable or not comparable to the values of the coordinate
+            pass
+
+        # Not in the lookup table, the search below may still find a value that compares equal
+
         values = self.variable.values
 
         # Check if dimension is 0D
@@ -217,6 +229,16 @@ class Coordinate:
         Optional[list]
             The indices of the values in the coordinate, or None if not found.
         """
+        try:
+            index = [self._lookup.get(k) for k in self._keys(value)]
+            if None not in index:
+                return np.array(index)
+        except (TypeError, ValueError):
+            # Unhashable or not comparable to the values of the coordinate
+            pass
+
+        # Not all in the lookup table, the search below may still find values that compare equal
+
         values = self.variable.values
 
         # Check if dimension is 0D
@@ -241,6 +263,38 @@ class Coordinate:
 
         return None
 
+    def _keys(self, values: Any) -> List[Any]:
+        """Return the keys of values in the lookup table of the coordinate.
+
+        Parameters
+        ----------
+        values : Any
+            A value, or an array of values.
+
+        Returns
+        -------
+        List[Any]
+            The keys, as Python objects. Dates and durations are in nanoseconds, so that their units do not matter.
+        """
+        values = np.asarray(values)
+        if self.variable.dtype.kind == "f" and values.dtype.kind in "fiu":
+            # So that e.g. 0.995 matches the same value in a float32 coordinate
+            values = values.astype(self.variable.dtype)
+        if self.variable.dtype.kind == "M":
+            values = values.astype("datetime64[ns]")
+        if self.variable.dtype.kind == "m":
+            values = values.astype("timedelta64[ns]")
+        return values.ravel().tolist()
+
+    @cached_property
+    def _lookup(self) -> Dict[Any, int]:
+        """The index of each value of the coordinate, built once."""
+        lookup: Dict[Any, int] = {}
+        for i, key in enumerate(self._keys(self.variable.values)):
+            # Keep the first occurrence, as a search would
+            lookup.setdefault(key, i)
+        return lookup
+
     @property
     def name(self) -> str:
         """Get the name of the coordinate."""
@@ -62,7 +62,7 @@ class EmptyFieldList:
 class XArrayField(Field):
     """A class to represent a field in an XArray dataset."""
 
-    def __init__(self, owner: Any, selection: Any) -> None:
+    def __init__(self, owner: Any, selection: Any, position: Optional[Dict[str, int]] = None) -> None:
         """Create a new XArrayField object.
 
         Parameters
@@ -73,9 +73,16 @@ class XArrayField(Field):
             A 2D sub-selection of the variable's underlying array.
             This is actually a nD object, but the first dimensions are always 1.
             The other two dimensions are latitude and longitude.
+        position : Optional[Dict[str, int]], optional
+            The indices of the selection in the variable of the dataset, along the dimensions
+            that are not dimensions of the selection. Needed to load the field as part of a block.
         """
         self.owner = owner
         self.selection = selection
+        self.position = position
+
+        # Set by `XArrayBlock.attach`
+        self.block = None
 
         # Copy the metadata from the owner
         self._md = owner._metadata.copy()
@@ -127,6 +134,8 @@ class XArrayField(Field):
         assert dtype is None
 
         if flatten:
+            if index is None and self.block is not None:
+                return self.block.values(self).flatten()
             return values.values.flatten()
 
         return values  # .reshape(self.shape)
@@ -0,0 +1,216 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+from __future__ import annotations
+
+import datetime
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+from anemoi.utils.dates import as_datetime
+from earthkit.data.utils.dates import to_datetime
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    from .coordinates import Coordinate
+    from .variable import Variable
+
+LOG = logging.getLogger(__name__)
+
+
+def coordinate_values(coordinate: Coordinate) -> NDArray[Any]:
+    """Return the values of a coordinate, as they appear in the metadata of the fields.
+
+    Parameters
+    ----------
+    coordinate : Coordinate
+        The coordinate.
+
+    Returns
+    -------
+    NDArray[Any]
+        An array of objects with the shape of the coordinate, see also `extract_single_value`.
+    """
+    values = np.asarray(coordinate.variable.values)
+
+    if np.issubdtype(values.dtype, np.datetime64):
+        converted = [to_datetime(v) for v in values.ravel()]
+    elif np.issubdtype(values.dtype, np.timedelta64):
+        converted = [datetime.timedelta(seconds=int(v)) for v in values.astype("timedelta64[s]").astype(int).ravel()]
+    else:
+        converted = values.ravel().tolist()
+
+    result = np.empty(len(converted), dtype=object)
+    result[:] = [coordinate.normalise(v) for v in converted]
+    return result.reshape(values.shape)
+
+
+class FieldIndex:
+    """An index of the metadata of the fields of a variable of a dataset.
+
+    For each metadata key, the index maps each value to the positions of the fields that have it.
+    The positions are those of the fields in the variable of the dataset, so the index is built once
+    and shared by all the selections made from that variable (see `Variable.sel`), which can then
+    be filtered on any metadata (e.g. `date`, `time` or `step`) without creating their fields.
+    """
+
+    def __init__(self, variable: Variable) -> None:
+        """Initialize the index.
+
+        Parameters
+        ----------
+        variable : Variable
+            The variable of the dataset, before any selection.
+        """
+        self.variable = variable
+        self.names = list(variable.names)
+        self.shape = variable.shape
+        self._lookup: Optional[Dict[str, Dict[Any, NDArray[np.int64]]]] = None
+        self._lock = threading.Lock()
+
+    def _coordinate_columns(self) -> Dict[str, NDArray[Any]]:
+        """Return the value of each coordinate for each field, for the coordinates that are scalar in the fields.
+
+        Returns
+        -------
+        Dict[str, NDArray[Any]]
+            The values of the coordinates, indexed by the position of the fields.
+        """
+        variable = self.variable
+        indices = dict(zip(self.names, np.unravel_index(np.arange(variable.length), self.shape)))
+
+        columns = {}
+        for name, coordinate in variable.by_name.items():
+            key = []
+            for dim in coordinate.variable.dims:
+                if dim in indices:
+                    key.append(indices[dim])
+                elif variable.variable.sizes.get(dim) == 1:
+                    key.append(0)
+                else:
+                    # Not a scalar in the fields, e.g. a grid coordinate
+                    break
+            else:
+                values = coordinate_values(coordinate)
+                columns[name] = values[tuple(key)] if key else np.full(variable.length, values[()], dtype=object)
+
+        return columns
+
+    def _build(self) -> Dict[str, Dict[Any, NDArray[np.int64]]]:
+        """Build the index, by computing the metadata of every field as `XArrayMetadata` would.
+
+        Returns
+        -------
+        Dict[str, Dict[Any, NDArray[np.int64]]]
+            The positions of the fields for each metadata key and value.
+        """
+        start = time.time()
+        variable = self.variable
+        columns = self._coordinate_columns()
+
+        lookup: Dict[str, Dict[Any, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for i in range(variable.length):
+            md = variable._metadata.copy()
+            md.update((name, column[i]) for name, column in columns.items())
+
+            metadata = md.copy()
+            valid_datetime = variable.time.fill_time_metadata(md, metadata)
+            if valid_datetime is not None:
+                metadata["valid_datetime"] = as_datetime(valid_datetime).isoformat()
+
+            for k, v in metadata.items():
+                try:
+                    lookup[k][v].append(i)
+                except TypeError:
+                    # Unhashable values are not indexed
+                    pass
+
+        LOG.debug("Indexed %s fields of %s in %.2fs", variable.length, variable.name, time.time() - start)
+        return {k: {v: np.array(p, dtype=np.int64) for v, p in values.items()} for k, values in lookup.items()}
+
+    @property
+    def lookup(self) -> Dict[str, Dict[Any, NDArray[np.int64]]]:
+        """The positions of the fields for each metadata key and value, built on first use."""
+        with self._lock:
+            if self._lookup is None:
+                self._lookup = self._build()
+            return self._lookup
+
+    def positions(self, variable: Variable) -> Optional[NDArray[np.int64]]:
+        """Return the positions in the index of the fields of a selection of the variable.
+
+        Parameters
+        ----------
+        variable : Variable
+            A selection of the variable, or the variable itself.
+
+        Returns
+        -------
+        Optional[NDArray[np.int64]]
+            The position of each field of the selection, or None if they cannot be determined.
+        """
+        if not self.names:
+            return np.zeros(variable.length, dtype=np.int64)
+
+        axes = []
+        for name, n in zip(self.names, self.shape):
+            axes.append(np.atleast_1d(variable._positions.get(name, np.arange(n))))
+
+        if math.prod(len(a) for a in axes) != variable.length:
+            return None
+
+        return np.ravel_multi_index(np.meshgrid(*axes, indexing="ij"), self.shape).ravel()
+
+    def select(self, variable: Variable, **kwargs: Any) -> Optional[NDArray[np.int64]]:
+        """Return the indices of the fields of a selection of the variable that match the given metadata.
+
+        Parameters
+        ----------
+        variable : Variable
+            A selection of the variable, or the variable itself.
+        **kwargs : Any
+            The metadata to match.
+
+        Returns
+        -------
+        Optional[NDArray[np.int64]]
+            The indices of the matching fields in the selection, or None if the index cannot be used.
+        """
+        positions = self.positions(variable)
+        if positions is None:
+            return None
+
+        lookup = self.lookup
+        mask = np.ones(len(positions), dtype=bool)
+
+        for k, v in kwargs.items():
+            if v is None:
+                return None
+            if k not in lookup:
+                # None of the fields have that key
+                return np.array([], dtype=np.int64)
+            try:
+                matching = lookup[k].get(v)
+            except TypeError:
+                return None
+            if matching is None:
+                return np.array([], dtype=np.int64)
+            mask &= np.isin(positions, matching)
+
+        return np.nonzero(mask)[0]
@@ -21,6 +21,7 @@ import numpy as np
 import xarray as xr
 
 from .field import XArrayField
+from .index import FieldIndex
 
 LOG = logging.getLogger(__name__)
 
@@ -53,6 +54,9 @@ class Variable:
         grid: Any,
         time: Any,
         metadata: Dict[str, Any],
+        root: Optional[xr.DataArray] = None,
+        positions: Optional[Dict[str, Any]] = None,
+        index: Optional[FieldIndex] = None,
     ):
         """Initialize the Variable object.
 
@@ -70,9 +74,19 @@ class Variable:
             The time dimension associated with the variable.
         metadata : Dict[str, Any]
             Metadata associated with the variable.
+        root : Optional[xr.DataArray], optional
+            The data array of the dataset this variable is a selection of, by default the variable itself.
+        positions : Optional[Dict[str, Any]], optional
+            The positions of the selection along the dimensions of `root` that have been selected,
+            as integers or arrays of integers.
+        index : Optional[FieldIndex], optional
+            The index of the metadata of the fields of `root`, by default built on first use.
         """
         self.ds = ds
         self.variable = variable
+        self.root = variable if root is None else root
+        self._positions = {} if positions is None else positions
+        self._index = index
 
         self.grid = grid
         self.coordinates = coordinates
@@ -91,6 +105,13 @@ class Variable:
 
         self.length = math.prod(self.shape)
 
+    @property
+    def index(self) -> FieldIndex:
+        """The index of the metadata of the fields, shared by all the selections of the variable."""
+        if self._index is None:
+            self._index = FieldIndex(self)
+        return self._index
+
     @property
     def name(self) -> str:
         """Return the name of the variable."""
@@ -171,7 +192,30 @@ class Variable:
 
         coords = np.unravel_index(i, self.shape)
         kwargs = {k: v for k, v in zip(self.names, coords)}
-        return XArrayField(self, self.variable.isel(kwargs))
+        return XArrayField(self, self.variable.isel(kwargs), position=self._position(kwargs))
+
+    def _position(self, kwargs: Dict[str, int]) -> Optional[Dict[str, int]]:
+        """Return the position of a field in `root`.
+
+        Parameters
+        ----------
+        kwargs : Dict[str, int]
+            The indices of the field along the dimensions of the variable.
+
+        Returns
+        -------
+        Optional[Dict[str, int]]
+            The index of the field along each dimension of `root` that is not a dimension of the field,
+            or None if the field does not span the whole of its remaining dimensions.
+        """
+        position = self._positions.copy()
+        for k, i in kwargs.items():
+            position[k] = self._positions[k][i] if k in self._positions else i
+
+        if not all(isinstance(i, (int, np.integer)) for i in position.values()):
+            return None
+
+        return {k: int(i) for k, i in position.items()}
 
     def sel(self, missing: Dict[str, Any], **kwargs: Any) -> Optional["Variable"]:
         """Select a subset of the variable based on the given coordinates.
@@ -222,6 +266,9 @@ class Variable:
         metadata = self._metadata.copy()
         metadata.update({k: v})
 
+        positions = self._positions.copy()
+        positions[k] = self._positions[k][i] if k in self._positions else i
+
         variable = Variable(
             ds=self.ds,
             variable=self.variable.isel({k: i}),
@@ -229,6 +276,9 @@ class Variable:
             grid=self.grid,
             time=self.time,
             metadata=metadata,
+            root=self.root,
+            positions=positions,
+            index=self.index,
         )
 
         return variable.sel(missing, **kwargs)
@@ -287,6 +337,11 @@ class FilteredVariable:
     @cached_property
     def fields(self) -> List["XArrayField"]:
         """Filter the fields of a variable based on metadata."""
+        indices = self.variable.index.select(self.variable, **self.kwargs)
+        if indices is not None:
+            return [self.variable[i] for i in indices]
+
+        # The index cannot be used, e.g. for keys that are not in the metadata
         return [
             field
             for field in self.variable
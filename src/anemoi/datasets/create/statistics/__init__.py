@@ -8,29 +8,31 @@
 # nor does it submit to any jurisdiction.
 
 import datetime
-import glob
-import hashlib
 import json
 import logging
 import os
-import pickle
 import shutil
-import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from typing import Any
 from typing import List
 from typing import Optional
 from typing import Union
 
 import numpy as np
-import tqdm
 from anemoi.utils.provenance import gather_provenance_info
 from numpy.typing import NDArray
 
+from ..check import check_data_statistics
 from ..check import check_data_values
+from .accumulator import StatisticsAccumulator
 from .summary import Summary
 
 LOG = logging.getLogger(__name__)
 
+# Number of values processed at once when computing statistics, sized to stay in the CPU caches
+STATISTICS_BLOCK_SIZE = 256 * 1024
+
 
 def default_statistics_dates(dates: list[datetime.datetime]) -> tuple[datetime.datetime, datetime.datetime]:
     """Calculate default statistics dates based on the given list of dates.
@@ -113,57 +115,6 @@ def to_datetimes(dates: list[Union[str, datetime.datetime]]) -> list[np.datetime
     return [to_datetime(d) for d in dates]
 
 
-def fix_variance(x: float, name: str, count: NDArray[Any], sums: NDArray[Any], squares: NDArray[Any]) -> float:
-    """Fix negative variance values due to numerical errors.
-
-    Parameters
-    ----------
-    x : float
-        The variance value.
-    name : str
-        The variable name.
-    count : numpy.ndarray
-        The count array.
-    sums : numpy.ndarray
-        The sums array.
-    squares : numpy.ndarray
-        The squares array.
-
-    Returns
-    -------
-    float
-        The fixed variance value.
-    """
-    assert count.shape == sums.shape == squares.shape
-    assert isinstance(x, float)
-
-    mean = sums / count
-    assert mean.shape == count.shape
-
-    if x >= 0:
-        return x
-
-    LOG.warning(f"Negative variance for {name=}, variance={x}")
-    magnitude = np.sqrt((squares / count + mean * mean) / 2)
-    LOG.warning(f"square / count - mean * mean =  {squares/count} - {mean*mean} = {squares/count - mean*mean}")
-    LOG.warning(f"Variable span order of magnitude is {magnitude}.")
-    LOG.warning(f"Count is {count}.")
-
-    variances = squares / count - mean * mean
-    assert variances.shape == squares.shape == mean.shape
-    if np.all(variances >= 0):
-        LOG.warning(f"All individual variances for {name} are positive, setting variance to 0.")
-        return 0
-
-    # if abs(x) < magnitude * 1e-6 and abs(x) < range * 1e-6:
-    #     LOG.warning("Variance is negative but very small.")
-    #     variances = squares / count - mean * mean
-    #     return 0
-
-    LOG.warning(f"ERROR at least one individual variance is negative ({np.nanmin(variances)}).")
-    return 0
-
-
 def check_variance(
     x: NDArray[Any],
     variables_names: list[str],
@@ -220,10 +171,81 @@ def check_variance(
     raise ValueError("Negative variance")
 
 
+def _variable_statistics(values: NDArray[Any]) -> tuple[np.ndarray, ...]:
+    """Compute the statistics of one variable, in a single pass over the data.
+
+    The values are processed in blocks that fit in the CPU caches, and all the statistics
+    of a block are computed while it is in the cache. The mean and the sum of squared
+    deviations from the mean (M2) of each block are merged into the running ones with
+    the parallel algorithm of Chan et al., which is stable even when the mean is large
+    compared to the spread of the values.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The values of the variable, of shape (dates, points).
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        The minimum, maximum, sum, sum of squares, mean, M2 and number of NaNs for each date.
+    """
+    ndates, npoints = values.shape
+
+    minimum = np.full(ndates, np.nan, dtype=np.float64)
+    maximum = np.full(ndates, np.nan, dtype=np.float64)
+    sums = np.zeros(ndates, dtype=np.float64)
+    mean = np.zeros(ndates, dtype=np.float64)
+    m2 = np.zeros(ndates, dtype=np.float64)
+    count = np.zeros(ndates, dtype=np.int64)
+    nans = np.zeros(ndates, dtype=np.int64)
+
+    step = max(1, STATISTICS_BLOCK_SIZE // max(1, ndates))
+    for start in range(0, npoints, step):
+        block = values[:, start : start + step]
+        isnan = np.isnan(block)
+        n = isnan.sum(axis=1)
+        size = block.shape[1] - n
+
+        if n.any():
+            # fmin/fmax ignore NaNs
+            minimum = np.fmin(minimum, np.fmin.reduce(block, axis=1))
+            maximum = np.fmax(maximum, np.fmax.reduce(block, axis=1))
+            block = np.where(isnan, 0, block)
+            nans += n
+        else:
+            isnan = None
+            minimum = np.fmin(minimum, block.min(axis=1))
+            maximum = np.fmax(maximum, block.max(axis=1))
+
+        bsum = block.sum(axis=1, dtype=np.float64)
+        bmean = np.divide(bsum, size, out=np.zeros(ndates), where=size > 0)
+
+        deviations = block - bmean[:, np.newaxis]
+        if isnan is not None:
+            deviations[isnan] = 0
+        bm2 = np.einsum("ij,ij->i", deviations, deviations)
+
+        total = count + size
+        weight = np.divide(size, total, out=np.zeros(ndates), where=total > 0)
+        delta = bmean - mean
+        mean += delta * weight
+        m2 += bm2 + delta * delta * count * weight
+        count = total
+        sums += bsum
+
+    squares = m2 + sums * mean
+
+    return minimum, maximum, sums, squares, mean, m2, nans
+
+
 def compute_statistics(
-    array: NDArray[Any], check_variables_names: Optional[List[str]] = None, allow_nans: bool = False
+    array: NDArray[Any],
+    check_variables_names: Optional[List[str]] = None,
+    allow_nans: bool = False,
+    threads: Optional[int] = None,
 ) -> dict[str, np.ndarray]:
-    """Compute statistics for a given array, provides minimum, maximum, sum, squares, count and has_nans as a dictionary.
+    """Compute statistics for a given array, provides minimum, maximum, sum, squares, mean, m2, count and has_nans.
 
     Parameters
     ----------
@@ -233,6 +255,8 @@ def compute_statistics(
         List of variable names to check. Defaults to None.
     allow_nans : bool, optional
         Whether to allow NaN values. Defaults to False.
+    threads : int, optional
+        Number of threads used to process the variables concurrently. Defaults to the number of CPUs.
 
     Returns
     -------
@@ -245,31 +269,38 @@ def compute_statistics(
     LOG.debug(f"Stats {nvars}, {array.shape}, {check_variables_names}")
     if check_variables_names:
         assert nvars == len(check_variables_names), (nvars, check_variables_names)
-    stats_shape = (array.shape[0], nvars)
-
-    count = np.zeros(stats_shape, dtype=np.int64)
-    sums = np.zeros(stats_shape, dtype=np.float64)
-    squares = np.zeros(stats_shape, dtype=np.float64)
-    minimum = np.zeros(stats_shape, dtype=np.float64)
-    maximum = np.zeros(stats_shape, dtype=np.float64)
-    has_nans = np.zeros(stats_shape, dtype=np.bool_)
-
-    for i, chunk in tqdm.tqdm(enumerate(array), delay=1, total=array.shape[0], desc="Computing statistics"):
-        values = chunk.reshape((nvars, -1))
-
-        for j, name in enumerate(check_variables_names):
-            check_data_values(values[j, :], name=name, allow_nans=allow_nans)
-            if np.isnan(values[j, :]).all():
-                # LOG.warning(f"All NaN values for {name} ({j}) for date {i}")
-                LOG.warning(f"All NaN values for {name} ({j}) for date {i}")
 
-        # Ignore NaN values
-        minimum[i] = np.nanmin(values, axis=1)
-        maximum[i] = np.nanmax(values, axis=1)
-        sums[i] = np.nansum(values, axis=1)
-        squares[i] = np.nansum(values * values, axis=1)
-        count[i] = np.sum(~np.isnan(values), axis=1)
-        has_nans[i] = np.isnan(values).any()
+    if threads is None:
+        threads = os.cpu_count() or 1
+    threads = max(1, min(threads, nvars))
+
+    def _(j: int) -> tuple[np.ndarray, ...]:
+        return _variable_statistics(array[:, j].reshape(array.shape[0], -1))
+
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(_, range(nvars)))
+    else:
+        results = [_(j) for j in range(nvars)]
+
+    minimum, maximum, sums, squares, mean, m2, nans = (np.stack(r, axis=1) for r in zip(*results))
+    count = int(np.prod(array.shape[2:])) - nans
+
+    # A date has NaNs if any of its variables has NaNs
+    has_nans = np.repeat((nans > 0).any(axis=1, keepdims=True), nvars, axis=1)
+
+    for j, name in enumerate(check_variables_names or []):
+        for i in range(array.shape[0]):
+            check_data_statistics(
+                minimum=minimum[i, j],
+                maximum=maximum[i, j],
+                count=count[i, j],
+                nans=nans[i, j],
+                name=name,
+                allow_nans=allow_nans,
+            )
+            if count[i, j] == 0:
+                LOG.warning(f"All NaN values for {name} ({j}) for date {i}")
 
     LOG.info(f"Statistics computed for {nvars} variables.")
 
@@ -278,6 +309,8 @@ def compute_statistics(
         "maximum": maximum,
         "sums": sums,
         "squares": squares,
+        "mean": mean,
+        "m2": m2,
         "count": count,
         "has_nans": has_nans,
     }
@@ -286,10 +319,14 @@ def compute_statistics(
 class TmpStatistics:
     """Temporary statistics storage class."""
 
-    version = 3
-    # Used in parrallel, during data loading,
-    # to write statistics in pickled npz files.
-    # can provide statistics for a subset of dates.
+    version = 4
+    # Used in parrallel, during data loading, to write the statistics of each date
+    # in a columnar store: one array per statistic, of shape (dates, variables),
+    # in which each group writes the rows of its own dates.
+    # Can provide statistics for any subset of dates.
+
+    NAMES = ["minimum", "maximum", "sums", "squares", "mean", "m2", "count", "has_nans"]
+    DTYPES = dict(count=np.int64, has_nans=np.bool_)
 
     def __init__(self, dirname: str, overwrite: bool = False) -> None:
         """Initialize TmpStatistics.
@@ -299,7 +336,7 @@ class TmpStatistics:
         dirname : str
             Directory name for storing statistics.
         overwrite : bool, optional
-            Whether to overwrite existing files. Defaults to False.
+            Whether to overwrite the statistics of dates already written. Defaults to False.
         """
         self.dirname = dirname
         self.overwrite = overwrite
@@ -330,6 +367,36 @@ class TmpStatistics:
         """
         os.makedirs(self.dirname, exist_ok=exist_ok)
 
+    def allocate(self, dates: NDArray[np.datetime64], variables_names: List[str]) -> None:
+        """Create the arrays of the store, for all the dates of the dataset.
+
+        Parameters
+        ----------
+        dates : numpy.ndarray
+            The dates of the dataset.
+        variables_names : list of str
+            The names of the variables.
+        """
+        self.create(exist_ok=True)
+        shape = (len(dates), len(variables_names))
+
+        for name in self.NAMES:
+            array = np.lib.format.open_memmap(
+                self._path(name), mode="w+", dtype=self.DTYPES.get(name, np.float64), shape=shape
+            )
+            del array
+
+        # Set to 1 once the statistics of a date have been written
+        written = np.lib.format.open_memmap(self._path("written"), mode="w+", dtype=np.uint8, shape=(len(dates),))
+        del written
+
+        np.save(self._path("dates"), np.asarray(dates, dtype="datetime64[s]"))
+
+        with open(os.path.join(self.dirname, "layout.json"), "w") as f:
+            json.dump(dict(version=self.version, variables_names=list(variables_names)), f)
+
+        LOG.debug(f"Allocated statistics for {shape[0]} dates and {shape[1]} variables in {self.dirname}")
+
     def delete(self) -> None:
         """Delete the directory for storing statistics."""
         try:
@@ -337,47 +404,127 @@ class TmpStatistics:
         except FileNotFoundError:
             pass
 
-    def write(self, key: str, data: any, dates: list[datetime.datetime]) -> None:
-        """Write statistics data to a file.
+    def _path(self, name: str) -> str:
+        """Return the path of the array of a statistic.
 
         Parameters
         ----------
-        key : str
-            The key for the data.
-        data : any
-            The data to write.
+        name : str
+            The name of the statistic.
+
+        Returns
+        -------
+        str
+            The path.
+        """
+        return os.path.join(self.dirname, f"{name}.npy")
+
+    def _open(self, name: str, mode: str = "r") -> np.memmap:
+        """Memory-map the array of a statistic.
+
+        Parameters
+        ----------
+        name : str
+            The name of the statistic.
+        mode : str, optional
+            The mode. Defaults to read-only.
+
+        Returns
+        -------
+        numpy.memmap
+            The array.
+        """
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No statistics array found in {self.dirname}, it may have been initialised by an older version."
+            )
+        return np.load(path, mmap_mode=mode)
+
+    @cached_property
+    def dates(self) -> NDArray[np.datetime64]:
+        """The dates of the store."""
+        return np.array(self._open("dates"))
+
+    def _pwrite(self, name: str, rows: NDArray[Any], data: NDArray[Any]) -> None:
+        """Write rows of the array of a statistic.
+
+        Each contiguous run of rows is written with a single positioned write, so that
+        concurrent writers of other rows, possibly on other hosts, are not affected.
+
+        Parameters
+        ----------
+        name : str
+            The name of the statistic.
+        rows : numpy.ndarray
+            The sorted positions of the rows.
+        data : numpy.ndarray
+            The values of the rows.
+        """
+        array = self._open(name)
+        data = np.ascontiguousarray(data, dtype=array.dtype)
+        offset, rowsize = array.offset, array.itemsize * int(np.prod(array.shape[1:]))
+        del array
+
+        fd = os.open(self._path(name), os.O_WRONLY)
+        try:
+            # Split the rows into contiguous runs
+            breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+            for start, end in zip(np.r_[0, breaks], np.r_[breaks, len(rows)]):
+                os.pwrite(fd, data[start:end].tobytes(), offset + int(rows[start]) * rowsize)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def write(self, indexes: Any, data: dict[str, NDArray[Any]], dates: list[datetime.datetime]) -> None:
+        """Write statistics data of some dates to the store.
+
+        Parameters
+        ----------
+        indexes : Any
+            The positions of the dates in the dataset.
+        data : dict of str to numpy.ndarray
+            The statistics, as returned by `compute_statistics`.
         dates : list of datetime.datetime
             List of dates associated with the data.
         """
-        self.create(exist_ok=True)
-        h = hashlib.sha256(str(dates).encode("utf-8")).hexdigest()
-        path = os.path.join(self.dirname, f"{h}.npz")
+        rows = np.asarray(indexes, dtype=np.int64)
+        assert len(rows) == len(dates), (len(rows), len(dates))
+        assert np.all(self.dates[rows] == to_datetimes(dates)), "Dates do not match the positions in the store"
+
+        order = np.argsort(rows)
+        rows = rows[order]
 
         if not self.overwrite:
-            assert not os.path.exists(path), f"{path} already exists"
+            written = self._open("written")[rows]
+            assert not written.any(), f"Statistics already written for {self.dates[rows][written > 0]}"
+
+        for name in self.NAMES:
+            self._pwrite(name, rows, np.asarray(data[name])[order])
+
+        # Flag the dates last, so that readers never see partial statistics
+        self._pwrite("written", rows, np.ones(len(rows), dtype=np.uint8))
 
-        tmp_path = path + f".tmp-{os.getpid()}-on-{socket.gethostname()}"
-        with open(tmp_path, "wb") as f:
-            pickle.dump((key, dates, data), f)
-        shutil.move(tmp_path, path)
+        LOG.debug(f"Written statistics data for {len(dates)} dates in {self.dirname} ({dates})")
 
-        LOG.debug(f"Written statistics data for {len(dates)} dates in {path} ({dates})")
+    def read(self, rows: NDArray[Any]) -> dict[str, NDArray[Any]]:
+        """Read the statistics of some dates.
 
-    def _gather_data(self) -> tuple[str, list[datetime.datetime], dict]:
-        """Gather data from stored files.
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            The positions of the dates in the store.
 
-        Yields
-        ------
-        tuple of str, list of datetime.datetime, dict
-            A tuple containing key, dates, and data.
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            The statistics, with an additional `written` flag for each date.
         """
-        # use glob to read all pickles
-        files = glob.glob(self.dirname + "/*.npz")
-        LOG.debug(f"Reading stats data, found {len(files)} files in {self.dirname}")
-        assert len(files) > 0, f"No files found in {self.dirname}"
-        for f in files:
-            with open(f, "rb") as f:
-                yield pickle.load(f)
+        result = {}
+        for name in self.NAMES + ["written"]:
+            # Read the whole array sequentially, then select the rows
+            result[name] = np.array(self._open(name))[rows]
+        return result
 
     def get_aggregated(self, *args: Any, **kwargs: Any) -> Summary:
         """Get aggregated statistics.
@@ -411,8 +558,6 @@ class TmpStatistics:
 class StatAggregator:
     """Statistics aggregator class."""
 
-    NAMES = ["minimum", "maximum", "sums", "squares", "count", "has_nans"]
-
     def __init__(
         self, owner: TmpStatistics, dates: list[datetime.datetime], variables_names: list[str], allow_nans: bool
     ) -> None:
@@ -435,79 +580,33 @@ class StatAggregator:
         self.owner = owner
         self.dates = dates
         self._number_of_dates = len(dates)
-        self._set_of_dates = set(dates)
         self.variables_names = variables_names
         self.allow_nans = allow_nans
 
         self.shape = (self._number_of_dates, len(self.variables_names))
         LOG.debug(f"Aggregating statistics on shape={self.shape}. Variables : {self.variables_names}")
 
-        self.minimum = np.full(self.shape, np.nan, dtype=np.float64)
-        self.maximum = np.full(self.shape, np.nan, dtype=np.float64)
-        self.sums = np.full(self.shape, np.nan, dtype=np.float64)
-        self.squares = np.full(self.shape, np.nan, dtype=np.float64)
-        self.count = np.full(self.shape, -1, dtype=np.int64)
-        self.has_nans = np.full(self.shape, False, dtype=np.bool_)
-
         self._read()
 
     def _read(self) -> None:
-        """Read and aggregate statistics data from files."""
-
-        def check_type(a, b):
-            if not isinstance(a, set):
-                a = set(list(a))
-            if not isinstance(b, set):
-                b = set(list(b))
-            a = next(iter(a)) if a else None
-            b = next(iter(b)) if b else None
-            assert type(a) is type(b), (type(a), type(b))
-
-        found = set()
-        offset = 0
-
-        for _, _dates, stats in self.owner._gather_data():
-            assert isinstance(stats, dict), stats
-            assert stats["minimum"].shape[0] == len(_dates), (stats["minimum"].shape, len(_dates))
-            assert stats["minimum"].shape[1] == len(self.variables_names), (
-                stats["minimum"].shape,
-                len(self.variables_names),
-            )
-            for n in self.NAMES:
-                assert n in stats, (n, list(stats.keys()))
-            _dates = to_datetimes(_dates)
-            check_type(_dates, self._set_of_dates)
-            if found:
-                check_type(found, self._set_of_dates)
-                assert found.isdisjoint(_dates), "Duplicate dates found in precomputed statistics"
-
-            # filter dates
-            dates = set(_dates) & self._set_of_dates
-
-            if not dates:
-                # dates have been completely filtered for this chunk
-                continue
-
-            # filter data
-            bitmap = np.array([d in self._set_of_dates for d in _dates])
-            for k in self.NAMES:
-                stats[k] = stats[k][bitmap]
-
-            assert stats["minimum"].shape[0] == len(dates), (stats["minimum"].shape, len(dates))
-
-            # store data in self
-            found |= set(dates)
-            for name in self.NAMES:
-                array = getattr(self, name)
-                assert stats[name].shape[0] == len(dates), (stats[name].shape, len(dates))
-                array[offset : offset + len(dates)] = stats[name]
-            offset += len(dates)
-
-        for d in self.dates:
-            assert d in found, f"Statistics for date {d} not precomputed."
-        assert self._number_of_dates == len(found), "Not all dates found in precomputed statistics"
-        assert self._number_of_dates == offset, "Not all dates found in precomputed statistics."
-        LOG.debug(f"Statistics for {len(found)} dates found.")
+        """Read the statistics of the selected dates from the store."""
+        stored = self.owner.dates
+        dates = np.array(self.dates, dtype=stored.dtype)
+
+        rows = np.searchsorted(stored, dates)
+        rows = np.minimum(rows, len(stored) - 1)
+        unknown = stored[rows] != dates
+        assert not unknown.any(), f"Statistics for date {dates[unknown][0]} not precomputed."
+
+        stats = self.owner.read(rows)
+
+        missing = stats.pop("written") == 0
+        assert not missing.any(), f"Statistics for date {dates[missing][0]} not precomputed."
+
+        assert stats["minimum"].shape == self.shape, (stats["minimum"].shape, self.shape)
+
+        self.acc = StatisticsAccumulator.from_dict(stats)
+        LOG.debug(f"Statistics for {len(dates)} dates found.")
 
     def aggregate(self) -> Summary:
         """Aggregate the statistics data.
@@ -517,48 +616,21 @@ class StatAggregator:
         Summary
             The aggregated statistics summary.
         """
-        minimum = np.nanmin(self.minimum, axis=0)
-        maximum = np.nanmax(self.maximum, axis=0)
+        acc = self.acc.reduce()
 
-        sums = np.nansum(self.sums, axis=0)
-        squares = np.nansum(self.squares, axis=0)
-        count = np.nansum(self.count, axis=0)
-        has_nans = np.any(self.has_nans, axis=0)
-        assert sums.shape == count.shape == squares.shape == minimum.shape == maximum.shape
-
-        mean = sums / count
-        assert mean.shape == minimum.shape
-
-        x = squares / count - mean * mean
-        assert x.shape == minimum.shape
-
-        for i, name in enumerate(self.variables_names):
-            # remove negative variance due to numerical errors
-            x[i] = fix_variance(x[i], name, self.count[i : i + 1], self.sums[i : i + 1], self.squares[i : i + 1])
+        summary = acc.to_summary(self.variables_names)
 
         for i, name in enumerate(self.variables_names):
             check_variance(
-                x[i : i + 1],
+                acc.variance[i : i + 1],
                 [name],
-                minimum[i : i + 1],
-                maximum[i : i + 1],
-                mean[i : i + 1],
-                count[i : i + 1],
-                sums[i : i + 1],
-                squares[i : i + 1],
+                acc.minimum[i : i + 1],
+                acc.maximum[i : i + 1],
+                acc.mean[i : i + 1],
+                acc.count[i : i + 1],
+                summary["sums"][i : i + 1],
+                summary["squares"][i : i + 1],
             )
-            check_data_values(np.array([mean[i]]), name=name, allow_nans=False)
-
-        stdev = np.sqrt(x)
-
-        return Summary(
-            minimum=minimum,
-            maximum=maximum,
-            mean=mean,
-            count=count,
-            sums=sums,
-            squares=squares,
-            stdev=stdev,
-            variables_names=self.variables_names,
-            has_nans=has_nans,
-        )
+            check_data_values(np.array([acc.mean[i]]), name=name, allow_nans=False)
+
+        return summary
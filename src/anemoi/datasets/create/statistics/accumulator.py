@@ -0,0 +1,210 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+from typing import Any
+from typing import Dict
+from typing import List
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .summary import Summary
+
+
+class StatisticsAccumulator:
+    """Mergeable statistics: count, mean, sum of squared deviations (M2), minimum, maximum and has_nans.
+
+    The statistics of two sets of values can be combined with :meth:`merge`, using the
+    parallel algorithm of Chan et al., which does not suffer from the catastrophic
+    cancellation of computing the variance from raw sums of squares. The result does
+    not depend on the order in which partial statistics are merged, up to rounding.
+
+    All the fields are arrays of the same shape, typically (dates, variables) or (variables,).
+    """
+
+    NAMES = ["count", "mean", "m2", "minimum", "maximum", "has_nans"]
+
+    def __init__(
+        self,
+        count: NDArray[Any],
+        mean: NDArray[Any],
+        m2: NDArray[Any],
+        minimum: NDArray[Any],
+        maximum: NDArray[Any],
+        has_nans: NDArray[Any],
+    ) -> None:
+        """Initialize the StatisticsAccumulator.
+
+        Parameters
+        ----------
+        count : numpy.ndarray
+            The number of values that are not NaN.
+        mean : numpy.ndarray
+            The mean of the values, zero if there are none.
+        m2 : numpy.ndarray
+            The sum of the squared deviations from the mean.
+        minimum : numpy.ndarray
+            The minimum of the values.
+        maximum : numpy.ndarray
+            The maximum of the values.
+        has_nans : numpy.ndarray
+            Whether there were NaNs in the values.
+        """
+        self.count = np.asarray(count, dtype=np.int64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.m2 = np.asarray(m2, dtype=np.float64)
+        self.minimum = np.asarray(minimum, dtype=np.float64)
+        self.maximum = np.asarray(maximum, dtype=np.float64)
+        self.has_nans = np.asarray(has_nans, dtype=np.bool_)
+
+        assert self.count.shape == self.mean.shape == self.m2.shape == self.minimum.shape == self.maximum.shape, [
+            getattr(self, n).shape for n in self.NAMES
+        ]
+
+    @classmethod
+    def from_dict(cls, stats: Dict[str, NDArray[Any]]) -> "StatisticsAccumulator":
+        """Create an accumulator from the statistics returned by `compute_statistics`.
+
+        Parameters
+        ----------
+        stats : dict of str to numpy.ndarray
+            The statistics.
+
+        Returns
+        -------
+        StatisticsAccumulator
+            The accumulator.
+        """
+        return cls(stats["count"], stats["mean"], stats["m2"], stats["minimum"], stats["maximum"], stats["has_nans"])
+
+    def __getitem__(self, index: Any) -> "StatisticsAccumulator":
+        """Select some of the statistics.
+
+        Parameters
+        ----------
+        index : Any
+            The index, applied to all the fields.
+
+        Returns
+        -------
+        StatisticsAccumulator
+            The selected statistics.
+        """
+        return StatisticsAccumulator(*[getattr(self, n)[index] for n in self.NAMES])
+
+    def __len__(self) -> int:
+        """The length of the first axis."""
+        return len(self.count)
+
+    def merge(self, other: "StatisticsAccumulator") -> "StatisticsAccumulator":
+        """Combine with the statistics of another set of values.
+
+        Parameters
+        ----------
+        other : StatisticsAccumulator
+            The other statistics, of the same shape.
+
+        Returns
+        -------
+        StatisticsAccumulator
+            The statistics of the union of the two sets of values.
+        """
+        count = self.count + other.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(count > 0, other.count / count, 0.0)
+
+        delta = other.mean - self.mean
+
+        return StatisticsAccumulator(
+            count=count,
+            mean=self.mean + delta * weight,
+            m2=self.m2 + other.m2 + delta * delta * self.count * weight,
+            minimum=np.fmin(self.minimum, other.minimum),
+            maximum=np.fmax(self.maximum, other.maximum),
+            has_nans=self.has_nans | other.has_nans,
+        )
+
+    def reduce(self) -> "StatisticsAccumulator":
+        """Merge the statistics along the first axis, pairwise, so that rounding errors grow logarithmically.
+
+        Returns
+        -------
+        StatisticsAccumulator
+            The merged statistics, without the first axis.
+        """
+        assert len(self) > 0, "No statistics to reduce"
+
+        acc = self
+        while len(acc) > 1:
+            n = len(acc) // 2 * 2
+            merged = acc[0:n:2].merge(acc[1:n:2])
+            if len(acc) > n:
+                merged = concatenate([merged, acc[n:]])
+            acc = merged
+
+        return acc[0]
+
+    @property
+    def sums(self) -> NDArray[Any]:
+        """The sums of the values."""
+        return self.mean * self.count
+
+    @property
+    def squares(self) -> NDArray[Any]:
+        """The sums of the squares of the values."""
+        return self.m2 + self.mean * self.mean * self.count
+
+    @property
+    def variance(self) -> NDArray[Any]:
+        """The (population) variance of the values."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / self.count
+
+    def to_summary(self, variables_names: List[str]) -> Summary:
+        """Create the summary of the statistics.
+
+        Parameters
+        ----------
+        variables_names : list of str
+            The names of the variables.
+
+        Returns
+        -------
+        Summary
+            The summary.
+        """
+        return Summary(
+            minimum=self.minimum,
+            maximum=self.maximum,
+            mean=self.mean,
+            count=self.count,
+            sums=self.sums,
+            squares=self.squares,
+            stdev=np.sqrt(self.variance),
+            variables_names=variables_names,
+            has_nans=self.has_nans,
+        )
+
+
+def concatenate(accumulators: List[StatisticsAccumulator]) -> StatisticsAccumulator:
+    """Concatenate statistics along the first axis.
+
+    Parameters
+    ----------
+    accumulators : list of StatisticsAccumulator
+        The statistics.
+
+    Returns
+    -------
+    StatisticsAccumulator
+        The concatenated statistics.
+    """
+    return StatisticsAccumulator(
+        *[np.concatenate([getattr(a, n) for a in accumulators]) for n in StatisticsAccumulator.NAMES]
+    )
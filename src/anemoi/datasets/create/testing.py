@@ -29,6 +29,7 @@ def create_dataset(
     output: Optional[str],
     delta: Optional[List[str]] = None,
     is_test: bool = False,
+    pipeline: int = 0,
 ) -> str:
     """Create a dataset based on the provided configuration.
 
@@ -42,6 +43,8 @@ def create_dataset(
         List of delta for secondary statistics, by default None.
     is_test : bool, optional
         Flag indicating if the dataset creation is for testing purposes, by default False.
+    pipeline : int, optional
+        The depth of the pipeline of the load step (see :class:`anemoi.datasets.create.Load`), by default 0.
 
     Returns
     -------
@@ -57,7 +60,7 @@ def create_dataset(
         output = tempfile.mkdtemp(suffix=".zarr")
 
     creator_factory("init", config=config, path=output, overwrite=True, test=is_test).run()
-    creator_factory("load", path=output).run()
+    creator_factory("load", path=output, pipeline=pipeline).run()
     creator_factory("finalise", path=output).run()
     creator_factory("patch", path=output).run()
 
@@ -0,0 +1,541 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import atexit
+import hashlib
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from anemoi.utils.humanize import bytes_to_human
+from anemoi.utils.humanize import human_to_bytes
+from numpy.typing import NDArray
+
+from .dataset import Dataset
+from .dataset import FullIndex
+from .debug import Node
+from .indexing import _extend_shape
+
+LOG = logging.getLogger(__name__)
+
+# For each axis, a list of (chunk number, slice in the output, slice in the chunk)
+AxisPlan = List[Tuple[int, slice, slice]]
+
+
+class DecodedChunkCache:
+    """A least-recently-used cache of decoded (i.e. decompressed) zarr chunks, with a budget in bytes.
+
+    The cache can be shared between several arrays; statistics are kept for each of them.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum number of bytes of decoded data to keep.
+        """
+        self.max_bytes = max_bytes
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty the cache and its statistics."""
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Hashable], NDArray[Any]]" = OrderedDict()
+        self._statistics: Dict[str, Dict[str, int]] = defaultdict(lambda: dict(hits=0, misses=0, evictions=0))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Do not pickle the content of the cache, each process has its own."""
+        return dict(max_bytes=self.max_bytes)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore an empty cache after unpickling."""
+        self.max_bytes = state["max_bytes"]
+        self._reset()
+
+    def get(self, name: str, key: Hashable) -> Optional[NDArray[Any]]:
+        """Get a chunk from the cache.
+
+        Parameters
+        ----------
+        name : str
+            The name of the array.
+        key : Hashable
+            The key of the chunk within the array.
+
+        Returns
+        -------
+        Optional[NDArray[Any]]
+            The decoded chunk, or None if it is not in the cache.
+        """
+        with self._lock:
+            value = self._entries.get((name, key))
+            if value is None:
+                self._statistics[name]["misses"] += 1
+                return None
+            self._entries.move_to_end((name, key))
+            self._statistics[name]["hits"] += 1
+            return value
+
+    def put(self, name: str, key: Hashable, value: NDArray[Any]) -> None:
+        """Add a chunk to the cache, evicting the least recently used chunks if needed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the array.
+        key : Hashable
+            The key of the chunk within the array.
+        value : NDArray[Any]
+            The decoded chunk.
+        """
+        if value.nbytes > self.max_bytes:
+            return
+
+        value.flags.writeable = False
+
+        with self._lock:
+            if (name, key) in self._entries:
+                return
+
+            while self._entries and self.nbytes + value.nbytes > self.max_bytes:
+                (evicted, _), old = self._entries.popitem(last=False)
+                self.nbytes -= old.nbytes
+                self._statistics[evicted]["evictions"] += 1
+
+            self._entries[(name, key)] = value
+            self.nbytes += value.nbytes
+
+    @property
+    def statistics(self) -> Dict[str, Dict[str, int]]:
+        """The number of hits, misses and evictions for each array."""
+        with self._lock:
+            return {k: dict(v) for k, v in self._statistics.items()}
+
+    def __repr__(self) -> str:
+        """Return a string representation of the cache."""
+        return (
+            f"DecodedChunkCache({bytes_to_human(self.nbytes)}/{bytes_to_human(self.max_bytes)}, "
+            f"{len(self._entries)} chunks)"
+        )
+
+
+class SharedChunkCache(DecodedChunkCache):
+    """A cache of decoded zarr chunks shared between processes on the same node.
+
+    Each chunk is stored as a `.npy` file in a directory of a memory-backed filesystem
+    (`/dev/shm` if available) and memory-mapped when read, so several data loader workers
+    decompress each chunk only once and read it without copying. Files are written to a
+    temporary name and renamed, so readers never see partial chunks. The budget is enforced
+    approximately, by removing the least recently used files.
+
+    The sizes of the chunks written by all the processes are appended to a log in the directory,
+    and the process whose write brings the total to a sixteenth of the budget removes the log and
+    evicts. The directory can therefore exceed the budget by about a sixteenth, plus the chunks
+    being written at the same time, whatever the number of processes.
+
+    If no directory is given, a new one is created and removed when the process that created
+    the cache exits. Child processes that receive the cache (e.g. after a fork or by pickling)
+    attach to the same directory.
+    """
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None) -> None:
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum number of bytes of decoded data to keep in the directory.
+        path : Optional[str]
+            The directory where to keep the chunks. It is not removed on exit.
+        """
+        super().__init__(max_bytes)
+
+        if path is None:
+            path = tempfile.mkdtemp(prefix="anemoi-chunks-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+            self._owner = os.getpid()
+            atexit.register(self._cleanup)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._owner = None
+
+        self.path = path
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the location of the cache, not its statistics."""
+        return dict(max_bytes=self.max_bytes, path=self.path, owner=self._owner)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Attach to the cache after unpickling."""
+        self.max_bytes = state["max_bytes"]
+        self.path = state["path"]
+        self._owner = state["owner"]
+        self._reset()
+
+    def _cleanup(self) -> None:
+        """Remove the directory if it was created by this process."""
+        if self._owner == os.getpid():
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def _file(self, name: str, key: Hashable) -> str:
+        """The path of the file holding a chunk.
+
+        Parameters
+        ----------
+        name : str
+            The name of the array.
+        key : Hashable
+            The key of the chunk within the array.
+
+        Returns
+        -------
+        str
+            The path of the file.
+        """
+        digest = hashlib.md5(f"{name}/{key}".encode()).hexdigest()
+        return os.path.join(self.path, digest + ".npy")
+
+    def get(self, name: str, key: Hashable) -> Optional[NDArray[Any]]:
+        """Get a chunk from the cache, as a read-only memory map.
+
+        Parameters
+        ----------
+        name : str
+            The name of the array.
+        key : Hashable
+            The key of the chunk within the array.
+
+        Returns
+        -------
+        Optional[NDArray[Any]]
+            The decoded chunk, or None if it is not in the cache.
+        """
+        path = self._file(name, key)
+        try:
+            value = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except FileNotFoundError:
+            value = None
+
+        with self._lock:
+            self._statistics[name]["misses" if value is None else "hits"] += 1
+
+        return value
+
+    def put(self, name: str, key: Hashable, value: NDArray[Any]) -> None:
+        """Add a chunk to the cache, evicting the least recently used chunks if needed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the array.
+        key : Hashable
+            The key of the chunk within the array.
+        value : NDArray[Any]
+            The decoded chunk.
+        """
+        if value.nbytes > self.max_bytes:
+            return
+
+        path = self._file(name, key)
+        if os.path.exists(path):
+            return
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, value)
+        os.replace(tmp, path)
+
+        if self._written(value.nbytes) * 16 < self.max_bytes:
+            return
+
+        # Only one process removes a given log, and evicts
+        log = os.path.join(self.path, "written.log")
+        claimed = f"{log}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.replace(log, claimed)
+        except FileNotFoundError:
+            return
+        os.unlink(claimed)
+
+        self._evict(name)
+
+    def _written(self, nbytes: int) -> int:
+        """Record the size of a chunk in the log shared by all processes.
+
+        Parameters
+        ----------
+        nbytes : int
+            The size of the chunk written.
+
+        Returns
+        -------
+        int
+            The number of bytes written by all the processes since the last eviction.
+        """
+        log = os.path.join(self.path, "written.log")
+        # Appends of a few bytes are atomic, so concurrent writers do not interleave their records
+        fd = os.open(log, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, np.int64(nbytes).tobytes())
+            data = os.pread(fd, os.fstat(fd).st_size, 0)
+        finally:
+            os.close(fd)
+        size = len(data) // 8 * 8
+        return int(np.frombuffer(data[:size], dtype=np.int64).sum())
+
+    def _evict(self, name: str) -> None:
+        """Remove the least recently used files until the cache is within its budget.
+
+        Parameters
+        ----------
+        name : str
+            The name of the array that triggered the eviction, for the statistics.
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        self.nbytes = total
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                # Processes that have the file memory-mapped keep their mapping
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self._statistics[name]["evictions"] += 1
+
+        self.nbytes = total
+
+    def __repr__(self) -> str:
+        """Return a string representation of the cache."""
+        return f"SharedChunkCache({self.path}, {bytes_to_human(self.max_bytes)})"
+
+
+def _plan_axis(index: Union[int, slice], length: int, chunk: int) -> Tuple[AxisPlan, int]:
+    """Find the chunks touched by an index along one axis.
+
+    Parameters
+    ----------
+    index : Union[int, slice]
+        The index along the axis.
+    length : int
+        The length of the axis.
+    chunk : int
+        The chunk size along the axis.
+
+    Returns
+    -------
+    Tuple[AxisPlan, int]
+        The chunks touched, with the slices to copy from each of them, and the length of the result along the axis.
+    """
+    if isinstance(index, (int, np.integer)):
+        i = int(index)
+        if i < 0:
+            i += length
+        if not 0 <= i < length:
+            raise IndexError(f"Index {index} out of range for axis of length {length}")
+        index = slice(i, i + 1)
+
+    if not isinstance(index, slice):
+        raise IndexError(f"Unsupported index {index!r}")
+
+    start, stop, step = index.indices(length)
+    if step < 1:
+        raise IndexError(f"Only positive steps are supported, got {index}")
+
+    count = len(range(start, stop, step))
+    plan = []
+    position = 0
+    while position < count:
+        first = start + position * step
+        k = first // chunk
+        end = min((k + 1) * chunk, length)
+        # Number of selected coordinates in this chunk
+        n = (end - 1 - first) // step + 1
+        n = min(n, count - position)
+        last = first + (n - 1) * step
+        plan.append((k, slice(position, position + n), slice(first - k * chunk, last - k * chunk + 1, step)))
+        position += n
+
+    return plan, count
+
+
+class CachedArray:
+    """A read-only view of a zarr array that reads and caches whole decoded chunks."""
+
+    def __init__(self, array: Any, cache: DecodedChunkCache, name: str) -> None:
+        """Initialize the cached array.
+
+        Parameters
+        ----------
+        array : Any
+            The zarr array.
+        cache : DecodedChunkCache
+            The cache to use.
+        name : str
+            The name of the array in the cache statistics.
+        """
+        self.array = array
+        self.cache = cache
+        self.name = name
+        self.shape = array.shape
+        self.chunks = array.chunks
+        self.dtype = array.dtype
+
+    def _chunk(self, key: Tuple[int, ...]) -> NDArray[Any]:
+        """Get a decoded chunk, from the cache if possible.
+
+        Parameters
+        ----------
+        key : Tuple[int, ...]
+            The position of the chunk in the chunk grid.
+
+        Returns
+        -------
+        NDArray[Any]
+            The decoded chunk.
+        """
+        value = self.cache.get(self.name, key)
+        if value is None:
+            region = tuple(slice(k * c, min((k + 1) * c, n)) for k, c, n in zip(key, self.chunks, self.shape))
+            value = self.array[region]
+            self.cache.put(self.name, key, value)
+        return value
+
+    def __getitem__(self, index: FullIndex) -> NDArray[Any]:
+        """Read data from the array.
+
+        Parameters
+        ----------
+        index : FullIndex
+            An integer, a slice, or a tuple of integers and slices.
+
+        Returns
+        -------
+        NDArray[Any]
+            The data.
+        """
+        if not isinstance(index, tuple):
+            index = (index,)
+
+        index = _extend_shape(index, self.shape)
+        if len(index) > len(self.shape):
+            raise IndexError(f"Too many indices for array of shape {self.shape}")
+
+        plans, shape = [], []
+        for i, n, c in zip(index, self.shape, self.chunks):
+            plan, count = _plan_axis(i, n, c)
+            plans.append(plan)
+            shape.append(count)
+
+        result = np.empty(shape, dtype=self.dtype)
+
+        for parts in itertools.product(*plans):
+            chunk = self._chunk(tuple(k for k, _, _ in parts))
+            result[tuple(s for _, s, _ in parts)] = chunk[tuple(s for _, _, s in parts)]
+
+        squeeze = tuple(axis for axis, i in enumerate(index) if isinstance(i, (int, np.integer)))
+        if squeeze:
+            result = np.squeeze(result, axis=squeeze)
+
+        return result
+
+    def __len__(self) -> int:
+        """Return the length of the first dimension."""
+        return self.shape[0]
+
+
+def _collect_zarr(node: Node, result: List[Dataset]) -> None:
+    """Collect the zarr datasets of a dataset tree.
+
+    Parameters
+    ----------
+    node : Node
+        The tree node.
+    result : List[Dataset]
+        The list to add the zarr datasets to.
+    """
+    from .stores import Zarr
+
+    if isinstance(node.dataset, Zarr):
+        result.append(node.dataset)
+
+    for kid in node.kids:
+        _collect_zarr(kid, result)
+
+
+def add_decoded_chunk_cache(
+    dataset: Dataset, cache_decoded: Union[int, str, Dict[str, Any], DecodedChunkCache]
+) -> DecodedChunkCache:
+    """Make all the zarr stores of a dataset read through a decoded-chunk cache.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        The dataset.
+    cache_decoded : Union[int, str, Dict[str, Any], DecodedChunkCache]
+        The budget of the cache, in bytes or as a human-readable string (e.g. "8GiB"), a dictionary
+        with the keys `size`, `shared` and `path` (see :class:`SharedChunkCache`), or an existing cache.
+
+    Returns
+    -------
+    DecodedChunkCache
+        The cache, shared by all the zarr stores of the dataset.
+    """
+    if isinstance(cache_decoded, DecodedChunkCache):
+        cache = cache_decoded
+    elif isinstance(cache_decoded, dict):
+        options = dict(cache_decoded)
+        size = human_to_bytes(options.pop("size"), "cache_decoded.size")
+        shared = options.pop("shared", False)
+        path = options.pop("path", None)
+        if options:
+            raise ValueError(f"Unsupported `cache_decoded` options: {', '.join(options)}")
+        cache = SharedChunkCache(size, path) if shared or path else DecodedChunkCache(size)
+    else:
+        cache = DecodedChunkCache(human_to_bytes(cache_decoded, "cache_decoded"))
+
+    stores: List[Dataset] = []
+    _collect_zarr(dataset.tree(), stores)
+
+    if not stores:
+        LOG.warning("cache_decoded: no zarr store found in %r", dataset)
+
+    for store in stores:
+        store.set_decoded_chunk_cache(cache)
+
+    return cache
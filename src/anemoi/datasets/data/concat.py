@@ -27,6 +27,7 @@ from .debug import Node
 from .debug import debug_indexing
 from .forwards import Combined
 from .indexing import apply_index_to_slices_changes
+from .indexing import ascending_slice
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
 from .indexing import length_to_slices
@@ -68,8 +69,10 @@ class ConcatMixin:
         lengths = [d.shape[0] for d in self.datasets]
         slices = length_to_slices(index[0], lengths)
         # print("slies", slices)
-        result = [d[update_tuple(index, 0, i)[0]] for (d, i) in zip(self.datasets, slices) if i is not None]
-        result = np.concatenate(result, axis=0)
+        parts = [(d, update_tuple(index, 0, i)[0]) for (d, i) in zip(self.datasets, slices) if i is not None]
+        if not parts:
+            parts = [(self.datasets[0], update_tuple(index, 0, slice(0, 0))[0])]
+        result = self._read_parts(parts, axis=0)
         return apply_index_to_slices_changes(result, changes)
 
     @debug_indexing
@@ -113,14 +116,18 @@ class ConcatMixin:
         NDArray[Any]
             Concatenated data array from the specified slice.
         """
-        result = []
+        # The datasets are read in ascending order, negative steps are applied to the result
+        s, reverse = ascending_slice(s, len(self))
 
         lengths = [d.shape[0] for d in self.datasets]
         slices = length_to_slices(s, lengths)
 
-        result = [d[i] for (d, i) in zip(self.datasets, slices) if i is not None]
+        parts = [(d, i) for (d, i) in zip(self.datasets, slices) if i is not None]
+        if not parts:
+            parts = [(self.datasets[0], slice(0, 0))]
 
-        return np.concatenate(result)
+        result = self._read_parts(parts, axis=0)
+        return result[::-1] if reverse else result
 
     @cached_property
     def missing(self) -> Set[int]:
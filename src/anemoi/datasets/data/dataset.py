@@ -8,6 +8,7 @@
 # nor does it submit to any jurisdiction.
 
 
+import copy
 import datetime
 import json
 import logging
@@ -120,6 +121,39 @@ class Dataset(ABC, Sized):
         """
         return parent
 
+    def _copy_tree(self, memo: Optional[Dict[int, "Dataset"]] = None) -> "Dataset":
+        """Return a copy of the dataset tree that shares its data (e.g. the zarr arrays).
+
+        Options such as `parallel` or `cache_decoded` are set on the copy, so that they
+        do not affect the datasets it was built from.
+
+        Parameters
+        ----------
+        memo : Optional[Dict[int, Dataset]], optional
+            The copies already made, by id of the original dataset.
+
+        Returns
+        -------
+        Dataset
+            The copy of the dataset.
+        """
+        if memo is None:
+            memo = {}
+
+        if id(self) in memo:
+            return memo[id(self)]
+
+        result = copy.copy(self)
+        memo[id(self)] = result
+
+        for name, value in list(vars(result).items()):
+            if isinstance(value, Dataset):
+                setattr(result, name, value._copy_tree(memo))
+            elif isinstance(value, (list, tuple)) and any(isinstance(v, Dataset) for v in value):
+                setattr(result, name, type(value)(v._copy_tree(memo) if isinstance(v, Dataset) else v for v in value))
+
+        return result
+
     @cached_property
     def _len(self) -> int:
         """Cache and return the length of the dataset."""
@@ -176,6 +210,23 @@ class Dataset(ABC, Sized):
             ds = fill_missing_dates_factory(self, fill_missing_dates, kwargs)
             return ds._subset(**kwargs).mutate()
 
+        if "cache_decoded" in kwargs:
+            from .chunk_cache import add_decoded_chunk_cache
+
+            cache_decoded = kwargs.pop("cache_decoded")
+            ds = self._copy_tree()
+            if cache_decoded:
+                add_decoded_chunk_cache(ds, cache_decoded)
+
+            return ds._subset(**kwargs).mutate()
+
+        if "parallel" in kwargs:
+            from .parallel import set_parallel_reads
+
+            ds = self._copy_tree()
+            set_parallel_reads(ds, kwargs.pop("parallel"))
+            return ds._subset(**kwargs).mutate()
+
         if "start" in kwargs or "end" in kwargs:
             start = kwargs.pop("start", None)
             end = kwargs.pop("end", None)
@@ -289,7 +340,8 @@ class Dataset(ABC, Sized):
             from .interpolate import InterpolateFrequency
 
             interpolate_frequency = kwargs.pop("interpolate_frequency")
-            return InterpolateFrequency(self, interpolate_frequency)._subset(**kwargs).mutate()
+            interpolate_method = kwargs.pop("interpolate_method", "linear")
+            return InterpolateFrequency(self, interpolate_frequency, interpolate_method)._subset(**kwargs).mutate()
 
         if "interpolate_variables" in kwargs:
             from .interpolate import InterpolateNearest
@@ -307,6 +359,17 @@ class Dataset(ABC, Sized):
             if shuffle:
                 return Subset(self, self._shuffle_indices(), dict(shuffle=True))._subset(**kwargs).mutate()
 
+        # Must come after all the other options, so the reads of the final dataset are prefetched
+        if "prefetch" in kwargs:
+            from .prefetch import Prefetch
+
+            prefetch = kwargs.pop("prefetch")
+
+            if prefetch:
+                return Prefetch(self, prefetch)._subset(**kwargs).mutate()
+
+            return self._subset(**kwargs).mutate()
+
         raise NotImplementedError("Unsupported arguments: " + ", ".join(kwargs))
 
     def _frequency_to_indices(self, frequency: str) -> list[int]:
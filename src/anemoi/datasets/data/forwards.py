@@ -13,11 +13,13 @@ import logging
 import warnings
 from abc import abstractmethod
 from functools import cached_property
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Set
+from typing import Tuple
 
 import numpy as np
 from numpy.typing import NDArray
@@ -28,10 +30,12 @@ from .dataset import Shape
 from .dataset import TupleIndex
 from .debug import debug_indexing
 from .indexing import apply_index_to_slices_changes
+from .indexing import ascending_slice
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
 from .indexing import length_to_slices
 from .indexing import update_tuple
+from .parallel import read_into
 
 LOG = logging.getLogger(__name__)
 
@@ -248,6 +252,9 @@ class Forwards(Dataset):
 class Combined(Forwards):
     """A class to combine multiple datasets into a single dataset."""
 
+    # Number of threads used to read the datasets concurrently, see `set_parallel_reads`
+    parallel_reads: Optional[int] = None
+
     def __init__(self, datasets: List[Dataset]) -> None:
         """Initializes a Combined object.
 
@@ -275,6 +282,68 @@ class Combined(Forwards):
         """
         return self
 
+    @staticmethod
+    def _read_shape(shape: Shape, index: FullIndex) -> Shape:
+        """Returns the shape of the data read from a dataset with an index made of integers and slices.
+
+        Parameters
+        ----------
+        shape : Shape
+            Shape of the dataset.
+        index : FullIndex
+            Index used to read the dataset.
+
+        Returns
+        -------
+        Shape
+            Shape of the data read.
+        """
+        if not isinstance(index, tuple):
+            index = (index,)
+
+        result = []
+        for i, n in enumerate(shape):
+            if i >= len(index):
+                result.append(n)
+            elif isinstance(index[i], slice):
+                result.append(len(range(*index[i].indices(n))))
+            else:
+                assert isinstance(index[i], (int, np.integer)), (index, shape)
+        return tuple(result)
+
+    def _read_parts(self, parts: List[Tuple[Dataset, FullIndex]], axis: int) -> NDArray[Any]:
+        """Reads data from several datasets and assembles it along an axis, without intermediate copies.
+
+        The datasets are read concurrently if `parallel_reads` is set.
+
+        Parameters
+        ----------
+        parts : List[Tuple[Dataset, FullIndex]]
+            The datasets and the indices (made of integers and slices) to read them with.
+        axis : int
+            Axis along which to assemble the data.
+
+        Returns
+        -------
+        NDArray[Any]
+            Assembled data.
+        """
+        shapes = [self._read_shape(d.shape, i) for d, i in parts]
+
+        shape = list(shapes[0])
+        shape[axis] = sum(s[axis] for s in shapes)
+        out = np.empty(shape, dtype=np.result_type(*[d.dtype for d, _ in parts]))
+
+        reads = []
+        offset = 0
+        for (d, i), s in zip(parts, shapes):
+            if s[axis] > 0:
+                target = (slice(None),) * axis + (slice(offset, offset + s[axis]),)
+                reads.append((target, partial(d.__getitem__, i)))
+            offset += s[axis]
+
+        return read_into(out, reads, self.parallel_reads)
+
     def check_same_resolution(self, d1: Dataset, d2: Dataset) -> None:
         """Checks if the resolutions of two datasets are the same.
 
@@ -603,8 +672,10 @@ class GivenAxis(Combined):
         index, changes = index_to_slices(index, self.shape)
         lengths = [d.shape[self.axis] for d in self.datasets]
         slices = length_to_slices(index[self.axis], lengths)
-        result = [d[update_tuple(index, self.axis, i)[0]] for (d, i) in zip(self.datasets, slices) if i is not None]
-        result = np.concatenate(result, axis=self.axis)
+        parts = [(d, update_tuple(index, self.axis, i)[0]) for (d, i) in zip(self.datasets, slices) if i is not None]
+        if not parts:
+            parts = [(self.datasets[0], update_tuple(index, self.axis, slice(0, 0))[0])]
+        result = self._read_parts(parts, axis=self.axis)
         return apply_index_to_slices_changes(result, changes)
 
     @debug_indexing
@@ -621,7 +692,10 @@ class GivenAxis(Combined):
         NDArray[Any]
             Slice of data from the combined dataset.
         """
-        return np.stack([self[i] for i in range(*s.indices(self._len))])
+        # The datasets are read in ascending order, negative steps are applied to the result
+        s, reverse = ascending_slice(s, len(self))
+        result = self._read_parts([(d, s) for d in self.datasets], axis=self.axis)
+        return result[::-1] if reverse else result
 
     @debug_indexing
     def __getitem__(self, n: FullIndex) -> NDArray[Any]:
@@ -643,7 +717,7 @@ class GivenAxis(Combined):
         if isinstance(n, slice):
             return self._get_slice(n)
 
-        return np.concatenate([d[n] for d in self.datasets], axis=self.axis - 1)
+        return self._read_parts([(d, n) for d in self.datasets], axis=self.axis - 1)
 
     @cached_property
     def missing(self) -> Set[int]:
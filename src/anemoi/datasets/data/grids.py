@@ -10,6 +10,7 @@
 
 import logging
 from functools import cached_property
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import List
@@ -35,6 +36,7 @@ from .indexing import length_to_slices
 from .indexing import update_tuple
 from .misc import _auto_adjust
 from .misc import _open
+from .parallel import read_into
 
 LOG = logging.getLogger(__name__)
 
@@ -72,8 +74,10 @@ class Concat(Combined):
         lengths = [d.shape[0] for d in self.datasets]
         slices = length_to_slices(index[0], lengths)
         # print("slies", slices)
-        result = [d[update_tuple(index, 0, i)[0]] for (d, i) in zip(self.datasets, slices) if i is not None]
-        result = np.concatenate(result, axis=0)
+        parts = [(d, update_tuple(index, 0, i)[0]) for (d, i) in zip(self.datasets, slices) if i is not None]
+        if not parts:
+            parts = [(self.datasets[0], update_tuple(index, 0, slice(0, 0))[0])]
+        result = self._read_parts(parts, axis=0)
         return apply_index_to_slices_changes(result, changes)
 
     @debug_indexing
@@ -117,14 +121,14 @@ class Concat(Combined):
         NDArray[Any]
             Concatenated data array from the specified slice.
         """
-        result = []
-
         lengths = [d.shape[0] for d in self.datasets]
         slices = length_to_slices(s, lengths)
 
-        result = [d[i] for (d, i) in zip(self.datasets, slices) if i is not None]
+        parts = [(d, i) for (d, i) in zip(self.datasets, slices) if i is not None]
+        if not parts:
+            parts = [(self.datasets[0], slice(0, 0))]
 
-        return np.concatenate(result)
+        return self._read_parts(parts, axis=0)
 
     def check_compatibility(self, d1: Dataset, d2: Dataset) -> None:
         """Check the compatibility of two datasets for concatenation.
@@ -475,18 +479,41 @@ class Cutout(GridsBase):
             Concatenated data array from all datasets based on the index.
         """
         index, changes = index_to_slices(index, self.shape)
-        # Select data from each LAM
-        lam_data = [lam[index[:3]] for lam in self.lams]
 
-        # First apply spatial indexing on `self.globe` and then apply the mask
-        globe_data_sliced = self.globe[index[:3]]
-        globe_data = globe_data_sliced[..., self.global_mask]
+        # Read each LAM and the global dataset (to which the mask is applied) into its part of the grid
+        size = sum(lam.shape[self.axis] for lam in self.lams) + int(np.sum(self.global_mask))
+        shape = self._read_shape(self.shape[: self.axis], index[:3]) + (size,)
+        out = np.empty(shape, dtype=np.result_type(*[d.dtype for d in self.datasets]))
+
+        reads = []
+        offset = 0
+        for lam in self.lams:
+            size = lam.shape[self.axis]
+            reads.append(((Ellipsis, slice(offset, offset + size)), partial(lam.__getitem__, index[:3])))
+            offset += size
+
+        reads.append(((Ellipsis, slice(offset, None)), partial(self._read_globe, index[:3])))
 
-        # Concatenate LAM data with global data, apply the grid slicing
-        result = np.concatenate(lam_data + [globe_data], axis=self.axis)[..., index[3]]
+        # Apply the grid slicing
+        result = read_into(out, reads, self.parallel_reads)[..., index[3]]
 
         return apply_index_to_slices_changes(result, changes)
 
+    def _read_globe(self, index: TupleIndex) -> NDArray[Any]:
+        """Read the global dataset and apply the mask.
+
+        Parameters
+        ----------
+        index : TupleIndex
+            Index specifying the dates, variables and ensemble members to retrieve.
+
+        Returns
+        -------
+        NDArray[Any]
+            Masked data of the global dataset.
+        """
+        return self.globe[index][..., self.global_mask]
+
     def collect_supporting_arrays(self, collected: List[Any], *path: Any) -> None:
         """Collect supporting arrays, including masks for each LAM and the global dataset.
 
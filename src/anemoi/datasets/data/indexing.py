@@ -8,10 +8,13 @@
 # nor does it submit to any jurisdiction.
 
 
+import itertools
 from functools import wraps
 from typing import Any
 from typing import Callable
+from typing import Collection
 from typing import List
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
@@ -135,6 +138,33 @@ def update_tuple(t: Tuple, index: int, value: Any) -> Tuple[Tuple, Any]:
     return tuple(t), prev
 
 
+def ascending_slice(index: slice, length: int) -> Tuple[slice, bool]:
+    """Convert a slice to one with a positive step that selects the same items.
+
+    Parameters
+    ----------
+    index : slice
+        The slice to convert, with any step.
+    length : int
+        The length of the dimension.
+
+    Returns
+    -------
+    Tuple[slice, bool]
+        The slice, and whether the items it selects must be reversed to match the original slice.
+    """
+    start, stop, step = index.indices(length)
+    if step > 0:
+        return slice(start, stop, step), False
+
+    count = len(range(start, stop, step))
+    if count == 0:
+        return slice(0, 0, 1), False
+
+    last = start + (count - 1) * step
+    return slice(last, start + 1, -step), True
+
+
 def length_to_slices(index: slice, lengths: List[int]) -> List[Union[slice, None]]:
     """Convert an index to a list of slices, given the lengths of the dimensions.
 
@@ -204,6 +234,10 @@ def expand_list_indexing(method: Callable[..., NDArray[Any]]) -> Callable[..., N
     Zarr does not support indexing with lists/arrays directly,
     so we need to implement it ourselves.
 
+    The lists are split into contiguous runs (aligned on the chunking of the
+    dataset, if known), each combination of runs is read once and the result
+    is scattered into a single output array. Lists are allowed on several axes.
+
     Parameters:
     method (Callable[..., NDArray[Any]]): The method to wrap.
 
@@ -219,28 +253,105 @@ def expand_list_indexing(method: Callable[..., NDArray[Any]]) -> Callable[..., N
         if not any(isinstance(i, (list, tuple)) for i in index):
             return method(self, index)
 
+        shape = self.shape
+        index = list(_as_tuples(_extend_shape(index, shape)))
+
         which: List[int] = []
-        for i, idx in enumerate(index):
-            if isinstance(idx, (list, tuple)):
-                which.append(i)
+        changes: List[int] = []
+        for axis, idx in enumerate(index):
+            if isinstance(idx, tuple):
+                which.append(axis)
+                index[axis] = tuple(i + shape[axis] if i < 0 else i for i in idx)
+            elif isinstance(idx, (int, np.integer)):
+                # Preserve the dimensionality, so the output axes match the input axes
+                idx = int(idx) + shape[axis] if idx < 0 else int(idx)
+                index[axis] = slice(idx, idx + 1)
+                changes.append(axis)
 
         assert which, "No list index found"
 
-        if len(which) > 1:
-            raise IndexError("Only one list index is allowed")
+        chunks = getattr(self, "chunks", None) or (1,) * len(shape)
+        missing = getattr(self, "missing", ())
+
+        plans = [
+            chunk_aligned_runs(index[axis], chunks[axis], missing if axis == 0 else ()) or [(slice(0, 0), [], [])]
+            for axis in which
+        ]
+
+        result = None
+        for runs in itertools.product(*plans):
+            sub = list(index)
+            for axis, (s, _, _) in zip(which, runs):
+                sub[axis] = s
+
+            block = method(self, tuple(sub))
 
-        which = which[0]
-        index = _as_tuples(index)
-        result = []
-        for i in index[which]:
-            index, _ = update_tuple(index, which, slice(i, i + 1))
-            result.append(method(self, index))
+            if result is None:
+                result_shape = list(block.shape)
+                for axis in which:
+                    result_shape[axis] = len(index[axis])
+                result = np.empty(result_shape, dtype=block.dtype)
 
-        return np.concatenate(result, axis=which)
+            for axis, (_, _, offsets) in zip(which, runs):
+                block = np.take(block, offsets, axis=axis)
+
+            if len(which) == 1:
+                target = [slice(None)] * result.ndim
+                target[which[0]] = runs[0][1]
+                result[tuple(target)] = block
+            else:
+                target = [np.arange(n) for n in result.shape]
+                for axis, (_, positions, _) in zip(which, runs):
+                    target[axis] = positions
+                result[np.ix_(*target)] = block
+
+        return apply_index_to_slices_changes(result, tuple(changes))
 
     return wrapper
 
 
+def chunk_aligned_runs(
+    indices: Sequence[int], chunk: int = 1, missing: Collection[int] = ()
+) -> List[Tuple[slice, NDArray[Any], NDArray[Any]]]:
+    """Group a list of indices into contiguous reads, so that each storage chunk is visited once.
+
+    Consecutive (sorted) indices are merged into the same read as long as no chunk is skipped
+    between them and no index from `missing` falls in the gap.
+
+    Parameters:
+    indices (Sequence[int]): The indices to read, in any order and possibly with repetitions.
+    chunk (int): The chunk size of the underlying storage along the indexed axis.
+    missing (Collection[int]): Indices that must not be read.
+
+    Returns:
+    List[Tuple[slice, NDArray[Any], NDArray[Any]]]: For each read, the slice to read, the positions
+    of the requested indices in the output and their offsets in the block that was read.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if len(indices) == 0:
+        return []
+
+    chunk = max(int(chunk), 1)
+    order = np.argsort(indices, kind="stable")
+    ordered = indices[order]
+
+    gaps = np.diff(ordered)
+    breaks = (ordered[1:] // chunk - ordered[:-1] // chunk) > 1
+    if missing:
+        for k in np.nonzero(gaps > 1)[0]:
+            if not breaks[k] and any(j in missing for j in range(ordered[k] + 1, ordered[k + 1])):
+                breaks[k] = True
+
+    bounds = [0] + (np.nonzero(breaks)[0] + 1).tolist() + [len(ordered)]
+
+    result = []
+    for b, e in zip(bounds[:-1], bounds[1:]):
+        start, stop = int(ordered[b]), int(ordered[e - 1]) + 1
+        result.append((slice(start, stop), order[b:e], ordered[b:e] - start))
+
+    return result
+
+
 def make_slice_or_index_from_list_or_tuple(indices: List[int]) -> Union[List[int], slice]:
     """Convert a list or tuple of indices to a slice or an index, if possible.
 
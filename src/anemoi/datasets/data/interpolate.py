@@ -31,9 +31,9 @@ from .debug import Node
 from .debug import debug_indexing
 from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
+from .indexing import chunk_aligned_runs
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
-from .indexing import update_tuple
 
 LOG = logging.getLogger(__name__)
 
@@ -41,7 +41,7 @@ LOG = logging.getLogger(__name__)
 class InterpolateFrequency(Forwards):
     """A class to represent a dataset with interpolated frequency."""
 
-    def __init__(self, dataset: Dataset, frequency: str) -> None:
+    def __init__(self, dataset: Dataset, frequency: str, method: str = "linear") -> None:
         """Initialize the InterpolateFrequency class.
 
         Parameters
@@ -50,8 +50,15 @@ class InterpolateFrequency(Forwards):
             The dataset to be interpolated.
         frequency : str
             The interpolation frequency.
+        method : str, optional
+            The interpolation method, either "linear" or "cubic", by default "linear".
         """
         super().__init__(dataset)
+
+        if method not in ("linear", "cubic"):
+            raise ValueError(f"Unsupported interpolation method '{method}', must be 'linear' or 'cubic'")
+        self.method = method
+
         self._frequency = frequency_to_timedelta(frequency)
 
         self.seconds = self._frequency.total_seconds()
@@ -93,9 +100,8 @@ class InterpolateFrequency(Forwards):
             The interpolated data for the tuple index.
         """
         index, changes = index_to_slices(index, self.shape)
-        index, previous = update_tuple(index, 0, slice(None))
-        result = self._get_slice(previous)
-        return apply_index_to_slices_changes(result[index], changes)
+        result = self._interpolate(np.arange(*index[0].indices(self._len)), index[1:])
+        return apply_index_to_slices_changes(result, changes)
 
     def _get_slice(self, s: slice) -> NDArray[Any]:
         """Get the interpolated data for a slice.
@@ -110,7 +116,7 @@ class InterpolateFrequency(Forwards):
         NDArray[Any]
             The interpolated data for the slice.
         """
-        return np.stack([self[i] for i in range(*s.indices(self._len))])
+        return self._interpolate(np.arange(*s.indices(self._len)))
 
     @debug_indexing
     def __getitem__(self, n: FullIndex) -> NDArray[Any]:
@@ -135,21 +141,101 @@ class InterpolateFrequency(Forwards):
         if n < 0:
             n += self._len
 
-        if n == self._len - 1:
-            # Special case for the last element
-            return self.forward[-1]
+        if not 0 <= n < self._len:
+            raise IndexError(n)
+
+        return self._interpolate(np.array([n]))[0]
+
+    def _weights(self, n: NDArray[Any]) -> Tuple[NDArray[Any], NDArray[Any]]:
+        """Compute the dates of the forward dataset and the weights used to interpolate each date.
+
+        Parameters
+        ----------
+        n : NDArray[Any]
+            The indices of the interpolated dates.
 
+        Returns
+        -------
+        Tuple[NDArray[Any], NDArray[Any]]
+            Two arrays of shape (len(n), taps): the indices in the forward dataset and their weights.
+            Indices that are not needed have a weight of zero.
+        """
         i = n // self.ratio
         x = n % self.ratio
 
-        if x == 0:
-            # No interpolation needed
-            return self.forward[i]
+        # Special case for the last element
+        last = n == self._len - 1
+        i[last] = self.other_len - 1
+        x[last] = 0
+
+        t = self.alphas[x][:, np.newaxis]
+
+        if self.method == "linear":
+            indices = np.stack([i, i + 1], axis=1)
+            weights = np.concatenate([1 - t, t], axis=1)
+        else:
+            # Catmull-Rom spline, with the end points repeated at the boundaries
+            indices = np.stack([i - 1, i, i + 1, i + 2], axis=1)
+            weights = np.concatenate(
+                [
+                    (-(t**3) + 2 * t**2 - t) / 2,
+                    (3 * t**3 - 5 * t**2 + 2) / 2,
+                    (-3 * t**3 + 4 * t**2 + t) / 2,
+                    (t**3 - t**2) / 2,
+                ],
+                axis=1,
+            )
+
+        # No interpolation needed for the dates of the forward dataset
+        exact = x == 0
+        weights[exact] = 0
+        weights[exact, indices.shape[1] // 2 - 1] = 1
+        indices[exact] = i[exact, np.newaxis]
+
+        indices = np.clip(indices, 0, self.other_len - 1)
+        return indices, weights
+
+    def _interpolate(self, n: NDArray[Any], rest: TupleIndex = ()) -> NDArray[Any]:
+        """Compute the interpolated dates, reading each date of the forward dataset once.
 
-        alpha = self.alphas[x]
+        Parameters
+        ----------
+        n : NDArray[Any]
+            The indices of the interpolated dates.
+        rest : TupleIndex, optional
+            The index to apply to the other dimensions.
+
+        Returns
+        -------
+        NDArray[Any]
+            The interpolated data.
+        """
+        rest = tuple(rest)
+
+        if len(n) == 0:
+            return self.forward[(slice(0, 0),) + rest]
 
-        assert 0 < alpha < 1, alpha
-        return self.forward[i] * (1 - alpha) + self.forward[i + 1] * alpha
+        indices, weights = self._weights(n)
+        used = weights != 0
+
+        # Read the dates needed, by contiguous runs
+        needed = np.unique(indices[used])
+        blocks = []
+        for s, _, _ in chunk_aligned_runs(needed):
+            blocks.append(self.forward[(s,) + rest] if rest else self.forward[s])
+        block = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+        positions = np.searchsorted(needed, indices)
+
+        result = np.zeros((len(n),) + block.shape[1:], dtype=block.dtype)
+        shape = (-1,) + (1,) * (block.ndim - 1)
+        for k in range(indices.shape[1]):
+            # Skip the zero weights, so that NaNs in dates that are not used do not propagate
+            rows = np.nonzero(used[:, k])[0]
+            if len(rows):
+                result[rows] += block[positions[rows, k]] * weights[rows, k].astype(block.dtype).reshape(shape)
+
+        return result
 
     def __len__(self) -> int:
         """Get the length of the interpolated dataset.
@@ -190,22 +276,18 @@ class InterpolateFrequency(Forwards):
         Node
             The tree representation of the dataset.
         """
-        return Node(self, [self.forward.tree()], frequency=self.frequency)
+        return Node(self, [self.forward.tree()], frequency=self.frequency, method=self.method)
 
     @cached_property
     def missing(self) -> Set[int]:
-        """Get the missing data indices."""
-        result = []
-        j = 0
-        for i in range(self.other_len):
-            missing = i in self.forward.missing
-            for _ in range(self.ratio):
-                if missing:
-                    result.append(j)
-                j += 1
-
-        result = set(x for x in result if x < self._len)
-        return result
+        """Get the missing data indices, i.e. the dates that need a missing date of the forward dataset."""
+        missing = self.forward.missing
+        if not missing:
+            return set()
+
+        indices, weights = self._weights(np.arange(self._len))
+        needs_missing = np.isin(indices, np.array(sorted(missing))) & (weights != 0)
+        return set(int(x) for x in np.nonzero(needs_missing.any(axis=1))[0])
 
     def forwards_subclass_metadata_specific(self) -> Dict[str, Any]:
         """Get the metadata specific to the InterpolateFrequency subclass.
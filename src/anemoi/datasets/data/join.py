@@ -29,8 +29,10 @@ from .debug import Source
 from .debug import debug_indexing
 from .forwards import Combined
 from .indexing import apply_index_to_slices_changes
+from .indexing import ascending_slice
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
+from .indexing import length_to_slices
 from .indexing import update_tuple
 from .misc import _auto_adjust
 from .misc import _open
@@ -93,13 +95,16 @@ class Join(Combined):
             The data for the tuple index.
         """
         index, changes = index_to_slices(index, self.shape)
-        index, previous = update_tuple(index, 1, slice(None))
 
-        # TODO: optimize if index does not access all datasets, so we don't load chunks we don't need
-        result = [d[index] for d in self.datasets]
+        # Only read the datasets that hold some of the requested variables
+        lengths = [d.shape[1] for d in self.datasets]
+        slices = length_to_slices(index[1], lengths)
+        parts = [(d, update_tuple(index, 1, i)[0]) for (d, i) in zip(self.datasets, slices) if i is not None]
+        if not parts:
+            parts = [(self.datasets[0], update_tuple(index, 1, slice(0, 0))[0])]
 
-        result = np.concatenate(result, axis=1)
-        return apply_index_to_slices_changes(result[:, previous], changes)
+        result = self._read_parts(parts, axis=1)
+        return apply_index_to_slices_changes(result, changes)
 
     @debug_indexing
     def _get_slice(self, s: slice) -> NDArray[Any]:
@@ -115,7 +120,10 @@ class Join(Combined):
         NDArray[Any]
             The data for the slice.
         """
-        return np.stack([self[i] for i in range(*s.indices(self._len))])
+        # The datasets are read in ascending order, negative steps are applied to the result
+        s, reverse = ascending_slice(s, len(self))
+        result = self._read_parts([(d, s) for d in self.datasets], axis=1)
+        return result[::-1] if reverse else result
 
     @debug_indexing
     def __getitem__(self, n: FullIndex) -> NDArray[Any]:
@@ -137,7 +145,7 @@ class Join(Combined):
         if isinstance(n, slice):
             return self._get_slice(n)
 
-        return np.concatenate([d[n] for d in self.datasets])
+        return self._read_parts([(d, n) for d in self.datasets], axis=0)
 
     @cached_property
     def shape(self) -> Shape:
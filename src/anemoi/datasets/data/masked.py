@@ -29,12 +29,18 @@ from .debug import Node
 from .debug import debug_indexing
 from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
+from .indexing import chunk_aligned_runs
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
 from .indexing import update_tuple
 
 LOG = logging.getLogger(__name__)
 
+# Above this number of reads, or if the reads cover more than this ratio of the range
+# spanned by the mask, masked datasets read the whole range at once
+MAX_MASKED_READS = 32
+DENSE_MASK_RATIO = 0.75
+
 
 class Masked(Forwards):
     """A class to represent a masked dataset."""
@@ -88,11 +94,7 @@ class Masked(Forwards):
         if isinstance(index, tuple):
             return self._get_tuple(index)
 
-        result = self.forward[index]
-        # We don't support subsetting the grid values
-        assert result.shape[-1] == len(self.mask), (result.shape, len(self.mask))
-
-        return result[..., self.mask]
+        return self._get_tuple((index,))
 
     @debug_indexing
     @expand_list_indexing
@@ -111,12 +113,71 @@ class Masked(Forwards):
         """
         index, changes = index_to_slices(index, self.shape)
         index, previous = update_tuple(index, self.axis, slice(None))
-        result = self.forward[index]
-        result = result[..., self.mask]
+        result = self._read_masked(index)
         result = result[..., previous]
         result = apply_index_to_slices_changes(result, changes)
         return result
 
+    @cached_property
+    def _masked_reads(self) -> List[Tuple[slice, NDArray[Any], NDArray[Any]]]:
+        """The ranges of grid points to read from the forward dataset, aligned on its chunking.
+
+        Returns
+        -------
+        List[Tuple[slice, NDArray[Any], NDArray[Any]]]
+            For each read, the range of grid points to read, the positions of the
+            selected points in the result and their offsets in the range.
+        """
+        selected = np.nonzero(self.mask)[0]
+        if len(selected) == 0:
+            return []
+
+        chunks = getattr(self.forward, "chunks", None)
+        chunk = chunks[self.axis] if chunks else len(self.mask)
+
+        reads = chunk_aligned_runs(selected, chunk)
+
+        # When the mask is dense, or would need too many reads, it is cheaper to
+        # read the range that covers all the selected points at once
+        covered = sum(s.stop - s.start for s, _, _ in reads)
+        bounding = selected[-1] + 1 - selected[0]
+        if len(reads) > MAX_MASKED_READS or covered > DENSE_MASK_RATIO * bounding:
+            reads = [(slice(int(selected[0]), int(selected[-1]) + 1), np.arange(len(selected)), selected - selected[0])]
+
+        return reads
+
+    def _read_masked(self, index: TupleIndex) -> NDArray[Any]:
+        """Read the selected grid points from the forward dataset.
+
+        Parameters
+        ----------
+        index : TupleIndex
+            The index of the other dimensions, with a full slice on the grid axis.
+
+        Returns
+        -------
+        NDArray[Any]
+            The data at the selected grid points.
+        """
+        reads = self._masked_reads
+        if len(reads) == 0:
+            result = self.forward[index]
+            return result[..., self.mask]
+
+        result = None
+        for s, positions, offsets in reads:
+            part, _ = update_tuple(index, self.axis, s)
+            part = self.forward[part]
+            if len(reads) == 1:
+                if len(offsets) == s.stop - s.start:
+                    return part
+                return part[..., offsets]
+            if result is None:
+                result = np.empty(part.shape[:-1] + (self.shape[-1],), dtype=part.dtype)
+            result[..., positions] = part[..., offsets]
+
+        return result
+
     def collect_supporting_arrays(self, collected: List[Tuple], *path: Any) -> None:
         """Collect supporting arrays.
 
@@ -11,6 +11,7 @@
 import datetime
 import logging
 from functools import cached_property
+from functools import partial
 from typing import Any
 from typing import Dict
 from typing import List
@@ -23,16 +24,18 @@ from numpy.typing import NDArray
 from . import MissingDateError
 from .dataset import Dataset
 from .dataset import FullIndex
+from .dataset import Shape
 from .dataset import TupleIndex
 from .debug import Node
 from .debug import debug_indexing
 from .forwards import Combined
 from .indexing import apply_index_to_slices_changes
+from .indexing import chunk_aligned_runs
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
-from .indexing import update_tuple
 from .misc import _auto_adjust
 from .misc import _open
+from .parallel import read_into
 
 LOG = logging.getLogger(__name__)
 
@@ -105,7 +108,7 @@ class Merge(Combined):
 
         self._dates = np.array(_dates, dtype="datetime64[s]")
         self._indices = np.array(indices)
-        self._frequency = frequency.astype(object)
+        self._frequency = frequency
 
     def __len__(self) -> int:
         """Get the number of dates in the merged dataset.
@@ -127,6 +130,11 @@ class Merge(Combined):
         """Get the frequency of the dates in the merged dataset."""
         return self._frequency
 
+    @property
+    def shape(self) -> Shape:
+        """Get the shape of the merged dataset."""
+        return (len(self),) + self.datasets[0].shape[1:]
+
     @cached_property
     def missing(self) -> Set[int]:
         """Get the indices of missing dates in the merged dataset."""
@@ -202,6 +210,16 @@ class Merge(Combined):
         """
         return {"allow_gaps_in_dates": self.allow_gaps_in_dates}
 
+    def forwards_subclass_metadata_specific(self) -> Dict[str, Any]:
+        """Get the metadata specific to the forwards subclass.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The metadata specific to the forwards subclass.
+        """
+        return {}
+
     @debug_indexing
     def __getitem__(self, n: FullIndex) -> NDArray[Any]:
         """Get the item at the specified index.
@@ -245,9 +263,8 @@ class Merge(Combined):
             Retrieved item.
         """
         index, changes = index_to_slices(index, self.shape)
-        index, previous = update_tuple(index, 0, slice(None))
-        result = self._get_slice(previous)
-        return apply_index_to_slices_changes(result[index], changes)
+        result = self._read_dates(index[0], index[1:])
+        return apply_index_to_slices_changes(result, changes)
 
     def _get_slice(self, s: slice) -> NDArray[Any]:
         """Get the items in the specified slice.
@@ -262,7 +279,42 @@ class Merge(Combined):
         NDArray[Any]
             Retrieved items.
         """
-        return np.stack([self[i] for i in range(*s.indices(self._len))])
+        return self._read_dates(s)
+
+    def _read_dates(self, s: slice, rest: TupleIndex = ()) -> NDArray[Any]:
+        """Read the dates of a slice, with one read per contiguous run of dates of each dataset.
+
+        Parameters
+        ----------
+        s : slice
+            Slice of dates to retrieve.
+        rest : TupleIndex, optional
+            Index to apply to the other dimensions.
+
+        Returns
+        -------
+        NDArray[Any]
+            Retrieved items.
+        """
+        rest = tuple(rest)
+        n = np.arange(*s.indices(self._len))
+        datasets, rows = self._indices[n].T
+
+        missing = np.nonzero(datasets == self._missing_index)[0]
+        if len(missing):
+            k = n[missing[0]]
+            raise MissingDateError(f"Date {self.dates[k]} is missing (index={k})")
+
+        shape = (len(n),) + self._read_shape(self.shape[1:], rest)
+        out = np.empty(shape, dtype=np.result_type(*[d.dtype for d in self.datasets]))
+
+        reads = []
+        for i, d in enumerate(self.datasets):
+            positions = np.nonzero(datasets == i)[0]
+            for run, where, _ in chunk_aligned_runs(rows[positions]):
+                reads.append((positions[where], partial(d.__getitem__, (run,) + rest if rest else run)))
+
+        return read_into(out, reads, self.parallel_reads)
 
 
 def merge_factory(args: Tuple, kwargs: Dict[str, Any]) -> Dataset:
@@ -0,0 +1,158 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from numpy.typing import NDArray
+
+from .dataset import Dataset
+from .debug import Node
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_PARALLEL_READS = 8
+
+# One pool per process and per size, shared by all the datasets of all the trees
+_POOLS: Dict[Tuple[int, int], ThreadPoolExecutor] = {}
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def _executor(workers: int) -> ThreadPoolExecutor:
+    """Return the thread pool of the given size, created on first use in each process.
+
+    Parameters
+    ----------
+    workers : int
+        The number of threads.
+
+    Returns
+    -------
+    ThreadPoolExecutor
+        The thread pool.
+    """
+    key = (os.getpid(), workers)
+    with _LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="anemoi-reads",
+                initializer=_mark_worker,
+            )
+        return _POOLS[key]
+
+
+def _mark_worker() -> None:
+    """Flag the threads of the pools, so that nested combinations do not wait on the pool they run in."""
+    _LOCAL.worker = True
+
+
+def read_into(
+    out: NDArray[Any],
+    reads: List[Tuple[Any, Callable[[], NDArray[Any]]]],
+    workers: Optional[int] = None,
+) -> NDArray[Any]:
+    """Run several reads and write their results into a preallocated array.
+
+    Parameters
+    ----------
+    out : NDArray[Any]
+        The array to write to.
+    reads : List[Tuple[Any, Callable[[], NDArray[Any]]]]
+        For each read, the index of `out` to write to and the function that reads the data.
+    workers : Optional[int], optional
+        The number of threads to use. The reads are sequential if `None`, if there is only
+        one read, or if called from one of the threads of the pool.
+
+    Returns
+    -------
+    NDArray[Any]
+        The array `out`.
+    """
+
+    def _read(target: Any, read: Callable[[], NDArray[Any]]) -> None:
+        out[target] = read()
+
+    if not workers or workers < 2 or len(reads) < 2 or getattr(_LOCAL, "worker", False):
+        for target, read in reads:
+            _read(target, read)
+        return out
+
+    executor = _executor(workers)
+    futures = [executor.submit(_read, target, read) for target, read in reads]
+    for future in futures:
+        # Re-raise the first error, if any
+        future.result()
+
+    return out
+
+
+def _collect_combined(node: Node, result: List[Dataset]) -> None:
+    """Collect the combined datasets of a dataset tree.
+
+    Parameters
+    ----------
+    node : Node
+        The tree node.
+    result : List[Dataset]
+        The list to add the combined datasets to.
+    """
+    from .forwards import Combined
+
+    if isinstance(node.dataset, Combined):
+        result.append(node.dataset)
+
+    for kid in node.kids:
+        _collect_combined(kid, result)
+
+
+def set_parallel_reads(dataset: Dataset, parallel: Union[bool, int]) -> Optional[int]:
+    """Make all the combined datasets of a tree read their members concurrently.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        The dataset.
+    parallel : Union[bool, int]
+        The number of threads shared by the tree, `True` for the default, or `False` to read sequentially.
+
+    Returns
+    -------
+    Optional[int]
+        The number of threads, or `None` if the reads are sequential.
+    """
+    if parallel is True:
+        parallel = DEFAULT_PARALLEL_READS
+
+    if parallel is False or parallel is None:
+        workers = None
+    elif isinstance(parallel, int) and parallel > 0:
+        workers = parallel
+    else:
+        raise ValueError(f"Invalid value for `parallel`: {parallel}")
+
+    combined: List[Dataset] = []
+    _collect_combined(dataset.tree(), combined)
+
+    for d in combined:
+        d.parallel_reads = workers
+
+    LOG.debug("Parallel reads with %s threads for %d combined datasets", workers, len(combined))
+    return workers
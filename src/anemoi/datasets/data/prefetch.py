@@ -0,0 +1,223 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .dataset import Dataset
+from .dataset import FullIndex
+from .debug import Node
+from .forwards import Forwards
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_SIZE = 4
+
+
+class Prefetch(Forwards):
+    """Read ahead the items that are likely to be requested next.
+
+    The stride between the last two integer accesses is used to predict the
+    next `size` items, which are read in a pool of background threads and kept
+    in a bounded buffer until they are requested. Slices and tuples are not
+    prefetched and are forwarded as is.
+
+    Attributes
+    ----------
+    size : int
+        The maximum number of items read ahead.
+    workers : int
+        The number of background threads.
+    hits : int
+        The number of requests served from the buffer.
+    misses : int
+        The number of requests read synchronously.
+    """
+
+    def __init__(self, dataset: Dataset, prefetch: Union[bool, int, Dict[str, Any]]) -> None:
+        """Initialize the Prefetch object.
+
+        Parameters
+        ----------
+        dataset : Dataset
+            The dataset to read from.
+        prefetch : Union[bool, int, Dict[str, Any]]
+            `True` for the default settings, the number of items to read ahead,
+            or a dictionary with the keys `size` and `workers`.
+        """
+        super().__init__(dataset)
+
+        if prefetch is True:
+            prefetch = {}
+
+        if isinstance(prefetch, int):
+            prefetch = {"size": prefetch}
+
+        if not isinstance(prefetch, dict):
+            raise ValueError(f"Invalid value for `prefetch`: {prefetch}")
+
+        prefetch = dict(prefetch)
+        self.size = int(prefetch.pop("size", DEFAULT_SIZE))
+        self.workers = int(prefetch.pop("workers", min(self.size, DEFAULT_SIZE)))
+
+        if prefetch:
+            raise ValueError(f"Unsupported `prefetch` options: {', '.join(prefetch)}")
+
+        if self.size < 1 or self.workers < 1:
+            raise ValueError(f"Invalid `prefetch` settings: size={self.size}, workers={self.workers}")
+
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        """Reset the state that cannot be shared with another process."""
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._buffer: "OrderedDict[int, Future]" = OrderedDict()
+        self._last: Optional[int] = None
+        self._stride = 1
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop the threads and the buffer when pickling."""
+        state = self.__dict__.copy()
+        for key in ("_lock", "_executor", "_buffer"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the object after unpickling."""
+        self.__dict__.update(state)
+        self._reset()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The thread pool, created on first use so that it is not shared across a fork()."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="anemoi-prefetch")
+        return self._executor
+
+    def _predict(self, n: int) -> List[int]:
+        """Predict the next items to be requested.
+
+        Parameters
+        ----------
+        n : int
+            The item that has just been requested.
+
+        Returns
+        -------
+        List[int]
+            The items to read ahead, in order of expected access.
+        """
+        if self._last is not None and n != self._last:
+            self._stride = n - self._last
+        self._last = n
+
+        length = len(self)
+        result = []
+        for k in range(1, self.size + 1):
+            i = n + k * self._stride
+            if not 0 <= i < length:
+                break
+            result.append(i)
+        return result
+
+    def _schedule(self, n: int) -> None:
+        """Submit the reads of the predicted items, and drop the ones that are no longer expected.
+
+        Parameters
+        ----------
+        n : int
+            The item that has just been requested.
+        """
+        predicted = self._predict(n)
+        expected = set(predicted)
+
+        for i in [i for i in self._buffer if i not in expected]:
+            self._buffer.pop(i).cancel()
+
+        for i in predicted:
+            if i not in self._buffer:
+                self._buffer[i] = self.executor.submit(self.forward.__getitem__, i)
+
+    def __getitem__(self, n: FullIndex) -> NDArray[Any]:
+        """Retrieve an item, from the buffer if it has been read ahead.
+
+        Parameters
+        ----------
+        n : FullIndex
+            The index of the item.
+
+        Returns
+        -------
+        NDArray[Any]
+            The item.
+        """
+        if not isinstance(n, (int, np.integer)):
+            return self.forward[n]
+
+        n = int(n)
+        if n < 0:
+            n += len(self)
+
+        if self._pid != os.getpid():
+            self._reset()
+
+        with self._lock:
+            future = self._buffer.pop(n, None)
+            if future is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._schedule(n)
+
+        if future is not None:
+            return future.result()
+
+        return self.forward[n]
+
+    @property
+    def prefetch_statistics(self) -> Dict[str, int]:
+        """The number of hits and misses, and the number of items currently buffered."""
+        return dict(hits=self.hits, misses=self.misses, buffered=len(self._buffer))
+
+    def tree(self) -> Node:
+        """Get the tree representation of the dataset.
+
+        Returns
+        -------
+        Node
+            The tree representation of the dataset.
+        """
+        return Node(self, [self.forward.tree()], size=self.size, workers=self.workers)
+
+    def forwards_subclass_metadata_specific(self) -> Dict[str, Any]:
+        """Get the metadata specific to the forwards subclass.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The metadata specific to the forwards subclass.
+        """
+        return {}
@@ -30,7 +30,6 @@ from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
-from .indexing import update_tuple
 
 LOG = logging.getLogger(__name__)
 
@@ -113,6 +112,16 @@ class Rescale(Forwards):
                 self.rescale[v] = a, b
                 self._a[i], self._b[i] = a, b
 
+        # Fold nested rescalings, so that only one multiply-add is applied
+        while isinstance(self.forward, Rescale):
+            inner = self.forward
+            for i, v in enumerate(variables):
+                if v in inner.rescale:
+                    a, b = inner.rescale[v]
+                    self._a[i], self._b[i] = self._a[i] * a, self._a[i] * b + self._b[i]
+                    self.rescale[v] = float(self._a[i]), float(self._b[i])
+            self.forward = inner.forward
+
         self._a = self._a[np.newaxis, :, np.newaxis, np.newaxis]
         self._b = self._b[np.newaxis, :, np.newaxis, np.newaxis]
 
@@ -155,13 +164,33 @@ class Rescale(Forwards):
             The rescaled data.
         """
         index, changes = index_to_slices(index, self.shape)
-        index, previous = update_tuple(index, 1, slice(None))
         result = self.forward[index]
-        result = result * self._a + self._b
-        result = result[:, previous]
+        result = self._rescale(result, self._a[:, index[1]], self._b[:, index[1]])
         result = apply_index_to_slices_changes(result, changes)
         return result
 
+    @staticmethod
+    def _rescale(data: NDArray[Any], a: NDArray[Any], b: NDArray[Any]) -> NDArray[Any]:
+        """Compute `data * a + b`, with a single allocation.
+
+        Parameters
+        ----------
+        data : NDArray[Any]
+            The data to rescale.
+        a : NDArray[Any]
+            The scale.
+        b : NDArray[Any]
+            The offset.
+
+        Returns
+        -------
+        NDArray[Any]
+            The rescaled data.
+        """
+        result = np.multiply(data, a)
+        result += b
+        return result
+
     @debug_indexing
     def __get_slice_(self, n: slice) -> NDArray[Any]:
         """Get a slice of rescaled data.
@@ -177,7 +206,7 @@ class Rescale(Forwards):
             The rescaled data.
         """
         data = self.forward[n]
-        return data * self._a + self._b
+        return self._rescale(data, self._a, self._b)
 
     @debug_indexing
     def __getitem__(self, n: FullIndex) -> NDArray[Any]:
@@ -201,7 +230,7 @@ class Rescale(Forwards):
 
         data = self.forward[n]
 
-        return data * self._a[0] + self._b[0]
+        return self._rescale(data, self._a[0], self._b[0])
 
     @cached_property
     def statistics(self) -> Dict[str, NDArray[Any]]:
@@ -29,6 +29,7 @@ from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
+from .indexing import make_slice_or_index_from_list_or_tuple
 from .indexing import update_tuple
 
 LOG = logging.getLogger(__name__)
@@ -104,10 +105,20 @@ class Select(Forwards):
             The retrieved data.
         """
         index, changes = index_to_slices(index, self.shape)
-        index, previous = update_tuple(index, 1, slice(None))
-        result = self.dataset[index]
-        result = result[:, self.indices]
-        result = result[:, previous]
+        indices = [self.indices[i] for i in range(*index[1].indices(len(self.indices)))]
+        columns = make_slice_or_index_from_list_or_tuple(indices)
+
+        if isinstance(columns, slice):
+            index, _ = update_tuple(index, 1, columns)
+            result = self.dataset[index]
+        else:
+            # Only read the range of variables that covers the selection
+            first = min(indices, default=0)
+            last = max(indices, default=-1)
+            index, _ = update_tuple(index, 1, slice(first, last + 1))
+            result = self.dataset[index]
+            result = result[:, [i - first for i in indices]]
+
         result = apply_index_to_slices_changes(result, changes)
         return result
 
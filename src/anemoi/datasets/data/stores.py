@@ -12,12 +12,17 @@ import datetime
 import logging
 import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Sequence
 from typing import Set
+from typing import Tuple
 from typing import Union
 from urllib.parse import urlparse
 
@@ -38,8 +43,14 @@ from .debug import debug_indexing
 from .indexing import expand_list_indexing
 from .misc import load_config
 
+if TYPE_CHECKING:
+    from .chunk_cache import DecodedChunkCache
+
 LOG = logging.getLogger(__name__)
 
+DEFAULT_REMOTE_CONCURRENCY = 16
+DEFAULT_REMOTE_RETRIES = 5
+
 
 class ReadOnlyStore(zarr.storage.BaseStore):
     """A base class for read-only stores."""
@@ -61,18 +72,108 @@ class ReadOnlyStore(zarr.storage.BaseStore):
         raise NotImplementedError()
 
 
-class HTTPStore(ReadOnlyStore):
+class ConcurrentStore(ReadOnlyStore):
+    """A base class for remote read-only stores that fetch several keys concurrently.
+
+    Zarr calls `getitems` with all the chunks needed by a selection, so a slice that
+    spans many chunks is retrieved with parallel requests instead of serial round trips.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None) -> None:
+        """Initialize the store with the maximum number of concurrent requests.
+
+        Parameters
+        ----------
+        concurrency : Optional[int]
+            The maximum number of concurrent requests. Defaults to the `remote_concurrency`
+            entry of the `[datasets]` section of the configuration, or 16.
+        """
+        if concurrency is None:
+            concurrency = load_config()["datasets"].get("remote_concurrency", DEFAULT_REMOTE_CONCURRENCY)
+        self.concurrency = int(concurrency)
+        self._pid = None
+        self._executor = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Do not pickle the thread pool."""
+        state = self.__dict__.copy()
+        state["_pid"] = None
+        state["_executor"] = None
+        return state
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The thread pool, created on first use in each process."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="anemoi-store")
+        return self._executor
+
+    def _get_or_none(self, key: str) -> Tuple[str, Optional[bytes]]:
+        """Retrieve an item, or None if it does not exist."""
+        try:
+            return key, self[key]
+        except KeyError:
+            return key, None
+
+    def getitems(self, keys: Sequence[str], *, contexts: Mapping[str, Any]) -> Dict[str, bytes]:
+        """Retrieve several items concurrently. Missing keys are not included in the result."""
+        keys = list(keys)
+
+        if len(keys) < 2 or self.concurrency < 2:
+            results = map(self._get_or_none, keys)
+        else:
+            results = self.executor.map(self._get_or_none, keys)
+
+        return {key: value for key, value in results if value is not None}
+
+
+class HTTPStore(ConcurrentStore):
     """A read-only store for HTTP(S) resources."""
 
-    def __init__(self, url: str) -> None:
+    def __init__(self, url: str, concurrency: Optional[int] = None, retries: Optional[int] = None) -> None:
         """Initialize the HTTPStore with a URL."""
+        super().__init__(concurrency)
         self.url = url
+        if retries is None:
+            retries = load_config()["datasets"].get("remote_retries", DEFAULT_REMOTE_RETRIES)
+        self.retries = int(retries)
+        self._session = None
+        self._session_pid = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Do not pickle the HTTP session."""
+        state = super().__getstate__()
+        state["_session"] = None
+        state["_session_pid"] = None
+        return state
+
+    @property
+    def session(self) -> Any:
+        """A session with a connection pool sized for the concurrent requests, and retries with backoff."""
+        if self._session_pid != os.getpid():
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=self.retries,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.concurrency, 1), max_retries=retry)
+
+            self._session = requests.Session()
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+            self._session_pid = os.getpid()
+
+        return self._session
 
     def __getitem__(self, key: str) -> bytes:
         """Retrieve an item from the store."""
-        import requests
-
-        r = requests.get(self.url + "/" + key)
+        r = self.session.get(self.url + "/" + key)
 
         if r.status_code == 404:
             raise KeyError(key)
@@ -81,7 +182,7 @@ class HTTPStore(ReadOnlyStore):
         return r.content
 
 
-class S3Store(ReadOnlyStore):
+class S3Store(ConcurrentStore):
     """A read-only store for S3 resources."""
 
     """We write our own S3Store because the one used by zarr (s3fs)
@@ -89,10 +190,11 @@ class S3Store(ReadOnlyStore):
     options using the anemoi configs.
     """
 
-    def __init__(self, url: str, region: Optional[str] = None) -> None:
+    def __init__(self, url: str, region: Optional[str] = None, concurrency: Optional[int] = None) -> None:
         """Initialize the S3Store with a URL and optional region."""
         from anemoi.utils.remote.s3 import s3_client
 
+        super().__init__(concurrency)
         _, _, self.bucket, self.key = url.split("/", 3)
         self.s3 = s3_client(self.bucket, region=region)
 
@@ -251,6 +353,12 @@ class Zarr(Dataset):
         """Return the missing dates of the dataset."""
         return self._missing
 
+    def set_decoded_chunk_cache(self, cache: "DecodedChunkCache") -> None:
+        """Read the data through a cache of decoded chunks."""
+        from .chunk_cache import CachedArray
+
+        self.data = CachedArray(self.z.data, cache, self.path)
+
     @classmethod
     def from_name(cls, name: str) -> "Zarr":
         """Create a Zarr dataset from a name."""
@@ -31,6 +31,7 @@ from .debug import Source
 from .debug import debug_indexing
 from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
+from .indexing import chunk_aligned_runs
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
 from .indexing import make_slice_or_index_from_list_or_tuple
@@ -202,7 +203,7 @@ class Subset(Forwards):
         indices = make_slice_or_index_from_list_or_tuple(indices)
         if isinstance(indices, slice):
             return self.dataset[indices]
-        return np.stack([self.dataset[i] for i in indices])
+        return self._gather(indices)
 
     @debug_indexing
     @expand_list_indexing
@@ -218,11 +219,40 @@ class Subset(Forwards):
         index, changes = index_to_slices(n, self.shape)
         indices = [self.indices[i] for i in range(*index[0].indices(self._len))]
         indices = make_slice_or_index_from_list_or_tuple(indices)
-        index, _ = update_tuple(index, 0, indices)
-        result = self.dataset[index]
+        if isinstance(indices, slice):
+            index, _ = update_tuple(index, 0, indices)
+            result = self.dataset[index]
+        else:
+            result = self._gather(indices, index[1:])
         result = apply_index_to_slices_changes(result, changes)
         return result
 
+    def _gather(self, indices: List[int], rest: TupleIndex = ()) -> NDArray[Any]:
+        """Read a list of dates from the underlying dataset, visiting each storage chunk once.
+
+        Parameters:
+        indices (List[int]): The indices of the dates in the underlying dataset.
+        rest (TupleIndex): The index to apply to the other dimensions.
+
+        Returns:
+        NDArray[Any]: The data, in the order of `indices`.
+        """
+        rest = tuple(rest)
+        if not indices:
+            return self.dataset[(slice(0, 0),) + rest]
+
+        chunks = getattr(self.dataset, "chunks", None)
+        chunk = chunks[0] if chunks else 1
+
+        result = None
+        for s, positions, offsets in chunk_aligned_runs(indices, chunk, self.dataset.missing):
+            block = self.dataset[(s,) + rest] if rest else self.dataset[s]
+            if result is None:
+                result = np.empty((len(indices),) + block.shape[1:], dtype=block.dtype)
+            result[positions] = block[offsets]
+
+        return result
+
     def __len__(self) -> int:
         """Get the length of the subset.
 
@@ -0,0 +1,185 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import datetime
+import logging
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import earthkit.data as ekd
+import eccodes
+import numpy as np
+import pytest
+from anemoi.utils.testing import skip_slow_tests
+from earthkit.data.core.temporary import temp_file
+from earthkit.data.readers.grib.output import new_grib_output
+
+from anemoi.datasets.create.sources import accumulations
+from anemoi.datasets.create.sources import accumulations2
+
+LOG = logging.getLogger(__name__)
+
+KEYS = (
+    "param",
+    "number",
+    "date",
+    "time",
+    "step",
+    "startStep",
+    "endStep",
+    "stepRange",
+    "stepType",
+    "valid_datetime",
+)
+
+
+class _GribOutput:
+    """The temporary GRIB file the accumulations used to be written to, and re-read from."""
+
+    def __init__(self) -> None:
+        self.tmp = temp_file()
+        self.out = new_grib_output(self.tmp.path)
+
+    def write(self, values: np.ndarray, template: Any, **metadata: Any) -> None:
+        self.out.write(values, template=template, **metadata)
+
+    def close(self) -> None:
+        self.out.close()
+
+    def to_fieldlist(self) -> Any:
+        ds = ekd.from_source("file", self.tmp.path)
+        ds._tmp = self.tmp
+        return ds
+
+
+class _Mars:
+    """Return accumulated GRIB fields for the requests of the accumulations sources."""
+
+    def __init__(self, period: int, grid: float = 10.0) -> None:
+        # period=0 for fields accumulated from the start of the forecast, otherwise the length of the accumulations
+        self.period = period
+        self.grid = grid
+        self.messages: Dict[Tuple[Any, ...], bytes] = {}
+
+    def _message(self, request: Dict[str, Any], step: int) -> bytes:
+        key = (request["param"], request.get("number", 0), request["date"], request["time"], step)
+        if key not in self.messages:
+            handle = eccodes.codes_grib_new_from_samples("regular_ll_sfc_grib2")
+            eccodes.codes_set(handle, "shortName", request["param"])
+            ni, nj = int(360 / self.grid), int(180 / self.grid) + 1
+            eccodes.codes_set_long(handle, "Ni", ni)
+            eccodes.codes_set_long(handle, "Nj", nj)
+            eccodes.codes_set(handle, "latitudeOfFirstGridPointInDegrees", 90.0)
+            eccodes.codes_set(handle, "latitudeOfLastGridPointInDegrees", -90.0)
+            eccodes.codes_set(handle, "iDirectionIncrementInDegrees", self.grid)
+            eccodes.codes_set(handle, "jDirectionIncrementInDegrees", self.grid)
+            eccodes.codes_set(handle, "longitudeOfLastGridPointInDegrees", 360 - self.grid)
+            eccodes.codes_set(handle, "dataDate", int(request["date"]))
+            eccodes.codes_set(handle, "dataTime", int(request["time"]))
+            eccodes.codes_set(handle, "productDefinitionTemplateNumber", 11)
+            eccodes.codes_set(handle, "number", int(request.get("number", 0)))
+            eccodes.codes_set(handle, "stepType", "accum")
+            eccodes.codes_set(handle, "startStep", 0 if self.period == 0 else max(step - self.period, 0))
+            eccodes.codes_set(handle, "endStep", step)
+            size = ni * nj
+            rng = np.random.default_rng(abs(hash(key)) % 2**32)
+            values = (step if self.period == 0 else 1) + rng.random(size)
+            eccodes.codes_set_values(handle, values)
+            self.messages[key] = eccodes.codes_get_message(handle)
+            eccodes.codes_release(handle)
+        return self.messages[key]
+
+    def __call__(self, context: Any, dates: List[datetime.datetime], *requests: Any, **kwargs: Any) -> Any:
+        messages = []
+        for r in requests:
+            for step in r["step"] if isinstance(r["step"], (list, tuple)) else [r["step"]]:
+                messages.append(self._message(r, int(step)))
+        return ekd.from_source("memory", b"".join(messages))
+
+
+class _Context:
+    def trace(self, *args: Any) -> None:
+        pass
+
+
+DATES = [datetime.datetime(2020, 1, 1, 6) + datetime.timedelta(hours=6 * i) for i in range(4)]
+
+
+def _accumulations(monkeypatch: Any, grid: float = 10.0) -> Any:
+    monkeypatch.setattr(accumulations, "mars", _Mars(0, grid))
+    return accumulations._compute_accumulations(
+        _Context(), DATES, dict(param=["tp", "cp"], number=[0, 1], **{"class": "od"}), user_accumulation_period=6
+    )
+
+
+def _accumulations2(monkeypatch: Any, grid: float = 10.0) -> Any:
+    monkeypatch.setattr(accumulations2, "mars", _Mars(1, grid))
+    monkeypatch.setattr(accumulations2, "xprint", lambda *args: None)
+    return accumulations2._compute_accumulations(
+        _Context(),
+        DATES,
+        dict(param=["tp", "cp"], number=[0, 1], stream="oper", **{"class": "ea"}),
+        user_accumulation_period=datetime.timedelta(hours=6),
+    )
+
+
+@pytest.mark.parametrize("compute", [_accumulations, _accumulations2])
+def test_accumulations_in_memory(compute: Any, monkeypatch: Any) -> None:
+    """Test that the fields computed in memory are those that used to be re-read from a GRIB file."""
+
+    result = compute(monkeypatch)
+    assert len(result) == len(DATES) * 4
+
+    with monkeypatch.context() as m:
+        for module in (accumulations, accumulations2):
+            m.setattr(module, "FieldListOutput", _GribOutput)
+        expected = compute(monkeypatch)
+
+    def key(field: Any) -> Tuple[Any, ...]:
+        return tuple(field.metadata(k) for k in KEYS)
+
+    result = sorted(result, key=key)
+    expected = sorted(expected, key=key)
+    assert [key(f) for f in result] == [key(f) for f in expected]
+    assert sorted(set(f.metadata("valid_datetime") for f in result)) == [d.isoformat() for d in DATES]
+
+    for f, g in zip(result, expected):
+        assert f.shape == g.shape
+        assert f.metadata(namespace="mars") == g.metadata(namespace="mars")
+        assert f.datetime() == g.datetime()
+        assert np.array_equal(f.to_latlon()["lat"], g.to_latlon()["lat"])
+        # The GRIB encoding loses some precision
+        assert np.allclose(f.to_numpy(flatten=True), g.to_numpy(flatten=True), atol=1e-3)
+
+
+@skip_slow_tests
+@pytest.mark.parametrize("compute", [_accumulations, _accumulations2])
+def test_accumulations_in_memory_benchmark(compute: Any, monkeypatch: Any) -> None:
+    """Compare the time to compute a group of accumulations on a 0.25 degree grid, with and without a GRIB file."""
+
+    def run() -> float:
+        start = time.time()
+        ds = compute(monkeypatch, grid=0.25)
+        for f in ds:
+            f.to_numpy(flatten=True)
+        return time.time() - start
+
+    # Warm up the cache of the fake retrievals
+    run()
+    elapsed = run()
+
+    with monkeypatch.context() as m:
+        for module in (accumulations, accumulations2):
+            m.setattr(module, "FieldListOutput", _GribOutput)
+        reference = run()
+
+    LOG.info("%s: in memory: %.2fs, GRIB round trip: %.2fs", compute.__name__, elapsed, reference)
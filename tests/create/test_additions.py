@@ -0,0 +1,100 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+from typing import Any
+from typing import Dict
+from typing import List
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets.create import InitAdditions
+from anemoi.datasets.create import RunAdditions
+from anemoi.datasets.create import _RunAdditions
+from anemoi.datasets.create.persistent import build_storage
+
+DELTAS = ["6h", "12h", "1d"]
+
+
+def _create_dataset(path: str) -> None:
+    """Write a small 6-hourly dataset, with missing dates, in the layout of the create command."""
+    dates = np.arange("2021-01-01T00", "2021-01-11T00", np.timedelta64(6, "h"), dtype="datetime64[s]")
+    data = np.random.default_rng(42).random((len(dates), 3, 1, 20))
+
+    root = zarr.open_group(path, mode="w")
+    root.create_dataset("data", data=data, chunks=(1, 3, 1, 20), compressor=None)
+    root.create_dataset("dates", data=dates, compressor=None)
+    root.create_dataset("latitudes", data=np.linspace(-90, 90, 20), compressor=None)
+    root.create_dataset("longitudes", data=np.linspace(0, 360, 20), compressor=None)
+
+    root.attrs.update(
+        frequency="6h",
+        resolution="o96",
+        name_to_index={"a": 0, "b": 1, "c": 2},
+        variables=["a", "b", "c"],
+        variables_metadata={"a": {}, "b": {}, "c": {}},
+        data_request={"grid": 1, "area": "g", "param_level": {}},
+        start_date="2021-01-01T00:00:00",
+        end_date="2021-01-10T18:00:00",
+        statistics_start_date="2021-01-01T00:00:00",
+        statistics_end_date="2021-01-09T00:00:00",
+        missing_dates=["2021-01-02T06:00:00", "2021-01-05T12:00:00", "2021-01-05T18:00:00"],
+        allow_nans=False,
+        variables_with_nans=[],
+    )
+
+
+def _tendencies(path: str) -> Dict[str, Dict[Any, Any]]:
+    """Return the statistics of the tendencies stored for each delta, by date."""
+    result = {}
+    for delta in DELTAS:
+        actor = _RunAdditions(path=path, delta=delta)
+        storage = build_storage(directory=actor.tmp_storage_path, create=False)
+        result[delta] = {date: (i, stats) for date, (_, i, stats) in storage.items()}
+    return result
+
+
+def _compare(a: Dict[str, Dict[Any, Any]], b: Dict[str, Dict[Any, Any]]) -> None:
+    for delta in DELTAS:
+        assert sorted(a[delta]) == sorted(b[delta]), delta
+        for date, (i, stats) in a[delta].items():
+            j, other = b[delta][date]
+            assert i == j
+            if stats == "missing":
+                assert other == "missing", (delta, date)
+                continue
+            assert other != "missing", (delta, date)
+            for k, v in stats.items():
+                assert np.allclose(v, other[k], equal_nan=True), (delta, date, k)
+
+
+@pytest.mark.parametrize("parts", [[None], ["1/3", "2/3", "3/3"]])
+def test_run_additions(tmp_path, parts: List[Any]) -> None:
+    """Test that the tendencies of all the deltas computed in one pass are those of the per-delta runs."""
+    path = str(tmp_path / "dataset.zarr")
+    _create_dataset(path)
+
+    InitAdditions(path=path, delta=DELTAS).run()
+    for delta in DELTAS:
+        _RunAdditions(path=path, delta=delta).run()
+    expected = _tendencies(path)
+
+    # Missing dates, and the first dates for which the date `delta` before is not in the dataset
+    assert expected["6h"][np.datetime64("2021-01-02T06:00:00")][1] == "missing"
+    assert expected["6h"][np.datetime64("2021-01-02T12:00:00")][1] == "missing"
+    assert expected["1d"][np.datetime64("2021-01-01T18:00:00")][1] == "missing"
+    assert expected["1d"][np.datetime64("2021-01-06T12:00:00")][1] == "missing"
+    assert expected["1d"][np.datetime64("2021-01-07T00:00:00")][1] != "missing"
+
+    InitAdditions(path=path, delta=DELTAS).run()
+    for part in parts:
+        RunAdditions(path=path, delta=DELTAS, parts=part).run()
+
+    _compare(_tendencies(path), expected)
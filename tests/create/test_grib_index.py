@@ -0,0 +1,156 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import datetime
+import gc
+import os
+import sqlite3
+
+import earthkit.data as ekd
+import eccodes
+import pytest
+
+from anemoi.datasets.create.sources.grib_index import GribIndex
+
+
+def _write_grib(path: str, date: datetime.datetime, params: list) -> None:
+    """Write a small GRIB file with one field per parameter."""
+    with open(path, "wb") as f:
+        for param in params:
+            handle = eccodes.codes_grib_new_from_samples("GRIB2")
+            eccodes.codes_set(handle, "shortName", param)
+            eccodes.codes_set(handle, "dataDate", int(date.strftime("%Y%m%d")))
+            eccodes.codes_set(handle, "dataTime", date.hour * 100)
+            eccodes.codes_write(handle, f)
+            eccodes.codes_release(handle)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_grib_index_scan(tmp_path, workers: int) -> None:
+    """Test scanning GRIB files, resuming a scan, and re-indexing a file that changed."""
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"{i}.grib")
+        _write_grib(path, datetime.datetime(2020, 1, 1, 6 * i), ["2t", "msl"])
+        paths.append(path)
+
+    database = str(tmp_path / "index.db")
+
+    index = GribIndex(database, update=True, overwrite=True)
+    index.add_grib_files(paths[:2], workers=workers)
+    index.add_grib_files(paths, workers=workers)
+
+    index.cursor.execute("SELECT COUNT(*) FROM grib_index")
+    assert index.cursor.fetchone()[0] == 8
+
+    # Rewrite a file with more fields
+    _write_grib(paths[0], datetime.datetime(2020, 1, 1, 0), ["2t", "msl", "10u"])
+    os.utime(paths[0], (0, 0))
+    index.add_grib_files(paths, workers=workers)
+
+    index.cursor.execute("SELECT COUNT(*) FROM grib_index")
+    assert index.cursor.fetchone()[0] == 9
+    index.cursor.execute("SELECT COUNT(*) FROM paths")
+    assert index.cursor.fetchone()[0] == 4
+
+    index = GribIndex(database)
+    messages = list(index.retrieve([datetime.datetime(2020, 1, 1, 6)], param="msl"))
+    assert len(messages) == 1
+    assert messages[0][:4] == b"GRIB"
+
+
+def test_grib_index_retrieve(tmp_path) -> None:
+    """Test that the messages are read in file order, coalescing the neighbouring ones."""
+    dates = [datetime.datetime(2020, 1, 1, 6 * i) for i in range(3)]
+    paths = []
+    for i in range(2):
+        path = str(tmp_path / f"{i}.grib")
+        with open(path, "wb") as f:
+            for date in dates:
+                _write_grib(str(tmp_path / "tmp.grib"), date, ["2t", "msl"] if i == 0 else ["10u", "10v"])
+                with open(tmp_path / "tmp.grib", "rb") as g:
+                    f.write(g.read())
+        paths.append(path)
+
+    database = str(tmp_path / "index.db")
+    GribIndex(database, update=True).add_grib_files(paths)
+
+    index = GribIndex(database)
+    messages = list(index.retrieve(dates[1:], param=["msl", "2t", "10v"]))
+    assert len(messages) == 6
+
+    # Sorted by file and offset
+    expected = []
+    for path in paths:
+        for field in ekd.from_source("file", path):
+            if field.metadata("shortName") in ("msl", "2t", "10v") and field.datetime()["valid_time"] in dates[1:]:
+                with open(path, "rb") as f:
+                    f.seek(int(field.metadata("offset")))
+                    expected.append(f.read(field.metadata("totalLength")))
+
+    assert [bytes(m) for m in messages] == expected
+
+    fields = ekd.from_source("memory", b"".join(messages))
+    assert len(fields) == 6
+
+    # The files are closed once read
+    if os.path.isdir("/proc/self/fd"):
+        list(GribIndex(database).retrieve(dates, param=["msl", "10v"]))
+        gc.collect()
+        before = len(os.listdir("/proc/self/fd"))
+        for _ in range(10):
+            list(GribIndex(database).retrieve(dates, param=["msl", "10v"]))
+        gc.collect()
+        assert len(os.listdir("/proc/self/fd")) == before
+
+
+def test_grib_index_duplicate(tmp_path) -> None:
+    """Test that a file with a duplicate message is not marked as indexed."""
+    good = str(tmp_path / "good.grib")
+    _write_grib(good, datetime.datetime(2020, 1, 1, 0), ["2t", "msl"])
+    bad = str(tmp_path / "bad.grib")
+    _write_grib(bad, datetime.datetime(2020, 1, 1, 6), ["2t", "2t"])
+
+    database = str(tmp_path / "index.db")
+    index = GribIndex(database, update=True, overwrite=True)
+    index.add_grib_files([good])
+
+    for _ in range(2):
+        with pytest.raises(sqlite3.IntegrityError):
+            index.add_grib_files([good, bad])
+
+        index = GribIndex(database, update=True)
+        index.cursor.execute("SELECT path FROM paths")
+        assert [row[0] for row in index.cursor.fetchall()] == [good]
+        index.cursor.execute("SELECT COUNT(*) FROM grib_index")
+        assert index.cursor.fetchone()[0] == 2
+
+
+def test_grib_index_covering_index(tmp_path) -> None:
+    """Test that the covering index is only rebuilt when one of its keys is added."""
+    path = str(tmp_path / "0.grib")
+    _write_grib(path, datetime.datetime(2020, 1, 1, 0), ["2t", "msl"])
+    database = str(tmp_path / "index.db")
+    GribIndex(database, update=True, overwrite=True).add_grib_files([path])
+
+    def covering_index() -> str:
+        index = GribIndex(database)
+        index.cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_grib_index_covering'")
+        return index.cursor.fetchone()[0]
+
+    sql = covering_index()
+    assert "param" in sql
+
+    index = GribIndex(database, update=True)
+    statements = []
+    index.conn.set_trace_callback(statements.append)
+    index._create_tables()
+    index.add_grib_files([path])
+    assert not [s for s in statements if "DROP INDEX" in s]
+    assert covering_index() == sql
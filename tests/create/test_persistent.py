@@ -0,0 +1,64 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import glob
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from anemoi.datasets.create.persistent import build_storage
+
+
+def test_persistent_segments(tmp_path) -> None:
+    """Test that several writers share a directory, and that the last record of a key wins."""
+    directory = str(tmp_path / "storage")
+
+    writers = [build_storage(directory=directory, create=True) for _ in range(2)]
+    for i in range(10):
+        writers[i % 2].add([i, np.arange(i)], key=np.datetime64("2021-01-01") + i)
+    for w in writers:
+        w.flush()
+
+    # Each writer has a single segment
+    assert len(glob.glob(directory + "/*.data")) == 2
+
+    # A writer overwrites a key, another one crashes before committing its index
+    writers[0].add(["new", None], key=np.datetime64("2021-01-03"))
+    writers[0].flush()
+
+    crashed = build_storage(directory=directory, create=False)
+    crashed.add(["lost", None], key=np.datetime64("2021-01-04"))
+    crashed.flush()
+    with open(crashed.storage.segment + ".index", "r+b") as f:
+        f.truncate(10)
+
+    items = dict(build_storage(directory=directory, create=False).items())
+    assert len(items) == 10
+    assert items[np.datetime64("2021-01-03")][0] == "new"
+    assert items[np.datetime64("2021-01-04")][0] == 3
+    assert (items[np.datetime64("2021-01-10")][1] == np.arange(9)).all()
+
+
+def test_persistent_version(tmp_path) -> None:
+    """Test that a directory written by an older version is reported as such."""
+    directory = str(tmp_path / "storage")
+
+    # The layout of version 3, one pickle file per key
+    os.makedirs(directory)
+    with open(os.path.join(directory, "0123.pickle"), "wb") as f:
+        pickle.dump((np.datetime64("2021-01-01"), [0, None]), f)
+
+    storage = build_storage(directory=directory, create=False)
+    with pytest.raises(ValueError, match="incompatible version.*rerun the `init` step"):
+        list(storage.items())
+    with pytest.raises(ValueError, match="incompatible version"):
+        storage.add([1, None], key=np.datetime64("2021-01-02"))
+        storage.flush()
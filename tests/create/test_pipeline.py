@@ -0,0 +1,122 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import threading
+import time
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets import open_dataset
+from anemoi.datasets.create import Load
+from anemoi.datasets.create.pipeline import run_pipeline
+from anemoi.datasets.create.testing import create_dataset
+
+
+@pytest.mark.parametrize("depth", [0, 1, 3])
+def test_run_pipeline(depth: int) -> None:
+    """Test that the items go through all the stages, in order."""
+    result = []
+    run_pipeline(range(10), [lambda x: x + 1, lambda x: x * 2, result.append], depth=depth)
+    assert result == [(x + 1) * 2 for x in range(10)]
+
+
+def test_run_pipeline_overlap() -> None:
+    """Test that the stages run concurrently."""
+    running = set()
+    overlap = []
+    lock = threading.Lock()
+
+    def stage(name):
+        def _(x):
+            with lock:
+                running.add(name)
+                overlap.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.discard(name)
+            return x
+
+        return _
+
+    run_pipeline(range(8), [stage("retrieve"), stage("decode"), stage("write")], depth=1)
+    assert max(overlap) > 1
+
+
+def test_run_pipeline_error() -> None:
+    """Test that an error in any stage stops the pipeline and is raised."""
+
+    def fail(x):
+        if x == 3:
+            raise ValueError(x)
+        return x
+
+    for stages in ([fail, lambda x: x, lambda x: x], [lambda x: x, lambda x: x, fail]):
+        with pytest.raises(ValueError):
+            run_pipeline(range(100), stages, depth=2)
+
+
+def _create_source(path: str) -> np.ndarray:
+    """Write a small 6-hourly dataset to be used as the input of the create command."""
+    dates = np.arange("2020-01-01T00", "2020-01-05T00", np.timedelta64(6, "h"), dtype="datetime64[s]")
+    data = 280 + np.random.default_rng(42).random((len(dates), 2, 1, 20))
+
+    root = zarr.open_group(path, mode="w")
+    root.create_dataset("data", data=data, chunks=(1, 2, 1, 20), compressor=None)
+    root.create_dataset("dates", data=dates, compressor=None)
+    root.create_dataset("latitudes", data=np.linspace(-90, 90, 20), compressor=None)
+    root.create_dataset("longitudes", data=np.linspace(0, 360, 20, endpoint=False), compressor=None)
+    root.attrs.update(
+        frequency="6h",
+        resolution="o96",
+        name_to_index={"2t": 0, "msl": 1},
+        variables=["2t", "msl"],
+        variables_metadata={"2t": {}, "msl": {}},
+        data_request={"grid": 1, "area": "g", "param_level": {}},
+        start_date="2020-01-01T00:00:00",
+        end_date="2020-01-04T18:00:00",
+        missing_dates=[],
+    )
+    return data
+
+
+def test_load_pipeline(tmp_path, monkeypatch) -> None:
+    """Test that a dataset loaded with a pipeline is the same as one loaded group by group."""
+    source = str(tmp_path / "source.zarr")
+    data = _create_source(source)
+
+    config = {
+        "dates": {
+            "start": "2020-01-01T00:00:00",
+            "end": "2020-01-04T18:00:00",
+            "frequency": "6h",
+        },
+        "build": {"group_by": 2},
+        "input": {"anemoi-dataset": {"dataset": source}},
+    }
+
+    written = []
+    write_group = Load._write_group
+    monkeypatch.setattr(Load, "_write_group", lambda self, *args: written.append(write_group(self, *args)))
+
+    ref = open_dataset(create_dataset(config=config, output=str(tmp_path / "ref.zarr")))
+    ds = open_dataset(create_dataset(config=config, output=str(tmp_path / "pipeline.zarr"), pipeline=2))
+
+    # Each dataset is loaded in 8 groups of 2 dates
+    assert len(written) == 16
+
+    assert ds.shape == ref.shape == data.shape
+    assert ds.variables == ref.variables
+    assert (ds.dates == ref.dates).all()
+    assert np.allclose(ref[:], data)
+    assert np.array_equal(ds[:], ref[:])
+    for k, v in ref.statistics.items():
+        assert np.array_equal(ds.statistics[k], v), k
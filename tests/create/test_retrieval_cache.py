@@ -0,0 +1,113 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import datetime
+import os
+from typing import Any
+from typing import Dict
+from typing import List
+
+import earthkit.data as ekd
+import eccodes
+import numpy as np
+
+from anemoi.datasets.create.sources.mars import mars
+from anemoi.datasets.create.sources.retrieval_cache import RetrievalCache
+
+
+def _message(date: str, time: str, step: int, param: str) -> bytes:
+    """Encode a small GRIB field."""
+    handle = eccodes.codes_grib_new_from_samples("regular_ll_sfc_grib2")
+    eccodes.codes_set(handle, "shortName", param)
+    eccodes.codes_set(handle, "dataDate", int(date))
+    eccodes.codes_set(handle, "dataTime", int(time))
+    eccodes.codes_set(handle, "step", step)
+    eccodes.codes_set_values(handle, np.full(eccodes.codes_get(handle, "numberOfValues"), float(step)))
+    message = eccodes.codes_get_message(handle)
+    eccodes.codes_release(handle)
+    return message
+
+
+class _Fetch:
+    """Return the fields of requests, and record them."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[Dict[str, Any]]] = []
+
+    def __call__(self, requests: List[Dict[str, Any]]) -> Any:
+        self.calls.append(requests)
+        messages = []
+        for r in requests:
+            for step in r["step"] if isinstance(r["step"], list) else [r["step"]]:
+                messages.append(_message(r["date"], r["time"], int(step), r["param"]))
+        return ekd.from_source("memory", b"".join(messages))
+
+
+def _keys(ds: Any) -> List[tuple]:
+    return sorted(
+        (f.metadata("dataDate"), f.metadata("dataTime"), f.metadata("step"), f.metadata("shortName")) for f in ds
+    )
+
+
+def test_retrieval_cache(tmp_path) -> None:
+    """Test that overlapping requests are only retrieved once."""
+    cache = RetrievalCache(str(tmp_path), 10**9)
+    fetch = _Fetch()
+
+    # One request per parameter, as the accumulations source does
+    first = [dict(date="20200101", time="0000", step=[6, 12], param=p, levtype="sfc") for p in ("tp", "cp")]
+    assert len(cache.retrieve(first, fetch)) == 4
+    assert len(fetch.calls) == 1
+
+    second = [dict(date="20200101", time="0000", step=[12, 18], param=p, levtype="sfc") for p in ("tp", "cp")]
+    ds = cache.retrieve(second, fetch)
+    assert _keys(ds) == [(20200101, 0, s, p) for s in (12, 18) for p in ("cp", "tp")]
+    assert len(fetch.calls) == 2
+    assert sorted((r["step"], r["param"]) for r in fetch.calls[-1]) == [(18, "cp"), (18, "tp")]
+
+    assert len(cache.retrieve(second, fetch)) == 4
+    assert len(fetch.calls) == 2
+    assert cache.statistics == dict(hits=3, misses=3, evictions=0)
+
+    # Other options are part of the key
+    cache.retrieve(second, fetch, use_grib_paramid=True)
+    assert len(fetch.calls) == 3
+
+    # Requests for several dates cannot be cached
+    assert cache.retrieve([dict(date="20200101/to/20200102", time="0000", step=0, param="2t")], fetch) is None
+
+    cache.max_bytes = 0
+    cache._evict()
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".grib")]
+
+
+def test_mars_retrieval_cache(tmp_path) -> None:
+    """Test that the mars source reads the fields from the cache."""
+
+    class Context:
+        use_grib_paramid = False
+        retrieval_cache = dict(path=str(tmp_path), size="1GB")
+
+        def trace(self, *args: Any) -> None:
+            pass
+
+    cache = RetrievalCache.from_config(Context.retrieval_cache)
+    fetch = _Fetch()
+    cache.retrieve(
+        [dict(date=d, time="0000", step=6, param="2t", levtype="sfc") for d in ("20200101", "20200102")],
+        fetch,
+        use_grib_paramid=False,
+        use_cdsapi_dataset=None,
+    )
+    assert len(fetch.calls) == 1
+
+    dates = [datetime.datetime(2020, 1, 1, 6), datetime.datetime(2020, 1, 2, 6)]
+    ds = mars(Context(), dates, dict(param="2t", levtype="sfc", step=6))
+    assert _keys(ds) == [(20200101, 0, 6, "2t"), (20200102, 0, 6, "2t")]
+    assert cache.statistics["hits"] == 2
@@ -0,0 +1,157 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import time
+from typing import Dict
+from typing import List
+
+import numpy as np
+import pytest
+from anemoi.utils.testing import skip_slow_tests
+
+from anemoi.datasets.create.check import check_data_values
+from anemoi.datasets.create.statistics import TmpStatistics
+from anemoi.datasets.create.statistics import compute_statistics
+from anemoi.datasets.create.statistics.accumulator import StatisticsAccumulator
+from anemoi.datasets.create.statistics.accumulator import concatenate
+
+LOG = logging.getLogger(__name__)
+
+
+def _reference_statistics(array: np.ndarray, names: List[str], allow_nans: bool = False) -> Dict[str, np.ndarray]:
+    """Compute the statistics date by date, as `compute_statistics` used to do."""
+    nvars = array.shape[1]
+    shape = (array.shape[0], nvars)
+
+    result = dict(
+        minimum=np.zeros(shape, dtype=np.float64),
+        maximum=np.zeros(shape, dtype=np.float64),
+        sums=np.zeros(shape, dtype=np.float64),
+        squares=np.zeros(shape, dtype=np.float64),
+        mean=np.zeros(shape, dtype=np.float64),
+        m2=np.zeros(shape, dtype=np.float64),
+        count=np.zeros(shape, dtype=np.int64),
+        has_nans=np.zeros(shape, dtype=np.bool_),
+    )
+
+    for i, chunk in enumerate(array):
+        values = chunk.reshape((nvars, -1))
+        for j, name in enumerate(names):
+            check_data_values(values[j, :], name=name, allow_nans=allow_nans)
+
+        result["minimum"][i] = np.nanmin(values, axis=1)
+        result["maximum"][i] = np.nanmax(values, axis=1)
+        result["sums"][i] = np.nansum(values, axis=1)
+        result["squares"][i] = np.nansum(values * values, axis=1)
+        result["mean"][i] = np.nanmean(values.astype(np.float64), axis=1)
+        result["m2"][i] = np.nansum((values - result["mean"][i][:, np.newaxis]) ** 2, axis=1)
+        result["count"][i] = np.sum(~np.isnan(values), axis=1)
+        result["has_nans"][i] = np.isnan(values).any()
+
+    return result
+
+
+def _compare(array: np.ndarray, names: List[str], threads: int, allow_nans: bool = False) -> None:
+    expected = _reference_statistics(array, names, allow_nans=allow_nans)
+    result = compute_statistics(array, names, allow_nans=allow_nans, threads=threads)
+
+    assert set(result) == set(expected)
+    for k, v in expected.items():
+        assert result[k].dtype == v.dtype, k
+        assert result[k].shape == v.shape, k
+        assert np.allclose(result[k], v, rtol=1e-5), k
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_compute_statistics(threads: int) -> None:
+    """Test that the statistics match the ones computed date by date."""
+    array = np.random.default_rng(0).random((3, 5, 2, 1000), dtype=np.float32) * 100 + 200
+    names = ["a", "b", "c", "d", "e"]
+
+    _compare(array, names, threads=threads)
+
+    array[1, 2, 0, :10] = np.nan
+    _compare(array, names, allow_nans=True, threads=threads)
+
+    with pytest.raises(AssertionError):
+        compute_statistics(array, names, allow_nans=False, threads=threads)
+
+
+def test_statistics_accumulator() -> None:
+    """Test that merging partial statistics is stable and does not depend on the order."""
+    rng = np.random.default_rng(0)
+    # Large mean compared to the spread, where sums of squares lose all precision
+    array = (1e6 + rng.standard_normal((12, 3, 1, 500))).astype(np.float64)
+    names = ["a", "b", "c"]
+
+    values = array.transpose(1, 0, 2, 3).reshape(3, -1)
+    expected_mean = values.mean(axis=1)
+    expected_variance = values.var(axis=1)
+
+    parts = [StatisticsAccumulator.from_dict(compute_statistics(array[i : i + 1], names)) for i in range(12)]
+
+    for order in (range(12), rng.permutation(12)):
+        acc = concatenate([parts[i] for i in order]).reduce()
+        assert np.allclose(acc.mean, expected_mean, rtol=1e-12)
+        assert np.allclose(acc.variance, expected_variance, rtol=1e-9)
+        assert (acc.count == 12 * 500).all()
+
+    split = StatisticsAccumulator.from_dict(compute_statistics(array[:5], names)).reduce()
+    split = split.merge(StatisticsAccumulator.from_dict(compute_statistics(array[5:], names)).reduce())
+    assert np.allclose(split.variance, expected_variance, rtol=1e-9)
+
+
+def test_tmp_statistics(tmp_path) -> None:
+    """Test writing the statistics of groups of dates and aggregating a sub-range of dates."""
+    rng = np.random.default_rng(0)
+    array = rng.random((10, 3, 1, 50)) * 10 + 5
+    names = ["a", "b", "c"]
+    dates = np.arange("2020-01-01", "2020-01-11", dtype="datetime64[D]").astype("datetime64[s]")
+
+    store = TmpStatistics(str(tmp_path / "statistics"))
+    store.create(exist_ok=False)
+    store.allocate(dates, names)
+
+    for group in ([4, 5, 6], [0, 1, 2, 3], [7, 9]):
+        store.write(group, compute_statistics(array[group], names), dates=[d.tolist() for d in dates[group]])
+
+    with pytest.raises(AssertionError):
+        store.write([5], compute_statistics(array[[5]], names), dates=[dates[5].tolist()])
+
+    summary = store.get_aggregated(dates[2:7], names, False)
+    values = array[2:7].transpose(1, 0, 2, 3).reshape(3, -1)
+    assert np.allclose(summary["mean"], values.mean(axis=1))
+    assert np.allclose(summary["stdev"], values.std(axis=1))
+    assert np.allclose(summary["minimum"], values.min(axis=1))
+    assert (summary["count"] == 5 * 50).all()
+
+    with pytest.raises(AssertionError, match="not precomputed"):
+        store.get_aggregated(dates[6:9], names, False)
+
+
+@skip_slow_tests
+def test_compute_statistics_benchmark() -> None:
+    """Compare the speed of the statistics with the date by date loop, on a realistic block."""
+    array = np.random.rand(2, 8, 2, 6_500_000).astype(np.float32)
+    names = [f"v{i}" for i in range(array.shape[1])]
+
+    start = time.time()
+    expected = _reference_statistics(array, names)
+    reference = time.time() - start
+
+    start = time.time()
+    result = compute_statistics(array, names)
+    elapsed = time.time() - start
+
+    LOG.info("compute_statistics: %.2fs, date by date loop: %.2fs", elapsed, reference)
+
+    for k, v in expected.items():
+        assert np.allclose(result[k], v, rtol=1e-5), k
@@ -0,0 +1,134 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets.commands.copy import ZarrCopier
+from anemoi.datasets.commands.rechunk import ZarrRechunker
+from anemoi.datasets.commands.rechunk import plan_layouts
+
+
+def _copier(source: str, target: str, **kwargs) -> ZarrCopier:
+    options = dict(
+        transfers=4,
+        block_size=10,
+        overwrite=False,
+        resume=False,
+        verbosity=0,
+        nested=False,
+        rechunk=None,
+    )
+    options.update(kwargs)
+    return ZarrCopier(source, target, **options)
+
+
+@pytest.fixture
+def source(tmp_path) -> str:
+    path = str(tmp_path / "source.zarr")
+    root = zarr.open(path, mode="w")
+    root.create_dataset("data", data=np.random.rand(53, 3, 1, 20), chunks=(3, 3, 1, 20))
+    root.create_dataset("dates", data=np.arange(53))
+    root.create_dataset("sums", data=np.zeros(3))
+    root.attrs["frequency"] = "6h"
+    return path
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_copy_rechunk(tmp_path, source: str, processes: bool) -> None:
+    """Test copying in parallel, to chunks that are not aligned with the source chunks or the blocks."""
+    target = str(tmp_path / "target.zarr")
+    _copier(source, target, rechunk="7", processes=processes).run()
+
+    result = zarr.open(target, mode="r")
+    assert result["data"].chunks == (7, 3, 1, 20)
+    assert (result["data"][:] == zarr.open(source, mode="r")["data"][:]).all()
+    assert result.attrs["frequency"] == "6h"
+    assert "_copy" not in result
+
+
+def test_copy_resume(tmp_path, source: str) -> None:
+    """Test resuming a copy that was interrupted, with the per-date progress of older versions."""
+    target = str(tmp_path / "target.zarr")
+    data = zarr.open(source, mode="r")["data"][:]
+
+    root = zarr.open(target, mode="w")
+    root.create_dataset("data", shape=data.shape, chunks=(3, 3, 1, 20), dtype=data.dtype)
+    # Marks the rows already copied, which must not be copied again
+    root["data"][:12] = -1
+    root["_copy"] = np.arange(53) < 12
+
+    copier = _copier(source, target, resume=True)
+    assert copier.plan_units(53, 3, 3)[:2] == [(0, 12), (12, 24)]
+    copier.run()
+
+    result = zarr.open(target, mode="r")
+    assert (result["data"][:12] == -1).all()
+    assert (result["data"][12:] == data[12:]).all()
+    assert "_copy" not in result
+
+
+@pytest.mark.parametrize("memory", ["1MB", "8KB"])
+def test_rechunk(tmp_path, source: str, memory: str) -> None:
+    """Test going from time chunks to grid chunks, directly or through an intermediate layout."""
+    target = str(tmp_path / "target.zarr")
+    ZarrRechunker(
+        source,
+        target,
+        transfers=4,
+        overwrite=False,
+        chunks="full,,,4",
+        compressor="blosc:cname=zstd,clevel=5,shuffle=2",
+        memory=memory,
+        verbosity=0,
+    ).run()
+
+    result = zarr.open(target, mode="r")
+    assert result["data"].chunks == (53, 3, 1, 4)
+    assert result["data"].compressor.cname == "zstd"
+    assert (result["data"][:] == zarr.open(source, mode="r")["data"][:]).all()
+    assert (result["dates"][:] == np.arange(53)).all()
+    assert "_rechunk" not in result
+
+
+def test_plan_layouts() -> None:
+    """Test that an intermediate layout is used when the direct blocks do not fit in memory."""
+    shape = (1000, 10, 1, 40000)
+    assert plan_layouts(shape, (1, 10, 1, 40000), (1000, 10, 1, 1000), 4, 2**31) == [
+        (1, 10, 1, 40000),
+        (1000, 10, 1, 1000),
+    ]
+    assert plan_layouts(shape, (1, 10, 1, 40000), (1000, 10, 1, 1000), 4, 2**26) == [
+        (1, 10, 1, 40000),
+        (1, 10, 1, 1000),
+        (1000, 10, 1, 1000),
+    ]
+    with pytest.raises(ValueError):
+        plan_layouts(shape, (1, 10, 1, 40000), (1000, 10, 1, 1000), 4, 2**20)
+
+
+def test_plan_units_memory(tmp_path, source: str) -> None:
+    """Test that the units fit in memory, falling back to units aligned with the target chunks only."""
+    copier = _copier(source, str(tmp_path / "target.zarr"), block_size=100, memory="100KB")
+
+    # Rows of 1000 bytes, so units of at most 102 rows
+    assert copier.plan_units(2000, 3, 3, 1000)[:2] == [(0, 102), (102, 204)]
+    # Chunks of 24 and 25 rows are only aligned every 600 rows
+    assert copier.plan_units(2000, 24, 25, 1000)[:2] == [(0, 100), (100, 200)]
+
+    copier = _copier(source, str(tmp_path / "target.zarr"), block_size=100, memory="10KB")
+    with pytest.raises(ValueError):
+        copier.plan_units(2000, 24, 25, 1000)
+
+    # Rows of 480 bytes, chunks of 3 and 7 rows
+    target = str(tmp_path / "target.zarr")
+    _copier(source, target, rechunk="7", memory="4KB").run()
+    assert (zarr.open(target, mode="r")["data"][:] == zarr.open(source, mode="r")["data"][:]).all()
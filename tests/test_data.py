@@ -25,12 +25,19 @@ from anemoi.utils.dates import frequency_to_string
 from anemoi.utils.dates import frequency_to_timedelta
 
 from anemoi.datasets import open_dataset
+from anemoi.datasets.data.chunk_cache import DecodedChunkCache
 from anemoi.datasets.data.concat import Concat
+from anemoi.datasets.data.debug import Node
 from anemoi.datasets.data.ensemble import Ensemble
 from anemoi.datasets.data.grids import GridsBase
+from anemoi.datasets.data.interpolate import InterpolateFrequency
 from anemoi.datasets.data.join import Join
+from anemoi.datasets.data.masked import Masked
+from anemoi.datasets.data.merge import Merge
 from anemoi.datasets.data.misc import as_first_date
 from anemoi.datasets.data.misc import as_last_date
+from anemoi.datasets.data.prefetch import Prefetch
+from anemoi.datasets.data.rescale import Rescale
 from anemoi.datasets.data.select import Rename
 from anemoi.datasets.data.select import Select
 from anemoi.datasets.data.statistics import Statistics
@@ -817,6 +824,184 @@ def test_subset_8() -> None:
     )
 
 
+@mockup_open_zarr
+def test_subset_shuffle() -> None:
+    """Test reading a shuffled subset of a dataset."""
+    ref = open_dataset("test-2021-2021-6h-o96-abcd")
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", shuffle=True)
+
+    assert isinstance(ds, Subset)
+
+    indices = np.array(ds.indices)
+    assert (ds[:] == ref[:][indices]).all()
+    assert (ds[5:50:3] == ref[:][indices[5:50:3]]).all()
+    assert (ds[10:20, (1, 3), 0] == ref[:][indices[10:20]][:, (1, 3), 0]).all()
+    assert (ds[3, 2] == ref[indices[3], 2]).all()
+
+
+@mockup_open_zarr
+def test_prefetch() -> None:
+    """Test reading a dataset with prefetching enabled."""
+    ref = open_dataset("test-2021-2021-6h-o96-abcd")
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", prefetch=dict(size=3, workers=2))
+
+    assert isinstance(ds, Prefetch)
+    assert ds.shape == ref.shape
+
+    for i in range(0, len(ds), 2):
+        assert (ds[i] == ref[i]).all()
+
+    # Only the first access is a miss, the stride is initially assumed to be 1
+    assert ds.misses == 1
+    assert ds.hits == len(range(0, len(ds), 2)) - 1
+
+    for i in reversed(range(len(ds) - 10, len(ds))):
+        assert (ds[i] == ref[i]).all()
+
+    assert (ds[10:20, 1] == ref[10:20, 1]).all()
+    assert ds.prefetch_statistics["buffered"] <= 3
+
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", prefetch=False)
+    assert not isinstance(ds, Prefetch)
+
+
+@mockup_open_zarr
+def test_cache_decoded() -> None:
+    """Test reading a dataset through a decoded-chunk cache."""
+    ref = open_dataset("test-2021-2021-6h-o96-abcd")
+
+    cache = DecodedChunkCache(64 * 1024 * 1024)
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", select=["c", "a"], cache_decoded=cache)
+
+    for index in (5, slice(3, 40, 7), (slice(None), 1), (100, slice(None), 0, slice(2, 8, 3)), (Ellipsis, 4)):
+        assert (ds[index] == ref[:, (2, 0)][index]).all(), index
+
+    (statistics,) = cache.statistics.values()
+    assert statistics["misses"] == 1
+    assert statistics["hits"] > 0
+
+    # The cache budget is too small to keep the (single) chunk of the test dataset
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", cache_decoded="1K")
+    assert (ds[7:9] == ref[7:9]).all()
+
+    # The cache is set on the new dataset only
+    ds = open_dataset(ref, cache_decoded=cache)
+    assert ds.data is not ref.data
+    assert type(ref.data) is not type(ds.data)
+    assert (ds[7:9] == ref[7:9]).all()
+
+
+@mockup_open_zarr
+def test_rescale() -> None:
+    """Test rescaling variables, with nested rescalings folded into one."""
+    ref = open_dataset("test-2021-2021-6h-o96-abcd")
+
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", rescale={"b": (2.0, 1.0), "d": (0.5, 0.0)})
+    ds = open_dataset(ds, rescale={"b": (3.0, -1.0), "c": (10.0, 5.0)})
+
+    assert isinstance(ds, Rescale)
+    assert not isinstance(ds.forward, Rescale)
+    assert ds.rescale == {"b": (6.0, 2.0), "c": (10.0, 5.0), "d": (0.5, 0.0)}
+
+    expected = ref[:] * np.array([1.0, 6.0, 10.0, 0.5])[None, :, None, None]
+    expected += np.array([0.0, 2.0, 5.0, 0.0])[None, :, None, None]
+
+    assert np.allclose(ds[:], expected)
+    assert np.allclose(ds[7], expected[7])
+    assert np.allclose(ds[3:9, 1:3], expected[3:9, 1:3])
+    assert np.allclose(ds[5, (3, 1)], expected[5, (3, 1)])
+
+
+@mockup_open_zarr
+def test_interpolate_frequency() -> None:
+    """Test interpolating the dates, reading all the dates needed at once."""
+    ref = open_dataset("test-2021-2021-6h-o96-abcd", start="2021-01-01", end="2021-01-03")
+    ds = open_dataset(ref, interpolate_frequency="2h")
+
+    assert isinstance(ds, InterpolateFrequency)
+    assert len(ds) == (len(ref) - 1) * 3 + 1
+
+    source = ref[:]
+    expected = np.empty(ds.shape, dtype=source.dtype)
+    for n in range(len(ds)):
+        i, x = divmod(n, 3)
+        expected[n] = source[i] if x == 0 else source[i] * (1 - x / 3) + source[i + 1] * (x / 3)
+
+    assert np.allclose(ds[:], expected)
+    assert np.allclose(ds[4:17:2], expected[4:17:2])
+    assert np.allclose(ds[5], expected[5])
+    assert np.allclose(ds[len(ds) - 1], expected[-1])
+    assert np.allclose(ds[2:9, 1:3], expected[2:9, 1:3])
+    assert np.allclose(ds[7, (3, 0)], expected[7, (3, 0)])
+
+    cubic = open_dataset(ref, interpolate_frequency="2h", interpolate_method="cubic")
+    assert cubic.shape == ds.shape
+    assert np.allclose(cubic[::3], source)
+    assert np.allclose(cubic[4:17], np.stack([cubic[n] for n in range(4, 17)]))
+
+    with pytest.raises(ValueError):
+        open_dataset(ref, interpolate_frequency="2h", interpolate_method="quadratic")
+
+
+@mockup_open_zarr
+def test_parallel_reads() -> None:
+    """Test reading the members of combined datasets concurrently."""
+    join = ["test-2021-2021-6h-o96-abcd", "test-2021-2021-6h-o96-efgh"]
+    concat = ["test-2021-2021-6h-o96-abcd", "test-2022-2022-6h-o96-abcd"]
+    merge = ["test-2021-2021-6h-o96-abcd", "test-2022-2022-6h-o96-abcd"]
+
+    for kwargs, cls in ((dict(join=join), Join), (dict(concat=concat), Concat)):
+        ref = open_dataset(**kwargs)
+        ds = open_dataset(**kwargs, parallel=4)
+
+        assert ds.parallel_reads == 4
+        assert ref.parallel_reads is None
+
+        assert isinstance(ds, cls)
+        assert np.array_equal(ds[5], ref[5])
+        assert np.array_equal(ds[1450:1470], ref[1450:1470])
+        assert np.array_equal(ds[3:9, 2:7], ref[3:9, 2:7])
+        assert np.array_equal(ds[4, 3:6, 0, 2], ref[4, 3:6, 0, 2])
+        assert np.array_equal(ds[(1, 1459, 1200), (3, 1)], ref[(1, 1459, 1200), (3, 1)])
+
+    ds = open_dataset(merge=merge, parallel=True)
+    assert isinstance(ds, Merge)
+    ref = open_dataset(concat=merge)
+    assert np.array_equal(ds[1455:1465], ref[1455:1465])
+    assert np.array_equal(ds[1455:1465:3, 1:3], ref[1455:1465:3, 1:3])
+    assert np.array_equal(ds[1459], ref[1459])
+
+    with pytest.raises(ValueError):
+        open_dataset(join=join, parallel="yes")
+
+    # The option is set on the new dataset only, not on the dataset it is built from
+    ref = open_dataset(join=join)
+    ds = open_dataset(ref, parallel=4)
+    assert ds.parallel_reads == 4
+    assert ref.parallel_reads is None
+    assert all(a is not b for a, b in zip(ds.datasets, ref.datasets))
+    assert np.array_equal(ds[3:9], ref[3:9])
+
+    ds = open_dataset(ref, start=2021, parallel=4)
+    assert ref.parallel_reads is None
+
+
+@mockup_open_zarr
+def test_reverse_slices() -> None:
+    """Test slices with a negative step on combined datasets."""
+    for kwargs in (
+        dict(join=["test-2021-2021-6h-o96-abcd", "test-2021-2021-6h-o96-efgh"]),
+        dict(concat=["test-2021-2021-6h-o96-abcd", "test-2022-2022-6h-o96-abcd"]),
+        dict(ensemble=["test-2021-2021-6h-o96-abcd-1-10", "test-2021-2021-6h-o96-abcd-2-1"]),
+    ):
+        for parallel in (None, 4):
+            ds = open_dataset(**kwargs, parallel=parallel)
+            for s in (slice(None, None, -1), slice(40, 3, -5), slice(1465, 1450, -2)):
+                expected = np.stack([ds[i] for i in range(*s.indices(len(ds)))])
+                assert np.array_equal(ds[s], expected), (kwargs, s)
+            assert ds[3:40:-1].shape == (0,) + ds.shape[1:]
+
+
 @mockup_open_zarr
 def test_select_1() -> None:
     """Test selecting variables from a dataset (case 1)."""
@@ -1416,6 +1601,43 @@ def test_cropping() -> None:
     assert test.ds.shape == (365 * 4, 4, 1, 8)
 
 
+def test_masked_reads() -> None:
+    """Test that masked datasets only read the ranges of grid points they need."""
+
+    class _Masked(Masked):
+        def tree(self):
+            return Node(self, [self.forward.tree()])
+
+        def forwards_subclass_metadata_specific(self):
+            return {}
+
+    data = np.random.rand(6, 2, 1, 100)
+    root = zarr.group()
+    root.create_dataset("data", data=data, chunks=(1, 2, 1, 10), compressor=None)
+    root.create_dataset(
+        "dates", data=np.arange("2021-01-01", "2021-01-07", dtype="datetime64[D]").astype("datetime64[s]")
+    )
+    root.attrs["name_to_index"] = {"a": 0, "b": 1}
+
+    mask = np.zeros(100, dtype=bool)
+    mask[[3, 5, 6, 41, 42, 48, 97]] = True
+
+    ds = _Masked(Zarr(root), mask)
+    assert [s for s, _, _ in ds._masked_reads] == [slice(3, 7), slice(41, 49), slice(97, 98)]
+
+    expected = data[..., mask]
+    assert (ds[:] == expected).all()
+    assert (ds[2] == expected[2]).all()
+    assert (ds[1:4, 1, 0, 2:6] == expected[1:4, 1, 0, 2:6]).all()
+    assert (ds[:, (1, 0), :, (6, 0)] == expected[:, (1, 0)][..., (6, 0)]).all()
+
+    mask[:] = True
+    mask[50] = False
+    ds = _Masked(Zarr(root), mask)
+    assert [s for s, _, _ in ds._masked_reads] == [slice(0, 100)]
+    assert (ds[3:5] == data[3:5][..., mask]).all()
+
+
 @mockup_open_zarr
 def test_invalid_trim_edge() -> None:
     """Test that exception raised when attempting to trim a 1D dataset"""
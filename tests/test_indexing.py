@@ -8,8 +8,16 @@
 # nor does it submit to any jurisdiction.
 
 
+import glob
+import os
+
 import numpy as np
 
+from anemoi.datasets.data.chunk_cache import CachedArray
+from anemoi.datasets.data.chunk_cache import DecodedChunkCache
+from anemoi.datasets.data.chunk_cache import SharedChunkCache
+from anemoi.datasets.data.indexing import chunk_aligned_runs
+from anemoi.datasets.data.indexing import expand_list_indexing
 from anemoi.datasets.data.indexing import length_to_slices
 
 
@@ -38,5 +46,136 @@ def test_length_to_slices() -> None:
                 assert (combined[index] == result).all(), index
 
 
+def test_chunk_aligned_runs() -> None:
+    """Test the chunk_aligned_runs function with shuffled and repeated indices."""
+    data = np.arange(100) * 10
+    indices = [57, 3, 12, 3, 99, 58, 0, 41, 13]
+
+    for chunk in (1, 4, 10, 100):
+        result = np.empty(len(indices), dtype=data.dtype)
+        runs = chunk_aligned_runs(indices, chunk)
+        for s, positions, offsets in runs:
+            result[positions] = data[s][offsets]
+            # Never read a chunk that does not contain a requested index
+            touched = set(range(s.start // chunk, (s.stop - 1) // chunk + 1))
+            assert touched == set(i // chunk for i in np.array(indices)[positions])
+
+        assert (result == data[indices]).all(), chunk
+
+    assert len(chunk_aligned_runs(indices, 100)) == 1
+    assert len(chunk_aligned_runs(indices, 100, missing={20})) == 2
+    assert chunk_aligned_runs([], 10) == []
+
+
+class _Array:
+    """A minimal dataset wrapping a numpy array, counting the reads."""
+
+    def __init__(self, array: np.ndarray, chunks: tuple = None) -> None:
+        self.array = array
+        self.shape = array.shape
+        self.chunks = chunks
+        self.reads = 0
+
+    @expand_list_indexing
+    def __getitem__(self, index: tuple) -> np.ndarray:
+        self.reads += 1
+        return self.array[index]
+
+
+def test_expand_list_indexing() -> None:
+    """Test the expand_list_indexing decorator with lists on one or more axes."""
+    array = np.random.rand(7, 9, 3, 11)
+    ds = _Array(array)
+
+    assert (ds[:, [3, 4, 5, 1]] == array[:, [3, 4, 5, 1]]).all()
+    assert ds.reads == 2
+
+    assert (ds[2, (8, -1, 0), :, 5] == array[2, [8, 8, 0], :, 5]).all()
+    assert (ds[..., [10, 2]] == array[..., [10, 2]]).all()
+
+    result = ds[[6, 0, 1], 4, [2, 0], (3, 4, 5)]
+    expected = array[np.ix_([6, 0, 1], [4], [2, 0], [3, 4, 5])][:, 0]
+    assert result.shape == expected.shape
+    assert (result == expected).all()
+
+    assert ds[:, []].shape == (7, 0, 3, 11)
+
+    chunked = _Array(array, chunks=(1, 9, 3, 11))
+    assert (chunked[0:5, [7, 1, 4]] == array[0:5, [7, 1, 4]]).all()
+    assert chunked.reads == 1
+
+
+def test_cached_array() -> None:
+    """Test reading a chunked zarr array through a decoded-chunk cache."""
+    import zarr
+
+    data = np.random.rand(13, 4, 2, 17)
+    array = zarr.array(data, chunks=(3, 4, 1, 5))
+    cache = DecodedChunkCache(data.nbytes)
+    cached = CachedArray(array, cache, "test")
+
+    for index in (
+        4,
+        -2,
+        slice(2, 11),
+        (slice(1, 12, 4), 2),
+        (Ellipsis, slice(3, 16, 6)),
+        (5, slice(None), 1, 16),
+        (slice(7, 7), 0),
+    ):
+        assert cached[index].shape == data[index].shape, index
+        assert (cached[index] == data[index]).all(), index
+
+    assert cache.statistics["test"]["hits"] > 0
+
+    cache = DecodedChunkCache(data.nbytes // 10)
+    cached = CachedArray(array, cache, "test")
+    assert (cached[:] == data).all()
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.statistics["test"]["evictions"] > 0
+
+
+def test_shared_chunk_cache(tmp_path) -> None:
+    """Test sharing decoded chunks between two copies of a cache, as between two processes."""
+    import pickle
+
+    import zarr
+
+    data = np.random.rand(10, 3, 1, 8)
+    array = zarr.array(data, chunks=(2, 3, 1, 8))
+
+    # Leave room for the headers of the .npy files
+    cache = SharedChunkCache(2 * data.nbytes, str(tmp_path))
+    assert (CachedArray(array, cache, "test")[:] == data).all()
+    assert cache.statistics["test"] == dict(hits=0, misses=5, evictions=0)
+
+    other = pickle.loads(pickle.dumps(cache))
+    assert (CachedArray(array, other, "test")[1:9:3] == data[1:9:3]).all()
+    assert other.statistics["test"] == dict(hits=3, misses=0, evictions=0)
+
+    small = SharedChunkCache(data.nbytes // 2, str(tmp_path / "small"))
+    assert (CachedArray(array, small, "test")[::2] == data[::2]).all()
+    assert small.nbytes <= small.max_bytes
+    assert small.statistics["test"]["evictions"] > 0
+
+    # Many processes, each writing less than the eviction trigger, stay within the budget together
+    data = np.random.rand(256, 6, 1, 8)
+    array = zarr.array(data, chunks=(1, 6, 1, 8))
+    shared = SharedChunkCache(32 * data[0].nbytes, str(tmp_path / "shared"))
+    for i in range(len(data)):
+        worker = pickle.loads(pickle.dumps(shared))
+        assert (CachedArray(array, worker, "test")[i] == data[i]).all()
+    files = glob.glob(os.path.join(shared.path, "*.npy"))
+    assert sum(os.path.getsize(f) for f in files) <= shared.max_bytes * 1.25
+
+    owned = SharedChunkCache(data.nbytes)
+    assert os.path.isdir(owned.path)
+    owned._cleanup()
+    assert not os.path.exists(owned.path)
+
+
 if __name__ == "__main__":
     test_length_to_slices()
+    test_chunk_aligned_runs()
+    test_expand_list_indexing()
+    test_cached_array()
@@ -0,0 +1,119 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import contextlib
+import functools
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+import requests
+import zarr
+
+from anemoi.datasets.data.stores import HTTPStore
+from anemoi.datasets.data.stores import open_zarr
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    """Serve files slowly, record the paths requested and the number of requests in flight."""
+
+    requested = []
+    in_flight = 0
+    max_in_flight = 0
+    # Paths that fail with a 503 the first time they are requested
+    unavailable = set()
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        with self.lock:
+            self.requested.append(self.path)
+            _Handler.in_flight += 1
+            _Handler.max_in_flight = max(_Handler.max_in_flight, _Handler.in_flight)
+            unavailable = self.path in self.unavailable
+            self.unavailable.discard(self.path)
+        try:
+            time.sleep(0.05)
+            if unavailable:
+                self.send_error(503)
+            else:
+                super().do_GET()
+        finally:
+            with self.lock:
+                _Handler.in_flight -= 1
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def _serve(directory: str):
+    """Serve a directory over HTTP, and yield its URL."""
+    _Handler.requested.clear()
+    _Handler.max_in_flight = 0
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _create_zarr(path: str) -> np.ndarray:
+    data = np.random.rand(16, 3, 1, 20)
+    root = zarr.open_group(path, mode="w")
+    root.create_dataset("data", data=data, chunks=(1, 3, 1, 20))
+    return data
+
+
+def test_http_store_getitems(tmp_path) -> None:
+    """Test reading a zarr over HTTP, with several chunks fetched concurrently."""
+    data = _create_zarr(str(tmp_path / "test.zarr"))
+
+    with _serve(str(tmp_path)) as url:
+        z = open_zarr(url + "/test.zarr")
+        assert isinstance(z.store, HTTPStore)
+        assert (z.data[2:14] == data[2:14]).all()
+        assert sum(1 for p in _Handler.requested if p.startswith("/test.zarr/data/")) >= 12
+        assert _Handler.max_in_flight > 1
+
+        store = HTTPStore(url + "/test.zarr", concurrency=4)
+        result = store.getitems(["data/0.0.0.0", "data/99.0.0.0", "data/.zarray"], contexts={})
+        assert set(result) == {"data/0.0.0.0", "data/.zarray"}
+
+        # Sequential reads
+        _Handler.max_in_flight = 0
+        store = HTTPStore(url + "/test.zarr", concurrency=1)
+        result = store.getitems([f"data/{i}.0.0.0" for i in range(4)], contexts={})
+        assert len(result) == 4
+        assert _Handler.max_in_flight == 1
+
+
+def test_http_store_retries(tmp_path) -> None:
+    """Test that a request failing with a 503 is retried."""
+    data = _create_zarr(str(tmp_path / "test.zarr"))
+
+    with _serve(str(tmp_path)) as url:
+        _Handler.unavailable.update(["/test.zarr/data/3.0.0.0", "/test.zarr/data/4.0.0.0"])
+
+        z = open_zarr(url + "/test.zarr")
+        assert (z.data[2:6] == data[2:6]).all()
+        assert _Handler.requested.count("/test.zarr/data/3.0.0.0") == 2
+        assert _Handler.requested.count("/test.zarr/data/4.0.0.0") == 2
+
+        _Handler.unavailable.add("/test.zarr/data/5.0.0.0")
+        store = HTTPStore(url + "/test.zarr", retries=0)
+        with pytest.raises(requests.exceptions.RetryError):
+            store["data/5.0.0.0"]
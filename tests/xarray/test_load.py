@@ -0,0 +1,162 @@
+# (C) Copyright 2025 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import datetime
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from anemoi.datasets.create.sources import xarray_support
+from anemoi.datasets.create.sources.xarray_support import load_one
+from anemoi.datasets.create.sources.xarray_support import open_field_list
+from anemoi.datasets.create.sources.xarray_support.fieldlist import XarrayFieldList
+
+
+def _sample(path: str) -> str:
+    """Write a small netCDF file with surface and pressure level variables.
+
+    Parameters
+    ----------
+    path : str
+        Directory in which to write the file.
+
+    Returns
+    -------
+    str
+        The path of the file.
+    """
+    rng = np.random.default_rng(42)
+    ds = xr.Dataset(
+        {
+            "t": (("time", "level", "latitude", "longitude"), rng.random((8, 3, 5, 8))),
+            "u": (("time", "latitude", "longitude"), rng.random((8, 5, 8))),
+        },
+        coords=dict(
+            time=pd.date_range("2020-01-01", periods=8, freq="6h"),
+            level=[1000, 850, 500],
+            latitude=np.linspace(90, -90, 5),
+            longitude=np.linspace(0, 350, 8),
+        ),
+    )
+    ds["level"].attrs.update(units="hPa", long_name="pressure")
+
+    path = f"{path}/sample.nc"
+    ds.to_netcdf(path)
+    return path
+
+
+@pytest.fixture
+def sample(tmp_path) -> str:
+    xarray_support.clear_cache()
+    yield _sample(tmp_path)
+    xarray_support.clear_cache()
+
+
+def test_open_field_list_cache(sample: str, monkeypatch) -> None:
+    """Test that datasets are opened and analysed once, and evicted when the cache is full."""
+
+    fs = open_field_list(sample)
+    assert len(fs) == 32
+    assert open_field_list(sample) is fs
+    assert open_field_list(sample, options={"cache": False}) is not fs
+
+    monkeypatch.setattr(xarray_support, "CACHE_SIZE", 1)
+    open_field_list(sample, options={"decode_cf": True})
+    assert open_field_list(sample) is not fs
+
+
+class _Context:
+    def trace(self, emoji: str, *args: Any) -> None:
+        pass
+
+
+@pytest.mark.parametrize("chunks", [None, {"time": 2}])
+def test_load_one_blocks(sample: str, chunks: Optional[Dict[str, int]]) -> None:
+    """Test that the fields of a group are loaded as blocks, with the same values as when loaded one by one."""
+
+    dates = [datetime.datetime(2020, 1, 1, 6), datetime.datetime(2020, 1, 2, 18)]
+    options = {} if chunks is None else {"chunks": chunks}
+
+    fields = load_one("🌐", _Context(), dates, sample, options=options, param=["t", "u"])
+    assert len(fields) == 8
+
+    blocks = {id(f.block): f.block for f in fields}
+    assert sorted(repr(b) for b in blocks.values()) == [
+        "XArrayBlock(t, {'time': 2, 'level': 3})",
+        "XArrayBlock(u, {'time': 2})",
+    ]
+
+    for field in fields:
+        assert np.array_equal(field.to_numpy(flatten=True), field.selection.values.flatten())
+
+    fields = load_one("🌐", _Context(), dates, sample, options=options, param="t", level=850)
+    assert [f.metadata("valid_datetime") for f in fields] == ["2020-01-01T06:00:00", "2020-01-02T18:00:00"]
+    for field in fields:
+        assert np.array_equal(field.to_numpy(flatten=True), field.selection.values.flatten())
+
+
+def test_filtered_variable_index() -> None:
+    """Test that selections on metadata that are not coordinates (e.g. date and time) match the fields."""
+    rng = np.random.default_rng(42)
+    ds = xr.Dataset(
+        {"t": (("valid_time", "step", "level", "number", "latitude", "longitude"), rng.random((12, 3, 3, 2, 3, 4)))},
+        coords=dict(
+            valid_time=pd.date_range("2020-01-01", periods=12, freq="6h"),
+            step=pd.to_timedelta([0, 6, 12], unit="h"),
+            level=[1000.0, 850.0, 500.0],
+            number=[0, 1],
+            latitude=[10.0, 0.0, -10.0],
+            longitude=[0.0, 90.0, 180.0, 270.0],
+        ),
+    )
+    ds["level"].attrs.update(units="hPa", long_name="pressure")
+    ds["step"].attrs.update(standard_name="forecast_period")
+    ds["valid_time"].attrs.update(standard_name="time")
+
+    fs = XarrayFieldList.from_xarray(ds)
+    assert len(fs) == 216
+
+    def keys(fields: Any) -> List[Tuple[Any, ...]]:
+        return sorted(tuple(f.metadata(k) for k in ("valid_datetime", "step", "level", "number")) for f in fields)
+
+    for kwargs in (
+        dict(date="20200102", time="0000"),
+        dict(date="20200102", time="0000", number=1, level=850),
+        dict(valid_datetime="2020-01-02T12:00:00", date="20200102"),
+    ):
+        expected = [f for f in fs if all(f.metadata(k, default=None) == v for k, v in kwargs.items())]
+        assert expected
+        assert keys(fs.sel(**kwargs)) == keys(expected), kwargs
+
+    assert len(fs.sel(date="20200102", unknown=1)) == 0
+
+
+def test_float32_coordinate_selection() -> None:
+    """Test that values match the coordinates stored as float32."""
+    ds = xr.Dataset(
+        {"t": (("level", "latitude", "longitude"), np.zeros((3, 2, 2)))},
+        coords=dict(
+            level=np.array([0.1, 0.5, 0.995], dtype=np.float32),
+            latitude=[10.0, 0.0],
+            longitude=[0.0, 90.0],
+        ),
+    )
+    ds["level"].attrs.update(units="hPa", long_name="pressure")
+
+    fs = XarrayFieldList.from_xarray(ds)
+    assert len(fs.sel(level=0.995)) == 1
+    assert len(fs.sel(level=[0.1, 0.995])) == 2